@@ -0,0 +1,91 @@
+import json
+import os
+import platform
+from datetime import datetime, timezone
+
+DEFAULT_THRESHOLD = 0.2
+
+
+def result_key(result):
+    """
+    Identify a benchmark result by name and payload size. Only results
+    with the same key are compared.
+    """
+
+    return result["name"], result["series"], result["months"]
+
+
+def save_baseline(path, results):
+    """
+    Write benchmark results to ``path`` as a JSON baseline.
+
+    :param path: str
+        The baseline file, e.g. ``Benchmarks/baselines/local.json``.
+
+    :param results: list[dict]
+        Results as returned by ``Benchmarks.suite.run_suite``.
+
+    returns: None
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+
+
+def load_baseline(path):
+    """
+    Read the results of a baseline written by ``save_baseline``.
+    """
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare current throughput with a baseline.
+
+    :param baseline: list[dict]
+        Baseline results.
+
+    :param current: list[dict]
+        Results of the current run.
+
+    :param threshold: float
+        Largest accepted drop in rows/s, as a fraction of the baseline.
+
+    returns: list[dict]
+        One entry per result present in both runs, with the baseline and
+        current rows/s, the relative ``change`` and ``regressed`` set when
+        the drop exceeds ``threshold``.
+    """
+
+    previous = {result_key(result): result for result in baseline}
+    comparison = []
+
+    for result in current:
+        before = previous.get(result_key(result))
+        if before is None or not before["rows_per_second"]:
+            continue
+
+        change = result["rows_per_second"] / before["rows_per_second"] - 1
+        comparison.append({
+            "name": result["name"],
+            "series": result["series"],
+            "months": result["months"],
+            "baseline_rows_per_second": before["rows_per_second"],
+            "rows_per_second": result["rows_per_second"],
+            "change": change,
+            "regressed": change < -threshold,
+        })
+
+    return comparison
@@ -0,0 +1,227 @@
+"""
+Benchmark the pipeline on synthetic StatsSA payloads.
+
+Times ``transform_json_to_df`` and, given a scratch database, every
+loader and the end-to-end run. Results can be saved as a baseline and
+later runs checked against it:
+
+    python -m Benchmarks.suite --series 2000 --months 300 --save Benchmarks/baselines/local.json
+    python -m Benchmarks.suite --series 2000 --months 300 --check Benchmarks/baselines/local.json
+
+``--parallel`` adds the scaling of ``transform_parallel`` over 1, 2, 4
+and 8 worker processes (or ``--workers``).
+
+The database benchmarks TRUNCATE the warehouse tables between runs, so
+they only use an explicit ``--url`` (or ``BENCH_DATABASE_URL``), e.g. a
+throwaway PostgreSQL container:
+
+    docker run --rm -d -p 5433:5432 -e POSTGRES_PASSWORD=bench postgres:16
+
+or, without any service, the embedded SQLite backend (``--url sqlite://``
+or ``--url sqlite:///bench.db``). Its numbers are only comparable with
+other SQLite runs.
+"""
+
+import argparse
+import os
+import sys
+
+from sqlalchemy import text
+
+from Benchmarks.baseline import DEFAULT_THRESHOLD, compare, load_baseline, save_baseline
+from Benchmarks.synthetic import PAYLOAD_KEY, make_payload
+from Database.connection import get_engine
+from Database.dialect import SQLITE, get_dialect
+from Database.models import FACT_LOAD_METHODS, Create_Tables
+from Pipeline.runner import Pipeline, run_pipeline
+from Transformation.Transform import transform_json_to_df
+from Transformation.benchmark import time_transform
+from Transformation.parallel import transform_parallel
+
+PARALLEL_WORKERS = (1, 2, 4, 8)
+
+LOADER_STAGES = ("dim_series", "dim_indicator", "dim_date", "fact_index", "rollups")
+
+WAREHOUSE_TABLES = (
+    "public.fact_index_quarterly",
+    "public.fact_index_yearly",
+    "public.fact_index",
+    "public.dim_indicator",
+    "public.dim_series",
+    "public.dim_date",
+    "public.load_watermark",
+    "public.load_checkpoint",
+)
+
+
+def _result(name, series, months, rows, seconds):
+    return {
+        "name": name,
+        "series": series,
+        "months": months,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+    }
+
+
+def bench_transform(payload, series, months, repeat=3):
+    """
+    Time ``transform_json_to_df`` on a payload, best of ``repeat`` runs.
+
+    returns: list[dict]
+        The ``transform`` result.
+    """
+
+    seconds, rows = time_transform(
+        lambda json_data: transform_json_to_df(json_data, compact=True),
+        payload[PAYLOAD_KEY],
+        repeat
+    )
+    return [_result("transform", series, months, rows, seconds)]
+
+
+def bench_parallel_transform(payload, series, months, workers=PARALLEL_WORKERS, repeat=3):
+    """
+    Time ``transform_parallel`` on a payload for each worker count, best
+    of ``repeat`` runs. The rows are split into one shard per worker.
+
+    returns: list[dict]
+        One ``transform_parallel_<workers>`` result per worker count.
+    """
+
+    rows = payload[PAYLOAD_KEY]
+    results = []
+    for n_workers in workers:
+        shard_size = max(1, -(-len(rows) // n_workers))
+        seconds, n_rows = time_transform(
+            lambda json_data: transform_parallel(
+                json_data, max_workers=n_workers, shard_size=shard_size, compact=True
+            ),
+            rows,
+            repeat
+        )
+        results.append(_result(f"transform_parallel_{n_workers}", series, months, n_rows, seconds))
+    return results
+
+
+def reset_warehouse(engine):
+    """
+    Create the warehouse tables if needed and empty them.
+    """
+
+    Create_Tables(engine)
+    with engine.begin() as conn:
+        if get_dialect(engine) is SQLITE:
+            for table in WAREHOUSE_TABLES:
+                conn.execute(text(f"DELETE FROM {table}"))
+        else:
+            conn.execute(text(f"TRUNCATE {', '.join(WAREHOUSE_TABLES)} CASCADE"))
+
+
+def bench_load(engine, payload, series, months, repeat=1, method="executemany"):
+    """
+    Time each loader and the end-to-end run on an emptied warehouse.
+
+    Every repeat starts from empty tables, so each run inserts every
+    row. Throughput is measured in fact rows for all of them.
+
+    returns: list[dict]
+        One result per loader (``load_<stage>``, ``load_fact_index_<method>``
+        for the fact loader) and one ``end_to_end_<method>`` result.
+    """
+
+    best = {}
+    for _ in range(repeat):
+        reset_warehouse(engine)
+        report = run_pipeline(engine, Pipeline(engine), fetch=lambda: payload, method=method)
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+        rows = stages["transform"]["rows_out"]
+
+        timings = {
+            f"load_{stage}_{method}" if stage == "fact_index" else f"load_{stage}": stages[stage]["seconds"]
+            for stage in LOADER_STAGES
+        }
+        timings[f"end_to_end_{method}"] = report["total_seconds"]
+
+        for name, seconds in timings.items():
+            best[name] = min(best.get(name, seconds), seconds)
+
+    return [
+        _result(name, series, months, rows, seconds)
+        for name, seconds in best.items()
+    ]
+
+
+def run_suite(series, months, repeat=3, engine=None, methods=("executemany",), workers=()):
+    """
+    Run the benchmarks on a synthetic payload of ``series`` x ``months``.
+
+    :param workers: Iterable[int]
+        Worker counts to benchmark ``transform_parallel`` with, none by
+        default.
+
+    :param engine: sqlalchemy.engine.Engine | None
+        Scratch database for the loader benchmarks. They are skipped
+        without one.
+
+    returns: list[dict]
+        Results with ``name``, ``series``, ``months``, ``rows``,
+        ``seconds`` and ``rows_per_second``.
+    """
+
+    payload = make_payload(series, months)
+    results = bench_transform(payload, series, months, repeat)
+    if workers:
+        results += bench_parallel_transform(payload, series, months, workers, repeat)
+
+    if engine is not None:
+        for method in methods:
+            results += [
+                result
+                for result in bench_load(engine, payload, series, months, repeat, method)
+                if not any(r["name"] == result["name"] for r in results)
+            ]
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--months", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL"), help="scratch database for the loader benchmarks")
+    parser.add_argument("--methods", nargs="+", choices=FACT_LOAD_METHODS, default=["executemany"])
+    parser.add_argument("--parallel", action="store_true", help="benchmark transform_parallel as well")
+    parser.add_argument("--workers", type=int, nargs="+", default=list(PARALLEL_WORKERS), help="worker counts for --parallel (default: 1 2 4 8)")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a baseline")
+    parser.add_argument("--check", metavar="PATH", help="fail when throughput dropped against this baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="accepted throughput drop (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    engine = get_engine("bulk_load", args.url) if args.url else None
+    workers = args.workers if args.parallel else ()
+    results = run_suite(args.series, args.months, args.repeat, engine, args.methods, workers)
+
+    for result in results:
+        print(f"{result['name']:<28}{result['rows']:>10,} rows {result['seconds']:>9.3f} s {result['rows_per_second']:>14,.0f} rows/s")
+
+    if args.save:
+        save_baseline(args.save, results)
+
+    if args.check:
+        regressions = 0
+        for row in compare(load_baseline(args.check), results, args.threshold):
+            status = "REGRESSED" if row["regressed"] else "ok"
+            print(f"{row['name']:<28}{row['change']:>+9.1%}  {status}")
+            regressions += row["regressed"]
+        if regressions:
+            print(f"{regressions} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
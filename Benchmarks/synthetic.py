@@ -0,0 +1,54 @@
+import random
+
+from Transformation.benchmark import make_series_rows
+
+PAYLOAD_KEY = "SASTableData+P0142_7"
+
+
+def make_payload(n_series, n_months, start_year=2000, missing=0.0, seed=0):
+    """
+    Generate a ``Fetch_Data``-shaped StatsSA payload of synthetic series.
+
+    :param n_series: int
+        Number of series rows (indicators).
+
+    :param n_months: int
+        Monthly values per series, starting in January of ``start_year``.
+
+    :param start_year: int
+        Year of the first month.
+
+    :param missing: float
+        Fraction of the monthly values to leave out, so the rows are
+        ragged like real exports where series start at different months.
+
+    :param seed: int
+        Seed choosing the missing months, so payloads are reproducible.
+
+    returns: dict
+        ``{"SASJSONExport": ..., "SASTableData+P0142_7": [...]}``.
+    """
+
+    rows = make_series_rows(n_series, n_months, start_year=start_year)
+
+    if missing:
+        rng = random.Random(seed)
+        for row in rows:
+            for key in [key for key in row if key.startswith("MO")]:
+                if rng.random() < missing:
+                    del row[key]
+
+    return {"SASJSONExport": "1.0 PRETTY", PAYLOAD_KEY: rows}
+
+
+def payload_values(payload):
+    """
+    Number of monthly values in a payload, i.e. the fact rows it yields.
+    """
+
+    return sum(
+        1
+        for row in payload[PAYLOAD_KEY]
+        for key in row
+        if key.startswith("MO")
+    )
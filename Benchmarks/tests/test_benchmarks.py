@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import MagicMock
+
+from sqlalchemy import text
+
+from Benchmarks.baseline import compare, load_baseline, save_baseline
+from Benchmarks.suite import bench_load, bench_parallel_transform, main, run_suite
+from Benchmarks.synthetic import PAYLOAD_KEY, make_payload, payload_values
+from Database.connection import dispose_engines, get_engine
+from Transformation.Transform import transform_json_to_df
+
+
+def result(name, rows_per_second, series=10, months=12):
+    return {
+        "name": name,
+        "series": series,
+        "months": months,
+        "rows": 120,
+        "seconds": 120 / rows_per_second,
+        "rows_per_second": rows_per_second,
+    }
+
+
+class TestSyntheticPayload(unittest.TestCase):
+
+    def test_payload_shape(self):
+        payload = make_payload(4, 18, start_year=2016)
+
+        rows = payload[PAYLOAD_KEY]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(payload_values(payload), 4 * 18)
+        self.assertEqual(len(transform_json_to_df(rows)), 4 * 18)
+
+    def test_missing_months_are_reproducible(self):
+        payload = make_payload(20, 24, missing=0.25, seed=7)
+
+        self.assertLess(payload_values(payload), 20 * 24)
+        self.assertEqual(payload, make_payload(20, 24, missing=0.25, seed=7))
+        self.assertEqual(len(transform_json_to_df(payload[PAYLOAD_KEY])), payload_values(payload))
+
+
+class TestBaseline(unittest.TestCase):
+
+    def test_round_trip(self):
+        results = [result("transform", 1000.0)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baselines", "local.json")
+            save_baseline(path, results)
+            self.assertEqual(load_baseline(path), results)
+
+    def test_compare_flags_drops_past_threshold(self):
+        baseline = [result("transform", 1000.0), result("load_dim_series", 1000.0)]
+        current = [result("transform", 850.0), result("load_dim_series", 700.0)]
+
+        comparison = compare(baseline, current, threshold=0.2)
+
+        self.assertEqual([row["regressed"] for row in comparison], [False, True])
+        self.assertAlmostEqual(comparison[1]["change"], -0.3)
+
+    def test_compare_skips_other_payload_sizes(self):
+        baseline = [result("transform", 1000.0, series=10)]
+        current = [result("transform", 10.0, series=20), result("load_dim_date", 10.0)]
+
+        self.assertEqual(compare(baseline, current), [])
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_transform_only_without_database(self):
+        results = run_suite(3, 12, repeat=1)
+
+        self.assertEqual([r["name"] for r in results], ["transform"])
+        self.assertEqual(results[0]["rows"], 36)
+        self.assertGreater(results[0]["rows_per_second"], 0)
+
+    def test_loader_results(self):
+        engine = MagicMock()
+        engine.connect.return_value.__enter__.return_value.execute.return_value.one.return_value = (None, None, 0)
+
+        results = bench_load(engine, make_payload(3, 12), 3, 12)
+
+        self.assertEqual(
+            [r["name"] for r in results],
+            [
+                "load_dim_series",
+                "load_dim_indicator",
+                "load_dim_date",
+                "load_fact_index_executemany",
+                "load_rollups",
+                "end_to_end_executemany",
+            ]
+        )
+        self.assertTrue(all(r["rows"] == 36 for r in results))
+
+    def test_sqlite_load_without_a_service(self):
+        engine = get_engine("bulk_load", url="sqlite://")
+        self.addCleanup(dispose_engines)
+
+        results = run_suite(3, 12, repeat=2, engine=engine, methods=("executemany", "copy"))
+
+        self.assertIn("end_to_end_copy", [r["name"] for r in results])
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT count(*) FROM public.fact_index")).scalar(), 36)
+
+    def test_parallel_transform_scaling(self):
+        results = bench_parallel_transform(make_payload(4, 12), 4, 12, workers=(1, 2), repeat=1)
+
+        self.assertEqual([r["name"] for r in results], ["transform_parallel_1", "transform_parallel_2"])
+        self.assertTrue(all(r["rows"] == 48 for r in results))
+
+    def test_check_fails_on_regression(self):
+        argv = ["--series", "3", "--months", "12", "--repeat", "1", "--url", ""]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            save_baseline(path, [result("transform", 1e12, series=3, months=12)])
+            with redirect_stdout(StringIO()) as out:
+                self.assertEqual(main([*argv, "--check", path]), 1)
+            self.assertRegex(out.getvalue(), r"transform +-100\.0% +REGRESSED")
+            self.assertIn("1 benchmark(s) slower than the baseline", out.getvalue())
+
+            save_baseline(path, [result("transform", 1e-3, series=3, months=12)])
+            with redirect_stdout(StringIO()) as out:
+                self.assertEqual(main([*argv, "--check", path]), 0)
+            self.assertRegex(out.getvalue(), r"transform +\+[\d.]+% +ok")
+            self.assertNotIn("REGRESSED", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
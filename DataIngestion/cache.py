@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class RawCache:
+    """
+    On-disk cache of raw StatsSA responses.
+
+    Each URL is stored as a body file plus a JSON metadata file holding
+    the response ``ETag`` and ``Last-Modified`` headers, which are sent
+    back as ``If-None-Match`` / ``If-Modified-Since`` on the next fetch.
+    The metadata also records whether the body has been loaded into the
+    warehouse, so an unchanged download is only skipped once it has been
+    processed successfully.
+
+    When the bodies grow beyond ``max_bytes`` the least recently used
+    entries are evicted.
+
+    :param directory: str
+        Where cached responses are stored. Created if missing.
+
+    :param max_bytes: int
+        Upper bound for the total size of the cached bodies.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, name)
+        return base + ".body", base + ".json"
+
+    def _read_meta(self, url):
+        _, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, url, meta):
+        _, meta_path = self._paths(url)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def get(self, url):
+        """
+        Return ``(body_path, meta)`` for a cached URL, or None.
+        """
+
+        body_path, _ = self._paths(url)
+        meta = self._read_meta(url)
+        if meta is None or not os.path.exists(body_path):
+            return None
+
+        meta["accessed_at"] = time.time()
+        self._write_meta(url, meta)
+        return body_path, meta
+
+    def conditional_headers(self, url):
+        """
+        Return the validator headers for a conditional GET of ``url``.
+        """
+
+        meta = self._read_meta(url)
+        if meta is None:
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, url, chunks, headers):
+        """
+        Write a response body to the cache and evict old entries.
+
+        :param url: str
+            The requested URL.
+
+        :param chunks: Iterable[bytes]
+            The response body.
+
+        :param headers: Mapping[str, str]
+            The response headers.
+
+        returns: str
+            Path of the cached body.
+        """
+
+        body_path, _ = self._paths(url)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, body_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        now = time.time()
+        self._write_meta(url, {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "size": size,
+            "stored_at": now,
+            "accessed_at": now,
+            "processed": False,
+        })
+        self.evict(keep=url)
+        return body_path
+
+    def mark_processed(self, url):
+        """
+        Record that the cached body of ``url`` has been loaded.
+        """
+
+        meta = self._read_meta(url)
+        if meta is not None:
+            meta["processed"] = True
+            self._write_meta(url, meta)
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the bodies fit in
+        ``max_bytes``. The entry for ``keep`` is never removed.
+
+        returns: int
+            The number of entries removed.
+        """
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                entries.append(json.load(f))
+
+        total = sum(meta["size"] for meta in entries)
+        removed = 0
+        for meta in sorted(entries, key=lambda meta: meta["accessed_at"]):
+            if total <= self.max_bytes:
+                break
+            if meta["url"] == keep:
+                continue
+
+            for path in self._paths(meta["url"]):
+                if os.path.exists(path):
+                    os.unlink(path)
+            total -= meta["size"]
+            removed += 1
+
+        return removed
@@ -1,18 +1,641 @@
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import zlib
 import requests
+import urllib3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from Transformation.registry import DATASETS
+except ImportError:
+    # The DataIngestion image ships this directory on its own and runs
+    # `python extract.py`, so only the default table is known there.
+    DATASETS = {}
+
+# Brotli is only advertised when a decoder is installed
+ACCEPT_ENCODING = "gzip, br" if brotli is not None else "gzip"
 
-url = "https://isibaloweb.statssa.gov.za/data/ETS/Monthly/Export%20and%20Import%20Unit%20Value%20IndicesP0142_7/P0142_7p.json"
-    
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-    "Accept": "application/json"
+    "Accept": "application/json",
+    "Accept-Encoding": ACCEPT_ENCODING
 }
 
-def Fetch_Data():
-    
-    response = requests.get(url, headers=HEADERS, timeout=10)
-    response.raise_for_status()
-    # data = response.json()
-    return response.json()
+# (connect, read) timeouts in seconds. The read timeout bounds the wait
+# for each chunk, not the whole download, so a large export on a slow
+# link only fails if it stalls.
+TIMEOUT = (5, 60)
+
+# Downloads are attempted RETRIES + 1 times, sleeping a random fraction
+# of BACKOFF * 2 ** attempt (at most MAX_BACKOFF) seconds in between.
+RETRIES = 5
+BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Where Fetch_Data keeps partial bodies, so a restarted run resumes them
+DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR") or os.path.join(tempfile.gettempdir(), "statssa-downloads")
+
+# StatsSA ETS tables by id, from the dataset registry. Register a
+# dataset in Transformation.registry to make it available to Fetch_Tables
+# and the loaders.
+CATALOGUE = {table: spec.url for table, spec in DATASETS.items()} or {
+    "P0142_7": "https://isibaloweb.statssa.gov.za/data/ETS/Monthly/Export%20and%20Import%20Unit%20Value%20IndicesP0142_7/P0142_7p.json"
+}
+
+url = CATALOGUE["P0142_7"]
+
+CHUNK_SIZE = 64 * 1024
+
+def data_key(table):
+    """
+    The key of the series rows in the export of ``table``.
+    """
+
+    spec = DATASETS.get(table)
+    return spec.data_key if spec is not None else f"SASTableData+{table}"
+
+
+class _Retry(Exception):
+    """
+    A download attempt failed in a way worth retrying.
+
+    Only raised between attempts: once the retries run out it is replaced
+    by a ``requests.HTTPError`` for an error reply, or a
+    ``requests.ConnectionError`` otherwise.
+    """
+
+    def __init__(self, message, retry_after=None, response=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.response = response
+
+
+# Failures of an attempt that are retried, besides _Retry
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    urllib3.exceptions.HTTPError,
+)
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After", "")
+    return min(float(value), MAX_BACKOFF) if value.isdigit() else None
+
+
+def _backoff_delay(attempt, backoff, retry_after=None):
+    # "Full jitter": concurrent downloads that failed together spread out
+    delay = random.uniform(0, min(MAX_BACKOFF, backoff * 2 ** attempt))
+    return max(delay, retry_after or 0)
+
+
+def _with_retries(attempt, retries, backoff):
+    """
+    Call ``attempt`` until it succeeds, at most ``retries + 1`` times,
+    sleeping with ``_backoff_delay`` after each transient failure.
+
+    returns: the result of ``attempt``.
+    """
+
+    for n in range(retries + 1):
+        try:
+            return attempt()
+        except (_Retry, *TRANSIENT_ERRORS) as e:
+            if n < retries:
+                time.sleep(_backoff_delay(n, backoff, getattr(e, "retry_after", None)))
+            elif isinstance(e, _Retry) and e.response is not None:
+                raise requests.HTTPError(str(e), response=e.response) from e
+            elif isinstance(e, (_Retry, urllib3.exceptions.HTTPError)):
+                raise requests.ConnectionError(str(e)) from e
+            else:
+                raise
+
+
+def _download_path(table_url, download_dir=None):
+    download_dir = download_dir or DOWNLOAD_DIR
+    os.makedirs(download_dir, exist_ok=True)
+    name = hashlib.sha256(table_url.encode("utf-8")).hexdigest()
+    return os.path.join(download_dir, name + ".json")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _discard(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def _decode_body(part_path, path, encoding):
+    """
+    Write the decoded body of ``part_path`` to ``path``.
+    """
+
+    if encoding == "identity":
+        os.replace(part_path, path)
+        return
+
+    if encoding == "gzip":
+        with gzip.open(part_path, "rb") as src, open(path, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    elif encoding in ("deflate", "br"):
+        if encoding == "br":
+            decoder = brotli.Decompressor()
+            decode = decoder.process
+        else:
+            decoder = zlib.decompressobj()
+            decode = decoder.decompress
+        with open(part_path, "rb") as src, open(path, "wb") as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                dst.write(decode(chunk))
+    else:
+        raise ValueError(f"Unsupported Content-Encoding {encoding!r}")
+    os.unlink(part_path)
+
+
+def _download_attempt(session, table_url, part_path, meta_path, timeout, chunk_size):
+    """
+    Download the rest of a body into ``part_path``.
+
+    The undecoded bytes are stored, since a ``Range`` of a compressed
+    response counts bytes of the compressed body.
+
+    returns: dict
+        The metadata of the complete body.
+    """
+
+    meta = _read_meta(meta_path)
+    offset = os.path.getsize(part_path) if meta and os.path.exists(part_path) else 0
+
+    headers = dict(HEADERS)
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if meta.get("validator"):
+            # Without a match the server sends the whole new body instead
+            headers["If-Range"] = meta["validator"]
+
+    response = session.get(table_url, headers=headers, timeout=timeout, stream=True)
+    try:
+        encoding = response.headers.get("Content-Encoding", "identity").lower()
+        if response.status_code >= 400:
+            # Read the short error body so the connection can be reused
+            response.content
+
+        if response.status_code == 416 and offset:
+            # Either the part already holds the whole body or it is stale
+            if response.headers.get("Content-Range") == f"bytes */{offset}":
+                return meta
+            _discard(part_path, meta_path)
+            raise _Retry("range not satisfiable, restarting")
+
+        if response.status_code in RETRY_STATUSES:
+            raise _Retry(f"HTTP {response.status_code}", _retry_after(response), response)
+        response.raise_for_status()
+
+        if response.status_code == 206 and offset:
+            content_range = response.headers.get("Content-Range", "")
+            if not content_range.startswith(f"bytes {offset}-") or encoding != meta["encoding"]:
+                _discard(part_path, meta_path)
+                raise _Retry("unexpected partial response, restarting")
+            mode = "ab"
+        else:
+            length = response.headers.get("Content-Length")
+            meta = {
+                "url": table_url,
+                "encoding": encoding,
+                "validator": response.headers.get("ETag") or response.headers.get("Last-Modified"),
+                "length": int(length) if length and length.isdigit() else None
+            }
+            _write_meta(meta_path, meta)
+            mode = "wb"
+
+        with open(part_path, mode) as f:
+            for chunk in response.raw.stream(chunk_size, decode_content=False):
+                f.write(chunk)
+    finally:
+        response.close()
+
+    size = os.path.getsize(part_path)
+    if meta["length"] is not None and size != meta["length"]:
+        raise _Retry(f"body ended after {size} of {meta['length']} bytes")
+    return meta
+
+
+def Download(
+    table_url,
+    path,
+    session=None,
+    retries=RETRIES,
+    backoff=BACKOFF,
+    timeout=TIMEOUT,
+    chunk_size=CHUNK_SIZE
+):
+    """
+    Download a response body to a file, retrying transient failures.
+
+    The body is written to ``<path>.part`` as it arrives, next to a
+    ``<path>.part.json`` file with its ``Content-Encoding``, length and
+    validator. A connection error, timeout, cut-off body or a 408, 429 or
+    5xx reply is retried after an exponential backoff with jitter (or the
+    server's ``Retry-After``), and a retry, or a later call after a crash,
+    asks for only the missing bytes with ``Range`` / ``If-Range``. Once
+    complete the body is decoded to ``path``.
+
+    :param table_url: str
+        The URL to download.
+
+    :param path: str
+        Where the decoded body is written.
+
+    :param session: requests.Session | None
+        Session to reuse for the requests.
+
+    :param retries: int
+        Number of retries after the first attempt.
+
+    :param backoff: float
+        Base of the backoff in seconds.
+
+    :param timeout: tuple[float, float]
+        Connect and read timeouts in seconds.
+
+    :param chunk_size: int
+        Number of bytes read from the response body at a time.
+
+    returns: str
+        ``path``.
+
+    raises: requests.HTTPError, requests.ConnectionError
+        When the last attempt fails.
+    """
+
+    session = session or requests
+    part_path = path + ".part"
+    meta_path = part_path + ".json"
+
+    meta = _with_retries(
+        lambda: _download_attempt(session, table_url, part_path, meta_path, timeout, chunk_size),
+        retries,
+        backoff
+    )
+
+    _decode_body(part_path, path, meta["encoding"])
+    _discard(meta_path)
+    return path
+
+
+def Fetch_Data(table_url=url, session=None, retries=RETRIES, download_dir=None):
+    """
+    Download and decode a StatsSA JSON export.
+
+    The body is fetched with ``Download``; a partial body left behind by
+    an interrupted run is resumed rather than downloaded again.
+
+    :param table_url: str
+        The export URL.
+
+    :param session: requests.Session | None
+        Session to reuse for the requests.
+
+    :param retries: int
+        Passed to ``Download``.
+
+    :param download_dir: str | None
+        Where partial bodies are kept, ``DOWNLOAD_DIR`` by default.
+
+    returns: dict
+        The decoded export.
+    """
+
+    path = Download(table_url, _download_path(table_url, download_dir), session, retries)
+
+    try:
+        with open(path, "rb") as f:
+            return json.load(f)
+    finally:
+        os.unlink(path)
+
+
+def Make_Session(pool_size=8):
+    """
+    Create a requests Session whose connection pool holds ``pool_size``
+    connections per host, so concurrent downloads reuse connections
+    instead of opening a new one per request.
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def Fetch_Tables(tables=None, max_workers=4, session=None):
+    """
+    Download several StatsSA tables concurrently.
+
+    Downloads run on a thread pool of ``max_workers`` threads over one
+    shared, pooled Session. Results are yielded as each download finishes,
+    so the transform stage can start on the first table while the others
+    are still in flight. The first failed download is raised.
+
+    :param tables: Iterable[str] | dict[str, str] | None
+        Table ids from ``CATALOGUE``, or a mapping of table id to URL.
+        Defaults to every table in ``CATALOGUE``.
+
+    :param max_workers: int
+        Maximum number of downloads in flight.
+
+    :param session: requests.Session | None
+        Session to reuse. A pooled session sized for ``max_workers`` is
+        created (and closed afterwards) when omitted.
+
+    returns: Iterator[tuple[str, dict]]
+        ``(table_id, payload)`` pairs in completion order.
+    """
+
+    if tables is None:
+        tables = CATALOGUE
+    if not isinstance(tables, dict):
+        tables = {table: CATALOGUE[table] for table in tables}
+
+    owns_session = session is None
+    if owns_session:
+        session = Make_Session(max_workers)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(Fetch_Data, table_url, session): table
+                for table, table_url in tables.items()
+            }
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        if owns_session:
+            session.close()
+
+
+def Fetch_Table_Rows(tables=None, max_workers=4):
+    """
+    Yield the series rows of several tables, table by table as each
+    download finishes. See ``Fetch_Tables`` for the arguments.
+    """
+
+    for table, payload in Fetch_Tables(tables, max_workers=max_workers):
+        yield from payload[data_key(table)]
+
+
+def Stream_Rows(
+    table="P0142_7",
+    chunk_size=CHUNK_SIZE,
+    session=None,
+    retries=RETRIES,
+    download_dir=None
+):
+    """
+    Stream the series rows of a StatsSA export one at a time.
+
+    The body is fetched to disk with ``Download``, so failures are retried
+    and resumed, and then read back in chunks with the series rows array
+    (see ``data_key``) decoded element by element, so only the row being
+    decoded and the current chunk are held in memory instead of the whole
+    document.
+
+    :param table: str
+        A table id from ``CATALOGUE``, e.g. ``"P0142_7"``.
+
+    :param chunk_size: int
+        Number of bytes read from the body at a time.
+
+    :param session: requests.Session | None
+        Session to reuse for the requests.
+
+    :param retries: int
+        Passed to ``Download``.
+
+    :param download_dir: str | None
+        Where the body is kept, ``DOWNLOAD_DIR`` by default.
+
+    returns: Iterator[dict]
+        The series rows in document order.
+    """
+
+    table_url = CATALOGUE[table]
+    path = Download(
+        table_url,
+        _download_path(table_url, download_dir),
+        session,
+        retries,
+        chunk_size=chunk_size
+    )
+
+    try:
+        yield from Read_Rows(path, table, chunk_size)
+    finally:
+        os.unlink(path)
+
+
+def Fetch_Cached(table_url, cache, session=None, offline=False, retries=RETRIES, backoff=BACKOFF):
+    """
+    Fetch a table through the on-disk raw response cache.
+
+    A cached response is revalidated with ``If-None-Match`` /
+    ``If-Modified-Since``. A ``304 Not Modified`` reply short-circuits to
+    the cached body without downloading anything. In offline mode the
+    network is never used and only cached bodies are served. Transient
+    failures are retried as in ``Download``; a cut-off body is never
+    stored, so it is fetched again in full.
+
+    :param table_url: str
+        The table URL.
+
+    :param cache: DataIngestion.cache.RawCache
+        Where bodies and their validators are stored.
+
+    :param session: requests.Session | None
+        Session to reuse for the request.
+
+    :param offline: bool
+        Serve only from the cache.
+
+    :param retries: int
+        Number of retries after the first attempt.
+
+    :param backoff: float
+        Base of the backoff in seconds.
+
+    returns: tuple[str, bool]
+        The path of the cached body, and whether it still has to be
+        processed: True for a new body, or for an unchanged body that has
+        not yet been marked processed with ``RawCache.mark_processed``.
+    """
+
+    cached = cache.get(table_url)
+
+    if offline:
+        if cached is None:
+            raise RuntimeError(f"{table_url} is not in the raw cache (offline mode)")
+        body_path, meta = cached
+        return body_path, not meta["processed"]
+
+    headers = {**HEADERS, **cache.conditional_headers(table_url)} if cached else HEADERS
+
+    def attempt():
+        response = (session or requests).get(table_url, headers=headers, timeout=TIMEOUT, stream=True)
+        try:
+            if response.status_code == 304 and cached is not None:
+                body_path, meta = cached
+                return body_path, not meta["processed"]
+
+            if response.status_code >= 400:
+                # Read the short error body so the connection can be reused
+                response.content
+            if response.status_code in RETRY_STATUSES:
+                raise _Retry(f"HTTP {response.status_code}", _retry_after(response), response)
+            response.raise_for_status()
+
+            body_path = cache.store(
+                table_url,
+                response.iter_content(chunk_size=CHUNK_SIZE),
+                response.headers
+            )
+            return body_path, True
+        finally:
+            response.close()
+
+    return _with_retries(attempt, retries, backoff)
+
+
+def Read_Rows(body_path, table="P0142_7", chunk_size=CHUNK_SIZE):
+    """
+    Stream the series rows of a saved export, e.g. a ``Fetch_Cached`` body.
+    """
+
+    with open(body_path, "rb") as f:
+        yield from iter_json_array(
+            iter(lambda: f.read(chunk_size), b""),
+            data_key(table)
+        )
+
+
+def iter_json_array(chunks, key):
+    """
+    Incrementally decode the array stored under ``key`` in a JSON object.
+
+    :param chunks: Iterable[bytes]
+        The raw JSON document split into arbitrary byte chunks.
+
+    :param key: str
+        The object key whose array value should be decoded.
+
+    returns: Iterator
+        The array elements, one at a time.
+    """
+
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    needle = json.dumps(key)
+    buffer = ""
+    eof = False
+
+    def read_more():
+        nonlocal buffer, eof
+        for chunk in chunks:
+            if chunk:
+                buffer += utf8.decode(chunk)
+                return
+        buffer += utf8.decode(b"", final=True)
+        eof = True
+
+    # Find the key, keeping only enough of the buffer to match across chunks.
+    while True:
+        pos = buffer.find(needle)
+        if pos != -1:
+            buffer = buffer[pos + len(needle):]
+            break
+        if eof:
+            raise ValueError(f"Key {key!r} not found in JSON document")
+        buffer = buffer[-len(needle):]
+        read_more()
+
+    # Expect ':' then '[' before the first element.
+    for expected in ":[":
+        while not buffer.lstrip():
+            if eof:
+                raise ValueError(f"Unexpected end of JSON document after {key!r}")
+            read_more()
+        buffer = buffer.lstrip()
+        if buffer[0] != expected:
+            raise ValueError(f"Expected {expected!r} after {key!r}, got {buffer[0]!r}")
+        buffer = buffer[1:]
+
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if not buffer:
+            if eof:
+                raise ValueError(f"Unexpected end of JSON document inside {key!r}")
+            read_more()
+            continue
+
+        if buffer[0] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()
+            continue
+
+        # A number at the very end of the buffer may still be incomplete.
+        if end == len(buffer) and not eof:
+            read_more()
+            continue
+
+        buffer = buffer[end:]
+        yield item
+
 
 if __name__ == "__main__":
-    Fetch_Data()
\ No newline at end of file
+    staging_dir = os.getenv("STAGING_DIR")
+    if staging_dir:
+        from Staging.store import write_raw_rows
+
+        for table in CATALOGUE:
+            n_rows = write_raw_rows(staging_dir, table, Stream_Rows(table))
+            print(f"Staged {n_rows} raw rows of {table}")
+    else:
+        Fetch_Data()
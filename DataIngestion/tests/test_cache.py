@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from DataIngestion.cache import RawCache
+from DataIngestion.extract import Fetch_Cached, Read_Rows
+from DataIngestion.tests.stub_server import StubServer
+from DataIngestion.tests.test_extract import FlakyExport
+from DataIngestion.tests.testData import rawData
+
+
+class TestRawCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RawCache(self.tmp.name, max_bytes=25)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_and_get(self):
+        path = self.cache.store("http://x/a", [b"12345", b"67890"], {"ETag": '"v1"'})
+
+        body_path, meta = self.cache.get("http://x/a")
+
+        self.assertEqual(body_path, path)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"1234567890")
+        self.assertEqual(meta["size"], 10)
+        self.assertFalse(meta["processed"])
+        self.assertEqual(self.cache.conditional_headers("http://x/a"), {"If-None-Match": '"v1"'})
+
+    def test_mark_processed(self):
+        self.cache.store("http://x/a", [b"1"], {})
+        self.cache.mark_processed("http://x/a")
+
+        self.assertTrue(self.cache.get("http://x/a")[1]["processed"])
+
+    def test_evicts_least_recently_used(self):
+        self.cache.store("http://x/a", [b"a" * 10], {})
+        time.sleep(0.01)
+        self.cache.store("http://x/b", [b"b" * 10], {})
+        time.sleep(0.01)
+        self.cache.get("http://x/a")
+        time.sleep(0.01)
+        self.cache.store("http://x/c", [b"c" * 10], {})
+
+        self.assertIsNotNone(self.cache.get("http://x/a"))
+        self.assertIsNone(self.cache.get("http://x/b"))
+        self.assertIsNotNone(self.cache.get("http://x/c"))
+
+    def test_never_evicts_the_new_entry(self):
+        self.cache.store("http://x/big", [b"x" * 100], {})
+        self.assertIsNotNone(self.cache.get("http://x/big"))
+
+
+class TestFetchCached(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RawCache(self.tmp.name)
+        self.body = json.dumps(rawData).encode("utf-8")
+
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return 304, {"ETag": '"v1"'}, b""
+            return 200, {"ETag": '"v1"', "Last-Modified": "Tue, 01 Apr 2025 00:00:00 GMT"}, self.body
+
+        self.server = StubServer({"/P0142_7p.json": handler})
+        self.server.__enter__()
+        self.url = f"{self.server.url}/P0142_7p.json"
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def test_first_fetch_downloads(self):
+        path, modified = Fetch_Cached(self.url, self.cache)
+
+        self.assertTrue(modified)
+        self.assertEqual(list(Read_Rows(path)), rawData["SASTableData+P0142_7"])
+
+    def test_revalidates_and_skips_processed_body(self):
+        Fetch_Cached(self.url, self.cache)
+        self.cache.mark_processed(self.url)
+
+        path, modified = Fetch_Cached(self.url, self.cache)
+
+        self.assertFalse(modified)
+        self.assertTrue(os.path.exists(path))
+        _, headers = self.server.requests[-1]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Tue, 01 Apr 2025 00:00:00 GMT")
+
+    def test_unprocessed_body_is_still_modified_after_304(self):
+        Fetch_Cached(self.url, self.cache)
+
+        _, modified = Fetch_Cached(self.url, self.cache)
+
+        self.assertTrue(modified)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_offline_serves_cache_without_network(self):
+        Fetch_Cached(self.url, self.cache)
+        self.cache.mark_processed(self.url)
+
+        path, modified = Fetch_Cached(self.url, self.cache, offline=True)
+
+        self.assertFalse(modified)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(list(Read_Rows(path))), 1)
+
+    @patch("DataIngestion.extract.time.sleep")
+    def test_retries_transient_failures(self, sleep):
+        self.server.routes["/flaky.json"] = FlakyExport(self.body, [503, "cut"])
+        url = f"{self.server.url}/flaky.json"
+
+        path, modified = Fetch_Cached(url, self.cache)
+
+        self.assertTrue(modified)
+        self.assertEqual(list(Read_Rows(path)), rawData["SASTableData+P0142_7"])
+        self.assertEqual(len(self.server.requests), 3)
+
+    @patch("DataIngestion.extract.time.sleep")
+    def test_gives_up_after_retries(self, sleep):
+        self.server.routes["/flaky.json"] = FlakyExport(self.body, [503] * 2)
+
+        with self.assertRaises(requests.HTTPError):
+            Fetch_Cached(f"{self.server.url}/flaky.json", self.cache, retries=1)
+
+        self.assertIsNone(self.cache.get(f"{self.server.url}/flaky.json"))
+
+    def test_offline_miss_raises(self):
+        with self.assertRaises(RuntimeError):
+            Fetch_Cached(self.url, self.cache, offline=True)
+        self.assertEqual(self.server.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
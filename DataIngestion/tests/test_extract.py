@@ -1,17 +1,25 @@
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
 from unittest.mock import patch
-from DataIngestion.extract import Fetch_Data
+import requests
+from DataIngestion.extract import Fetch_Data, Fetch_Tables, Stream_Rows, _backoff_delay, iter_json_array
+from DataIngestion.tests.stub_server import StubServer
+from DataIngestion.tests.testData import rawData
 
 
 class TestFetchedData(unittest.TestCase):
 
-    @patch("DataIngestion.extract.requests.get")
-    def test_fetch_data_success(self, mock_get):
-        # Mock response object
-        mock_response = mock_get.return_value
-        mock_response.status_code = 200
-        mock_response.text = '{"SASTableData+P0142_7": [{"H01": "P0142.7"}]}'
-        mock_response.json.return_value = {
+    def setUp(self):
+        self.download_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.download_dir)
+        self.payload = {
             "SASJSONExport": "1.0 PRETTY",
             "SASTableData+P0142_7": [
                 {
@@ -22,18 +30,264 @@ class TestFetchedData(unittest.TestCase):
                 }
             ]
         }
+        body = json.dumps(self.payload).encode()
+        self.server = StubServer({
+            "/P0142_7p.json": lambda request: (200, {"Content-Type": "application/json"}, body)
+        })
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
 
-        result = Fetch_Data()
+    def test_fetch_data_success(self):
+        result = Fetch_Data(f"{self.server.url}/P0142_7p.json", download_dir=self.download_dir)
 
-        # Assertions
         self.assertIsInstance(result, dict)
         self.assertIn("SASTableData+P0142_7", result)
         self.assertTrue(len(result["SASTableData+P0142_7"]) > 0)
+        self.assertIn("gzip", self.server.requests[0][1]["Accept-Encoding"])
+        self.assertEqual(os.listdir(self.download_dir), [])
 
-    
-    @patch("DataIngestion.extract.requests.get")
-    def test_fetch_data_http_error(self, mock_get):
-        mock_get.return_value.raise_for_status.side_effect = Exception("HTTP Error")
+    @patch("DataIngestion.extract.time.sleep")
+    def test_fetch_data_http_error(self, sleep):
+        with self.assertRaises(requests.HTTPError):
+            Fetch_Data(f"{self.server.url}/missing.json", download_dir=self.download_dir)
+
+        # A client error is not retried
+        self.assertEqual(len(self.server.requests), 1)
+        sleep.assert_not_called()
+
+
+class FlakyExport:
+    """
+    Route serving ``body`` through scripted failures.
+
+    Each request takes the next of ``failures``: an int status code, or
+    ``"cut"`` to send only half of the bytes asked for. Once they run out
+    the requested ``Range`` of the body is served in full.
+    """
+
+    ETAG = '"v1"'
+
+    def __init__(self, body, failures=(), encoding=None):
+        self.body = body
+        self.failures = list(failures)
+        self.encoding = encoding
+
+    def __call__(self, request):
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, int):
+            return failure, {"Retry-After": "0"}, b"unavailable"
+
+        headers = {"ETag": self.ETAG}
+        if self.encoding:
+            headers["Content-Encoding"] = self.encoding
+
+        status, start = 200, 0
+        requested = request.headers.get("Range")
+        if requested and request.headers.get("If-Range") in (None, self.ETAG):
+            start = int(requested[len("bytes="):-1])
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+
+        body = self.body[start:]
+        if failure == "cut":
+            headers["Content-Length"] = str(len(body))
+            body = body[:len(body) // 2]
+        return status, headers, body
+
+
+@patch("DataIngestion.extract.time.sleep")
+class TestResilientDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.download_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.download_dir)
+        self.server = StubServer({})
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.body = json.dumps(rawData).encode()
+
+    def fetch(self, export, **kwargs):
+        self.server.routes["/export.json"] = export
+        return Fetch_Data(f"{self.server.url}/export.json", download_dir=self.download_dir, **kwargs)
+
+    def ranges(self):
+        return [headers.get("Range") for _, headers in self.server.requests]
+
+    def test_retries_server_errors_with_backoff(self, sleep):
+        result = self.fetch(FlakyExport(self.body, [503, 502]))
+
+        self.assertEqual(result, rawData)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_gives_up_after_retries(self, sleep):
+        with self.assertRaises(requests.HTTPError) as raised:
+            self.fetch(FlakyExport(self.body, [503] * 3), retries=2)
+
+        self.assertEqual(raised.exception.response.status_code, 503)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_gives_up_on_cut_off_body(self, sleep):
+        with self.assertRaises(requests.ConnectionError):
+            self.fetch(FlakyExport(self.body, ["cut"]), retries=0)
+
+    def test_resumes_cut_off_body_with_range(self, sleep):
+        result = self.fetch(FlakyExport(self.body, ["cut", "cut"]))
+
+        self.assertEqual(result, rawData)
+        half = len(self.body) // 2
+        quarter = half + (len(self.body) - half) // 2
+        self.assertEqual(self.ranges(), [None, f"bytes={half}-", f"bytes={quarter}-"])
+        self.assertEqual(self.server.requests[1][1]["If-Range"], FlakyExport.ETAG)
+
+    def test_resumes_compressed_body_after_restart(self, sleep):
+        export = FlakyExport(gzip.compress(self.body), ["cut"], encoding="gzip")
+
+        # The first run dies with half the compressed body on disk
+        with self.assertRaises(Exception):
+            self.fetch(export, retries=0)
+        result = self.fetch(export)
+
+        self.assertEqual(result, rawData)
+        self.assertEqual(self.ranges(), [None, f"bytes={len(export.body) // 2}-"])
+        self.assertEqual(os.listdir(self.download_dir), [])
+
+    def test_changed_body_restarts_download(self, sleep):
+        export = FlakyExport(self.body, ["cut"])
+        with self.assertRaises(Exception):
+            self.fetch(export, retries=0)
+
+        export.ETAG = '"v2"'
+        result = self.fetch(export)
+
+        self.assertEqual(result, rawData)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_backoff_grows_with_jitter(self, sleep):
+        delays = [_backoff_delay(attempt, 1.0) for attempt in range(4) for _ in range(50)]
+
+        for i, delay in enumerate(delays):
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, 2 ** (i // 50))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertEqual(_backoff_delay(0, 1.0, retry_after=5), 5)
+
+
+class TestStreamRows(unittest.TestCase):
+
+    def setUp(self):
+        self.body = json.dumps(rawData).encode("utf-8")
+
+    def test_iter_json_array_matches_full_parse(self):
+        for chunk_size in (1, 7, 1024, len(self.body)):
+            chunks = [self.body[i:i + chunk_size] for i in range(0, len(self.body), chunk_size)]
+
+            rows = list(iter_json_array(chunks, "SASTableData+P0142_7"))
+
+            self.assertEqual(rows, rawData["SASTableData+P0142_7"])
+
+    def test_iter_json_array_multiple_rows_and_unicode(self):
+        doc = {"other": [1, 2], "SASTableData+T1": [{"H02": "Índice"}, {"H02": "b"}, 12345]}
+        body = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        chunks = [body[i:i + 3] for i in range(0, len(body), 3)]
+
+        rows = list(iter_json_array(chunks, "SASTableData+T1"))
+
+        self.assertEqual(rows, [{"H02": "Índice"}, {"H02": "b"}, 12345])
+
+    def test_iter_json_array_is_lazy(self):
+        body = b'{"SASTableData+T1": [{"H03": "A"}, {"H03": "B"'
+
+        rows = iter_json_array([body], "SASTableData+T1")
+
+        self.assertEqual(next(rows), {"H03": "A"})
+        with self.assertRaises(ValueError):
+            next(rows)
+
+    def test_iter_json_array_missing_key(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"SASTableData+T1": []}'], "SASTableData+T2"))
+
+    @patch("DataIngestion.extract.time.sleep")
+    def test_stream_rows_retries_and_resumes(self, sleep):
+        download_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, download_dir)
+
+        with StubServer({"/export.json": FlakyExport(self.body, [503, "cut"])}) as server:
+            with patch.dict("DataIngestion.extract.CATALOGUE", {"P0142_7": f"{server.url}/export.json"}):
+                rows = list(Stream_Rows("P0142_7", chunk_size=100, download_dir=download_dir))
+
+        self.assertEqual(rows, rawData["SASTableData+P0142_7"])
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(server.requests[2][1]["Range"], f"bytes={len(self.body) // 2}-")
+        self.assertEqual(os.listdir(download_dir), [])
+
+
+class TestFetchTables(unittest.TestCase):
+
+    DELAY = 0.3
+
+    def setUp(self):
+        def table(name):
+            def handler(request):
+                time.sleep(self.DELAY)
+                body = json.dumps({f"SASTableData+{name}": [{"H03": name}]}).encode()
+                return 200, {"Content-Type": "application/json"}, body
+            return handler
+
+        self.names = [f"T{i}" for i in range(4)]
+        self.server = StubServer({f"/{name}.json": table(name) for name in self.names})
+        self.server.__enter__()
+        self.tables = {name: f"{self.server.url}/{name}.json" for name in self.names}
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def timed_fetch(self, max_workers):
+        start = time.perf_counter()
+        results = dict(Fetch_Tables(self.tables, max_workers=max_workers))
+        return time.perf_counter() - start, results
+
+    def test_fetches_every_table(self):
+        _, results = self.timed_fetch(2)
+
+        self.assertEqual(set(results), set(self.names))
+        self.assertEqual(results["T1"], {"SASTableData+T1": [{"H03": "T1"}]})
+
+    def test_wall_clock_scales_with_workers(self):
+        serial, _ = self.timed_fetch(1)
+        parallel, _ = self.timed_fetch(4)
+
+        self.assertGreaterEqual(serial, len(self.names) * self.DELAY)
+        self.assertLess(parallel, 2 * self.DELAY)
+
+    def test_results_stream_in_completion_order(self):
+        self.server.routes["/slow.json"] = lambda request: (
+            time.sleep(1.0) or (200, {}, b'{"SASTableData+slow": []}')
+        )
+        tables = {"slow": f"{self.server.url}/slow.json", "T0": self.tables["T0"]}
+
+        first, _ = next(Fetch_Tables(tables, max_workers=2))
+
+        self.assertEqual(first, "T0")
+
+    def test_failed_download_is_raised(self):
+        tables = {"missing": f"{self.server.url}/missing.json"}
 
         with self.assertRaises(Exception):
-            Fetch_Data()
+            list(Fetch_Tables(tables, max_workers=1))
+
+
+class TestStandaloneImage(unittest.TestCase):
+
+    def test_extract_runs_without_the_rest_of_the_repo(self):
+        # As in the DataIngestion image, which only ships that directory
+        directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+
+        result = subprocess.run(
+            [sys.executable, "-c", "import extract; print(sorted(extract.CATALOGUE))"],
+            cwd=directory, env=env, capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "['P0142_7']")
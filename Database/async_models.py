@@ -0,0 +1,256 @@
+"""
+Asynchronous variants of the loaders in ``Database.models``.
+
+Each coroutine runs the same code as its synchronous counterpart through
+``AsyncConnection.run_sync``, so the SQL sent and the rows loaded are
+identical; only the waiting on the network is handed back to the event
+loop. That lets independent work overlap on one loop:
+
+- dim_series -> dim_indicator and dim_date are loaded concurrently,
+- fact chunks of different indicators are loaded concurrently,
+
+with at most `concurrency` connections in use at a time.
+
+Needs an ``AsyncEngine``, e.g. from ``Database.connection.get_async_engine``
+(asyncpg, or aiosqlite for a SQLite warehouse). Facts are sent with
+executemany: ``COPY`` goes through the psycopg cursor API, which asyncpg
+does not provide. The tests run the loaders on aiosqlite; asyncpg itself
+is only exercised against a PostgreSQL server.
+"""
+
+import asyncio
+from contextlib import nullcontext
+
+from Database import models
+from Database.connection import get_async_engine
+
+
+class _ConnectionAsEngine:
+    """
+    Presents one connection as an engine, so the engine-based loaders of
+    ``Database.models`` run unchanged inside ``run_sync``. ``begin`` and
+    ``connect`` hand out the connection itself, which is already in the
+    caller's transaction.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.dialect = conn.dialect
+
+    def begin(self):
+        return nullcontext(self.conn)
+
+    def connect(self):
+        return nullcontext(self.conn)
+
+    def execute(self, *args, **kwargs):
+        return self.conn.execute(*args, **kwargs)
+
+
+def _limit(concurrency):
+    return concurrency if isinstance(concurrency, asyncio.Semaphore) else asyncio.Semaphore(concurrency)
+
+
+async def _run(engine, limit, func, *args, **kwargs):
+    """
+    Run an engine-based loader from ``Database.models`` in one transaction.
+    """
+
+    async with limit:
+        async with engine.begin() as conn:
+            return await conn.run_sync(
+                lambda sync_conn: func(_ConnectionAsEngine(sync_conn), *args, **kwargs)
+            )
+
+
+def _check_method(method):
+    if method != "executemany":
+        raise ValueError("the async loaders only support method='executemany'")
+
+
+async def Create_Tables(engine, partitioned=False):
+    """
+    Async ``Database.models.Create_Tables``.
+    """
+
+    await _run(engine, _limit(1), models.Create_Tables, partitioned=partitioned)
+
+
+async def insert_dim_series(engine, df, cache=None, concurrency=1):
+    """
+    Async ``Database.models.insert_dim_series``.
+    """
+
+    await _run(engine, _limit(concurrency), models.insert_dim_series, df, cache=cache)
+
+
+async def insert_dim_indicator(engine, df, cache=None, concurrency=1):
+    """
+    Async ``Database.models.insert_dim_indicator``.
+    """
+
+    await _run(engine, _limit(concurrency), models.insert_dim_indicator, df, cache=cache)
+
+
+async def insert_dim_date(engine, df, cache=None, calendar=None, concurrency=1):
+    """
+    Async ``Database.models.insert_dim_date``.
+    """
+
+    return await _run(
+        engine, _limit(concurrency), models.insert_dim_date, df, cache=cache, calendar=calendar
+    )
+
+
+async def insert_fact_index(engine, df, method="executemany", cache=None, on_conflict="ignore", concurrency=1):
+    """
+    Async ``Database.models.insert_fact_index``.
+    """
+
+    _check_method(method)
+    return await _run(
+        engine,
+        _limit(concurrency),
+        models.insert_fact_index,
+        df,
+        method=method,
+        cache=cache,
+        on_conflict=on_conflict
+    )
+
+
+async def load_dimensions(engine, df, cache=None, calendar=None, concurrency=2):
+    """
+    Load the three dimensions of a frame, dim_date concurrently with
+    dim_series followed by dim_indicator (which looks up `series_key`).
+
+    returns: Database.date_dimension.DateKeyIndex
+        As ``insert_dim_date``.
+    """
+
+    limit = _limit(concurrency)
+
+    async def series_then_indicators():
+        await insert_dim_series(engine, df, cache=cache, concurrency=limit)
+        await insert_dim_indicator(engine, df, cache=cache, concurrency=limit)
+
+    _, calendar = await asyncio.gather(
+        series_then_indicators(),
+        insert_dim_date(engine, df, cache=cache, calendar=calendar, concurrency=limit)
+    )
+    return calendar
+
+
+async def load_fact_chunks(
+    engine,
+    df,
+    chunk_size=50_000,
+    concurrency=4,
+    method="executemany",
+    cache=None,
+    on_conflict="ignore",
+    run_id=None
+):
+    """
+    Async ``Database.models.load_fact_chunks``: the same chunks and
+    checkpoints, with up to `concurrency` chunks in flight on the event
+    loop instead of in worker threads.
+
+    returns: dict
+        ``{"inserted": int, "revised": int, "chunks": int, "resumed": int}``
+    """
+
+    models._check_fact_options(method, on_conflict)
+    _check_method(method)
+    limit = _limit(concurrency)
+
+    async with engine.connect() as conn:
+        fact_df = await conn.run_sync(models._fact_frame, df, cache)
+    chunks, run_id = models._plan_fact_chunks(fact_df, chunk_size, run_id)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(models._expire_checkpoints, run_id)
+    async with engine.connect() as conn:
+        committed = await conn.run_sync(models._committed_chunks, run_id)
+
+    async def load_chunk(chunk_no):
+        async with limit:
+            async with engine.begin() as conn:
+                return await conn.run_sync(
+                    models._load_fact_chunk, chunks[chunk_no], chunk_no, run_id, method, on_conflict
+                )
+
+    pending = [chunk_no for chunk_no in range(len(chunks)) if chunk_no not in committed]
+    counts = {"inserted": 0, "revised": 0, "chunks": len(chunks), "resumed": len(chunks) - len(pending)}
+
+    for result in await asyncio.gather(*(load_chunk(chunk_no) for chunk_no in pending)):
+        counts["inserted"] += result["inserted"]
+        counts["revised"] += result["revised"]
+
+    async with engine.begin() as conn:
+        await conn.run_sync(models._clear_checkpoints, run_id)
+
+    return counts
+
+
+async def load_batches(
+    engine,
+    frames,
+    method="executemany",
+    cache=None,
+    on_conflict="ignore",
+    chunk_size=50_000,
+    concurrency=4
+):
+    """
+    Async ``Database.models.load_batches``.
+
+    Batches are still loaded one after another, in the same order of
+    dimensions, facts, rollups and watermarks; the overlap happens within
+    a batch.
+
+    returns: dict
+        ``{"rows": int, "inserted": int, "revised": int}``
+    """
+
+    _check_method(method)
+    limit = _limit(concurrency)
+    counts = {"rows": 0, "inserted": 0, "revised": 0}
+    calendar = None
+
+    for df in frames:
+        calendar = await load_dimensions(engine, df, cache=cache, calendar=calendar, concurrency=limit)
+        result = await load_fact_chunks(
+            engine,
+            df,
+            chunk_size=chunk_size,
+            concurrency=limit,
+            method=method,
+            cache=cache,
+            on_conflict=on_conflict
+        )
+        await _run(engine, limit, models.refresh_rollups, df)
+        await _run(engine, limit, models.update_watermarks, df)
+
+        counts["rows"] += len(df)
+        counts["inserted"] += result["inserted"]
+        counts["revised"] += result["revised"]
+
+    return counts
+
+
+def run_load_batches(frames, url=None, profile="bulk_load", **kwargs):
+    """
+    Synchronous entry point: run ``load_batches`` on the shared async
+    engine for `url` (``DATABASE_URL`` by default) and return its counts.
+    """
+
+    engine = get_async_engine(profile, url)
+
+    async def main():
+        try:
+            return await load_batches(engine, frames, **kwargs)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
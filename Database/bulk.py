@@ -0,0 +1,100 @@
+class FrameCsvReader:
+    """
+    File-like view of a DataFrame as headerless CSV text.
+
+    The frame is rendered ``chunk_rows`` rows at a time as ``read`` is
+    called, so a COPY of millions of rows never holds more than one chunk
+    of CSV text in memory.
+
+    :param df: pandas.DataFrame
+        The frame to render.
+
+    :param columns: list[str]
+        The columns to write, in COPY column order.
+
+    :param chunk_rows: int
+        Number of rows rendered per chunk.
+    """
+
+    def __init__(self, df, columns, chunk_rows=50_000):
+        self._df = df[columns]
+        self._chunk_rows = chunk_rows
+        self._offset = 0
+        self._pending = ""
+
+    def _next_chunk(self):
+        chunk = self._df.iloc[self._offset:self._offset + self._chunk_rows]
+        self._offset += self._chunk_rows
+        return chunk.to_csv(header=False, index=False, lineterminator="\n")
+
+    def read(self, size=-1):
+        while (size < 0 or len(self._pending) < size) and self._offset < len(self._df):
+            self._pending += self._next_chunk()
+
+        if size < 0:
+            size = len(self._pending)
+
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def readline(self, size=-1):
+        while "\n" not in self._pending and self._offset < len(self._df):
+            self._pending += self._next_chunk()
+
+        end = self._pending.find("\n") + 1 or len(self._pending)
+        if 0 <= size < end:
+            end = size
+
+        line, self._pending = self._pending[:end], self._pending[end:]
+        return line
+
+    def chunks(self):
+        """
+        Yield the CSV text one chunk at a time.
+        """
+        while self._offset < len(self._df):
+            yield self._next_chunk()
+
+
+def copy_from_frame(conn, table, df, columns, chunk_rows=50_000):
+    """
+    Stream a DataFrame into a table with PostgreSQL ``COPY FROM STDIN``.
+
+    Works with both psycopg2 (``cursor.copy_expert``) and psycopg 3
+    (``cursor.copy``) connections.
+
+    :param conn: sqlalchemy.engine.Connection
+        A connection inside an open transaction.
+
+    :param table: str
+        The target table name.
+
+    :param df: pandas.DataFrame
+        The rows to copy.
+
+    :param columns: list[str]
+        The frame columns to copy, matching the table column names.
+
+    :param chunk_rows: int
+        Number of rows rendered to CSV per chunk.
+
+    returns: None
+    """
+
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    reader = FrameCsvReader(df, columns, chunk_rows)
+
+    cursor = conn.connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(sql, reader)
+        elif hasattr(cursor, "copy"):
+            with cursor.copy(sql) as copy:
+                for chunk in reader.chunks():
+                    copy.write(chunk)
+        else:
+            raise NotImplementedError(
+                "COPY requires a psycopg2 or psycopg (3) database driver"
+            )
+    finally:
+        cursor.close()
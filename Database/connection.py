@@ -1,17 +1,240 @@
 import os
-from sqlalchemy import create_engine, text
+import threading
 
-def Database_Connection():
-    DB_URL = os.getenv("DATABASE_URL")
-    print(DB_URL)
-    
-    if not DB_URL:
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.pool import StaticPool
+
+try:
+    from Database.dialect import sqlite_async_creator, sqlite_creator
+except ImportError:
+    # The Database image ships this directory on its own and runs
+    # `python connection.py`, with dialect.py next to this module.
+    from dialect import sqlite_async_creator, sqlite_creator
+
+# Engine settings per workload. `statement_timeout_ms` is applied on the
+# server for PostgreSQL; the remaining keys are passed to create_engine,
+# leaving out those the URL's dialect or pool does not accept.
+PROFILES = {
+    "default": {
+        "pool_pre_ping": True,
+    },
+    "bulk_load": {
+        "pool_pre_ping": True,
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 60,
+        "executemany_mode": "values_plus_batch",
+        "executemany_batch_page_size": 1_000,
+        "insertmanyvalues_page_size": 10_000,
+        "fast_executemany": True,
+        "statement_timeout_ms": 30 * 60 * 1000,
+    },
+    "query": {
+        "pool_pre_ping": True,
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "statement_timeout_ms": 60 * 1000,
+    },
+}
+
+POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle")
+
+# Options only understood by some DBAPI drivers, by (backend, driver).
+DRIVER_OPTIONS = {
+    "executemany_mode": {("postgresql", "psycopg2")},
+    "executemany_batch_page_size": {("postgresql", "psycopg2")},
+    "fast_executemany": {("mssql", "pyodbc")},
+}
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def engine_options(url, profile="default"):
+    """
+    The create_engine keyword arguments of a profile for a given URL.
+
+    :param url: str | sqlalchemy.engine.URL
+        The database URL.
+
+    :param profile: str
+        One of ``PROFILES``.
+
+    returns: dict
+    """
+
+    if profile not in PROFILES:
+        raise ValueError(f"profile must be one of {sorted(PROFILES)}, got {profile!r}")
+
+    url = make_url(url)
+    backend, driver = url.get_backend_name(), url.get_driver_name()
+    options = dict(PROFILES[profile])
+    timeout_ms = options.pop("statement_timeout_ms", None)
+
+    for name, drivers in DRIVER_OPTIONS.items():
+        if name in options and (backend, driver) not in drivers:
+            del options[name]
+
+    if backend == "sqlite":
+        # SQLite uses a single-connection or null pool that takes no sizing
+        for name in POOL_OPTIONS:
+            options.pop(name, None)
+        if url.database in (None, "", ":memory:"):
+            # One in-memory database shared by every thread of the process
+            options["poolclass"] = StaticPool
+            options["connect_args"] = {"check_same_thread": False}
+
+    if timeout_ms and driver == "asyncpg":
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    elif timeout_ms and backend == "postgresql":
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+
+    return options
+
+
+def get_engine(profile="default", url=None):
+    """
+    Return the process-wide engine for a URL and profile.
+
+    Engines are created on first use and reused afterwards, so every
+    caller in the process shares one connection pool per URL and profile.
+
+    :param profile: str
+        ``"default"``, ``"bulk_load"`` (larger pool, batched executemany,
+        long statement timeout) or ``"query"`` (small pool, short statement
+        timeout).
+
+    :param url: str | None
+        The database URL, ``DATABASE_URL`` by default. A ``sqlite://`` URL
+        gives the embedded development backend, see ``Database.dialect``.
+
+    returns: sqlalchemy.engine.Engine
+    """
+
+    url = url or os.getenv("DATABASE_URL")
+    if not url:
+        raise RuntimeError("DATABASE_URL environment variable not set")
+
+    with _engines_lock:
+        engine = _engines.get((url, profile))
+        if engine is None:
+            options = engine_options(url, profile)
+            if make_url(url).get_backend_name() == "sqlite":
+                options["creator"] = sqlite_creator(
+                    make_url(url).database or ":memory:",
+                    **options.pop("connect_args", {})
+                )
+            engine = create_engine(url, **options)
+            _engines[(url, profile)] = engine
+        return engine
+
+
+def get_async_engine(profile="default", url=None):
+    """
+    Return the process-wide ``AsyncEngine`` for a URL and profile.
+
+    A plain ``postgresql://`` URL is switched to the asyncpg driver and a
+    ``sqlite://`` URL to aiosqlite. Needs the ``asyncpg`` (or
+    ``aiosqlite``) and ``greenlet`` packages.
+
+    :param profile: str
+        The engine profile, see ``get_engine``.
+
+    :param url: str | None
+        The database URL, ``DATABASE_URL`` by default.
+
+    returns: sqlalchemy.ext.asyncio.AsyncEngine
+    """
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = url or os.getenv("DATABASE_URL")
+    if not url:
         raise RuntimeError("DATABASE_URL environment variable not set")
-    engine = create_engine(DB_URL, pool_pre_ping=True)
-    return engine
+
+    async_url = make_url(url)
+    if async_url.get_backend_name() == "postgresql":
+        async_url = async_url.set(drivername="postgresql+asyncpg")
+    elif async_url.get_backend_name() == "sqlite":
+        async_url = async_url.set(drivername="sqlite+aiosqlite")
+
+    with _engines_lock:
+        engine = _engines.get((url, f"{profile} async"))
+        if engine is None:
+            options = engine_options(async_url, profile)
+            if async_url.get_backend_name() == "sqlite":
+                options["async_creator"] = sqlite_async_creator(
+                    async_url.database or ":memory:",
+                    **options.pop("connect_args", {})
+                )
+            engine = create_async_engine(async_url, **options)
+            _engines[(url, f"{profile} async")] = engine
+        return engine
+
+
+def pool_stats():
+    """
+    Return the pool state of every registered engine.
+
+    returns: dict[str, dict]
+        Keyed by ``"<profile> <url without password>"``, with the pool
+        `size`, connections `checked_in` and `checked_out`, the current
+        `overflow` and SQLAlchemy's `status` line.
+    """
+
+    with _engines_lock:
+        engines = dict(_engines)
+
+    stats = {}
+    for (url, profile), engine in engines.items():
+        pool = getattr(engine, "sync_engine", engine).pool
+        name = f"{profile} {make_url(url).render_as_string(hide_password=True)}"
+        stats[name] = {
+            "pool": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "status": pool.status(),
+        }
+    return stats
+
+
+def dispose_engines():
+    """
+    Close the pools of all registered engines and forget them.
+    """
+
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+
+    for engine in engines:
+        if hasattr(engine, "sync_engine"):
+            # An AsyncEngine's connections can only be closed from its event
+            # loop, so its pool is dropped without closing them
+            engine.sync_engine.dispose(close=False)
+        else:
+            engine.dispose()
+
+
+def Database_Connection(profile="default"):
+    """
+    Return the shared engine for ``DATABASE_URL``.
+
+    :param profile: str
+        The engine profile, see ``get_engine``.
+
+    returns: sqlalchemy.engine.Engine
+    """
+
+    return get_engine(profile)
+
 
 if __name__== "__main__":
     engine = Database_Connection()
     with engine.connect() as conn:
         print(conn.execute(text("select 1")).scalar())
-    Database_Connection()
\ No newline at end of file
+    print(pool_stats())
@@ -0,0 +1,216 @@
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from Database.partitioning import ensure_fact_partitions
+
+
+def month_index(year, month):
+    """
+    Number of months since year 0, the position of a month on the calendar.
+    Works on scalars and arrays alike.
+    """
+
+    return np.asarray(year, dtype="int64") * 12 + np.asarray(month, dtype="int64") - 1
+
+
+def date_keys(year, month):
+    """
+    The YYYYMMDD `date_key` of the first day of each month, computed with
+    integer arithmetic. Works on scalars and arrays alike.
+    """
+
+    return np.asarray(year, dtype="int64") * 10000 + np.asarray(month, dtype="int64") * 100 + 1
+
+
+def frame_year_month(df):
+    """
+    The year and month of every row of a transformed frame, as arrays.
+
+    Uses the `year` and `month` columns when present, the `date` column
+    otherwise.
+    """
+
+    if "year" in df.columns and "month" in df.columns:
+        return df["year"].to_numpy(), df["month"].to_numpy()
+
+    dates = pd.to_datetime(df["date"])
+    return dates.dt.year.to_numpy(), dates.dt.month.to_numpy()
+
+
+def frame_date_keys(df):
+    """
+    The `date_key` of every row of a transformed frame.
+    """
+
+    return date_keys(*frame_year_month(df))
+
+
+def build_calendar(start, end):
+    """
+    Generate the dim_date rows for every month from `start` to `end`.
+
+    :param start: str | datetime.date | pandas.Timestamp
+        First month of the range (any day in it), e.g. ``"2016-01"``.
+
+    :param end: str | datetime.date | pandas.Timestamp
+        Last month of the range, inclusive.
+
+    returns: pandas.DataFrame
+        One row per month with the dim_date columns.
+    """
+
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    return _calendar_rows(
+        np.arange(month_index(start.year, start.month), month_index(end.year, end.month) + 1)
+    )
+
+
+def _calendar_rows(months):
+    year = months // 12
+    month = months % 12 + 1
+    month_names = np.array(calendar.month_name, dtype=object)
+
+    return pd.DataFrame({
+        "date_key": date_keys(year, month),
+        "date": pd.to_datetime(pd.DataFrame({"year": year, "month": month, "day": 1})).dt.date,
+        "year": year,
+        "quarter": (month - 1) // 3 + 1,
+        "month": month,
+        "month_name": month_names[month],
+        "year_month": pd.Series(year).astype(str) + "-" + pd.Series(month).astype(str).str.zfill(2),
+    })
+
+
+class DateKeyIndex:
+    """
+    In-memory index of the months present in dim_date.
+
+    Tells whether a range of months is already in dim_date without a
+    query. The `date_key` of a month needs no lookup, ``date_keys``
+    computes it from the year and month.
+
+    :param start: int
+        ``month_index`` of the first covered month.
+
+    :param end: int
+        ``month_index`` of the last covered month.
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        months = np.arange(start, end + 1)
+        self.keys = date_keys(months // 12, months % 12 + 1)
+
+    def covers(self, start, end):
+        return self.start <= start and end <= self.end
+
+    def pairs(self):
+        """
+        Yield ``(date, date_key)`` for every covered month.
+        """
+
+        for key in self.keys.tolist():
+            yield date(key // 10000, key // 100 % 100, 1), key
+
+
+def ensure_calendar_for(engine, df, index=None):
+    """
+    ``ensure_calendar`` for the months of a transformed frame.
+    """
+
+    months = month_index(*frame_year_month(df))
+    first, last = int(months.min()), int(months.max())
+    return ensure_calendar(
+        engine,
+        pd.Timestamp(year=first // 12, month=first % 12 + 1, day=1),
+        pd.Timestamp(year=last // 12, month=last % 12 + 1, day=1),
+        index
+    )
+
+
+def ensure_calendar(engine, start, end, index=None):
+    """
+    Make sure dim_date holds every month from `start` to `end`.
+
+    dim_date is only written when the requested range is not already
+    covered. Missing months are generated with ``build_calendar`` and
+    inserted, existing ones are left alone. The fact_index partitions of
+    their years are created in the same transaction.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) database.
+
+    :param start: str | datetime.date | pandas.Timestamp
+        First month needed.
+
+    :param end: str | datetime.date | pandas.Timestamp
+        Last month needed, inclusive.
+
+    :param index: DateKeyIndex | None
+        A previously returned index. When it already covers the range no
+        query is sent at all.
+
+    returns: DateKeyIndex
+        An index covering at least the requested range.
+    """
+
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    first = int(month_index(start.year, start.month))
+    last = int(month_index(end.year, end.month))
+
+    if index is not None and index.covers(first, last):
+        return index
+
+    with engine.connect() as conn:
+        row = conn.execute(text("""
+            SELECT min(date_key), max(date_key), count(*)
+            FROM public.dim_date
+        """)).one()
+
+    months = np.arange(first, last + 1)
+    if row[2]:
+        have_first = int(month_index(row[0] // 10000, row[0] // 100 % 100))
+        have_last = int(month_index(row[1] // 10000, row[1] // 100 % 100))
+        first, last = min(first, have_first), max(last, have_last)
+        months = np.arange(first, last + 1)
+
+        # A contiguous calendar only needs the months outside it, one with
+        # gaps (e.g. derived from facts by older loads) is filled in full.
+        if row[2] == have_last - have_first + 1:
+            months = months[(months < have_first) | (months > have_last)]
+            if len(months) == 0:
+                return DateKeyIndex(have_first, have_last)
+
+    sql = text("""
+        INSERT INTO public.dim_date (
+            date_key,
+            date,
+            year,
+            quarter,
+            month,
+            month_name,
+            year_month
+        )
+        VALUES (
+            :date_key,
+            :date,
+            :year,
+            :quarter,
+            :month,
+            :month_name,
+            :year_month
+        )
+        ON CONFLICT (date_key) DO NOTHING
+    """)
+
+    with engine.begin() as conn:
+        ensure_fact_partitions(conn, months.min() // 12, months.max() // 12)
+        conn.execute(sql, _calendar_rows(months).to_dict("records"))
+
+    return DateKeyIndex(int(first), int(last))
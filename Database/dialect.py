@@ -0,0 +1,272 @@
+"""
+The SQL that differs between warehouse backends.
+
+PostgreSQL (Supabase) is the production warehouse. SQLite, from the
+standard library, is an embedded stand-in for development, tests and CI
+benchmarks, e.g. ``DATABASE_URL=sqlite:///warehouse.db``. The loaders in
+``Database.models`` look the backend of their engine or connection up
+with ``get_dialect`` and only branch where the SQL has to differ:
+
+- the schema DDL (``SQLITE_SCHEMA``): no BIGSERIAL, partitions, plpgsql
+  functions or INCLUDE/BRIN indexes,
+- ``now()`` and ``GREATEST``,
+- the fact merge and the rollup refresh, which use writable CTEs, xmax,
+  DISTINCT ON, unnest and array_agg on PostgreSQL.
+
+SQLite has no schemas, so ``sqlite_creator`` attaches the database file
+under the name ``public`` on every connection and the ``public.<table>``
+names used throughout resolve unchanged.
+
+Scripts of several statements are sent one statement at a time with
+``split_statements``, since asyncpg and sqlite3 only execute one
+statement per call.
+"""
+
+import re
+import sqlite3
+
+
+class Dialect:
+    """
+    What the loaders need to know about a backend.
+
+    :param name: str
+        SQLAlchemy's dialect name.
+
+    :param now: str
+        SQL for the current timestamp.
+
+    :param greatest: str
+        SQL function returning the larger of two values.
+
+    :param supports_partitions: bool
+        Whether fact_index can be range-partitioned.
+
+    :param supports_copy: bool
+        Whether rows can be streamed with ``COPY FROM STDIN``.
+    """
+
+    def __init__(self, name, now, greatest, supports_partitions, supports_copy):
+        self.name = name
+        self.now = now
+        self.greatest = greatest
+        self.supports_partitions = supports_partitions
+        self.supports_copy = supports_copy
+
+    def __repr__(self):
+        return f"Dialect({self.name!r})"
+
+
+POSTGRESQL = Dialect(
+    "postgresql",
+    now="now()",
+    greatest="GREATEST",
+    supports_partitions=True,
+    supports_copy=True
+)
+
+SQLITE = Dialect(
+    "sqlite",
+    now="CURRENT_TIMESTAMP",
+    greatest="max",
+    supports_partitions=False,
+    supports_copy=False
+)
+
+DIALECTS = {dialect.name: dialect for dialect in (POSTGRESQL, SQLITE)}
+
+
+def get_dialect(connectable):
+    """
+    Return the ``Dialect`` of an engine or connection.
+
+    Anything that is not a known backend is treated as PostgreSQL, the
+    production default.
+    """
+
+    name = getattr(getattr(connectable, "dialect", None), "name", None)
+    return DIALECTS.get(name, POSTGRESQL) if isinstance(name, str) else POSTGRESQL
+
+
+def sqlite_creator(database, **connect_args):
+    """
+    Connection factory for a SQLite engine whose tables live in ``public``.
+
+    Each connection opens an empty in-memory main database and attaches
+    `database` to it as ``public``, so ``public.<table>`` names resolve and
+    unqualified names (temporary tables, foreign keys) still do. Attaching
+    the file to itself instead would hold two locks on it and deadlock on
+    the first write.
+
+    :param database: str
+        The database file, or ``":memory:"``.
+
+    :param connect_args:
+        Passed to ``sqlite3.connect``. Connections may move between the
+        pool's threads, so ``check_same_thread`` is off by default.
+
+    returns: Callable[[], sqlite3.Connection]
+        For ``create_engine(..., creator=...)``.
+    """
+
+    connect_args.setdefault("check_same_thread", False)
+
+    def connect():
+        connection = sqlite3.connect(":memory:", **connect_args)
+        connection.execute("ATTACH DATABASE ? AS public", (database,))
+        return connection
+
+    return connect
+
+
+def sqlite_async_creator(database, **connect_args):
+    """
+    ``sqlite_creator`` for an aiosqlite ``AsyncEngine``.
+
+    returns: Callable[[], Awaitable[aiosqlite.Connection]]
+        For ``create_async_engine(..., async_creator=...)``.
+    """
+
+    import aiosqlite
+
+    connect_args.setdefault("check_same_thread", False)
+
+    async def connect():
+        connection = await aiosqlite.connect(":memory:", **connect_args)
+        await connection.execute("ATTACH DATABASE ? AS public", (database,))
+        return connection
+
+    return connect
+
+
+# A dollar-quoted body, a string literal, a line comment or a statement
+# separator, in the order they are tried at each position
+_SCRIPT_TOKENS = re.compile(r"\$\$.*?\$\$|'(?:[^']|'')*'|--[^\n]*|;", re.DOTALL)
+
+
+def split_statements(script):
+    """
+    Split a SQL script into its statements.
+
+    Semicolons inside ``$$``-quoted function bodies, string literals and
+    ``--`` comments do not end a statement.
+
+    :param script: str
+
+    returns: list[str]
+        The statements without their terminating semicolons, empty ones
+        left out.
+    """
+
+    statements = []
+    start = 0
+    for token in _SCRIPT_TOKENS.finditer(script):
+        if token.group() == ";":
+            statements.append(script[start:token.start()])
+            start = token.end()
+    statements.append(script[start:])
+
+    return [
+        statement.strip() for statement in statements
+        if re.sub(r"--[^\n]*", "", statement).strip()
+    ]
+
+
+# The tables of Database.models.Create_Tables, one statement each as
+# sqlite3 executes a single statement at a time.
+SQLITE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS public.dim_series (
+        series_key   INTEGER PRIMARY KEY AUTOINCREMENT,
+        series_code  TEXT UNIQUE NOT NULL,
+        series_name  TEXT NOT NULL,
+        frequency    TEXT NOT NULL,
+        base_period  TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.dim_indicator (
+        indicator_key  INTEGER PRIMARY KEY AUTOINCREMENT,
+        series_key     BIGINT NOT NULL
+            REFERENCES dim_series(series_key),
+        indicator_code TEXT UNIQUE NOT NULL,
+        category       TEXT NOT NULL,
+        subcategory    TEXT,
+        unit           TEXT NOT NULL,
+        content_hash   TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.dim_date (
+        date_key    INTEGER PRIMARY KEY,
+        date        DATE UNIQUE NOT NULL,
+        year        SMALLINT NOT NULL,
+        quarter     SMALLINT NOT NULL,
+        month       SMALLINT NOT NULL,
+        month_name  TEXT NOT NULL,
+        year_month  TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.fact_index (
+        indicator_key  BIGINT NOT NULL
+            REFERENCES dim_indicator(indicator_key),
+        date_key       INTEGER NOT NULL
+            REFERENCES dim_date(date_key),
+        index_value    NUMERIC(10,2) NOT NULL,
+        load_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (indicator_key, date_key)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS public.fact_index_date_key_idx
+        ON fact_index (date_key, indicator_key, index_value)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.load_checkpoint (
+        run_id       TEXT NOT NULL,
+        chunk_no     INTEGER NOT NULL,
+        row_count    INTEGER NOT NULL,
+        committed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, chunk_no)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.load_watermark (
+        indicator_code      TEXT PRIMARY KEY,
+        high_water_date_key INTEGER NOT NULL,
+        updated_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.fact_index_quarterly (
+        indicator_key  BIGINT NOT NULL
+            REFERENCES dim_indicator(indicator_key),
+        year           SMALLINT NOT NULL,
+        quarter        SMALLINT NOT NULL,
+        avg_value      NUMERIC(12,4) NOT NULL,
+        min_value      NUMERIC(10,2) NOT NULL,
+        max_value      NUMERIC(10,2) NOT NULL,
+        last_value     NUMERIC(10,2) NOT NULL,
+        last_date_key  INTEGER NOT NULL,
+        month_count    SMALLINT NOT NULL,
+        refreshed_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (indicator_key, year, quarter)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS public.fact_index_yearly (
+        indicator_key  BIGINT NOT NULL
+            REFERENCES dim_indicator(indicator_key),
+        year           SMALLINT NOT NULL,
+        avg_value      NUMERIC(12,4) NOT NULL,
+        min_value      NUMERIC(10,2) NOT NULL,
+        max_value      NUMERIC(10,2) NOT NULL,
+        last_value     NUMERIC(10,2) NOT NULL,
+        last_date_key  INTEGER NOT NULL,
+        month_count    SMALLINT NOT NULL,
+        refreshed_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (indicator_key, year)
+    )
+    """,
+)
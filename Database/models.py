@@ -1,11 +1,40 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import text
-from Database.connection import Database_Connection
-from DataIngestion.extract import Fetch_Data
-from Transformation.Transform import transform_json_to_df
+from Database.bulk import copy_from_frame
+from Database.connection import Database_Connection, pool_stats
+from Database.dialect import SQLITE, SQLITE_SCHEMA, get_dialect, split_statements
+from Database.partitioning import (
+    FACT_INDEXES,
+    FACT_PARTITION_FUNCTION,
+    fact_index_ddl,
+    partition_fact_index,
+)
+from Database.date_dimension import (
+    date_keys,
+    ensure_calendar,
+    ensure_calendar_for,
+    frame_date_keys,
+    frame_year_month,
+)
+from Database.repository import KeyCache
+import numpy as np
 import pandas as pd
 
 
-def Create_Tables(engine):
+FACT_LOAD_METHODS = ("executemany", "copy")
+FACT_CONFLICT_MODES = ("ignore", "update")
+
+# Checkpoints of chunked loads that failed and were never resumed, e.g.
+# because the input changed and with it the run id, are deleted by the
+# next chunked load once they are this old.
+CHECKPOINT_MAX_AGE_HOURS = 7 * 24
+
+
+def Create_Tables(engine, partitioned=False):
     """
     Create the core data warehouse tables in the public schema.
 
@@ -14,21 +43,52 @@ def Create_Tables(engine):
     - dim_indicator: Stores indicator-level metadata linked to a series.
     - dim_date: Date dimension table used for time-based analysis.
     - fact_index: Fact table storing index values by indicator and date.
+    - load_watermark: Control table holding the latest loaded date_key
+      per indicator, used by incremental loads.
+    - load_checkpoint: Control table of the committed chunks of an
+      in-progress chunked fact load, used to resume it.
+    - fact_index_quarterly / fact_index_yearly: Rollups of fact_index per
+      indicator and quarter or year, kept current by ``refresh_rollups``.
+
+    dim_indicator also carries a `content_hash` of the series' monthly
+    values, used to skip series that did not change since the last load.
 
-    The function executes all CREATE TABLE statements inside a single
-    database transaction to ensure atomicity.
+    fact_index gets a secondary index leading on `date_key` for date range
+    queries across indicators and a BRIN index on `load_timestamp`. When
+    created with `partitioned`, it is range-partitioned by `date_key` with
+    one partition per year; partitions are added as dim_date grows (see
+    ``Database.partitioning``). An existing plain fact_index is left as
+    is, ``partition_fact_index`` converts it.
+
+    The function executes all CREATE TABLE statements, one at a time,
+    inside a single database transaction to ensure atomicity.
+
+    On SQLite the same tables are created from
+    ``Database.dialect.SQLITE_SCHEMA``, without partitions or the BRIN
+    index.
 
     
     :param engine: sqlalchemy.engine.Engine
         A SQLAlchemy Engine instance connected to the target PostgreSQL
-        (Supabase) database.
+        (Supabase) database, or to a SQLite database.
+
+    :param partitioned: bool
+        Create fact_index partitioned by year of `date_key`. PostgreSQL
+        only.
 
     returns: None
     """
 
-    with engine.begin() as conn:
-        conn.execute(
-            text("""
+    if get_dialect(engine) is SQLITE:
+        if partitioned:
+            raise ValueError("fact_index can only be partitioned on PostgreSQL")
+        with engine.begin() as conn:
+            for statement in SQLITE_SCHEMA:
+                conn.execute(text(statement))
+        return
+
+    script = (
+            """
                 CREATE TABLE IF NOT EXISTS public.dim_series (
                     series_key BIGSERIAL PRIMARY KEY,
                     series_code TEXT UNIQUE NOT NULL, 
@@ -47,6 +107,9 @@ def Create_Tables(engine):
                     subcategory    TEXT,                 
                     unit           TEXT NOT NULL     
                  );
+
+                ALTER TABLE public.dim_indicator
+                    ADD COLUMN IF NOT EXISTS content_hash TEXT;
                  
                 CREATE TABLE IF NOT EXISTS public.dim_date (
                     date_key    INTEGER PRIMARY KEY, 
@@ -58,25 +121,68 @@ def Create_Tables(engine):
                     year_month  TEXT NOT NULL        
                 );
                  
-                CREATE TABLE IF NOT EXISTS public.fact_index (
-                    indicator_key BIGINT NOT NULL
-                        REFERENCES public.dim_indicator(indicator_key),
+            """
+            + fact_index_ddl(partitioned)
+            + FACT_PARTITION_FUNCTION
+            + FACT_INDEXES
+            + """
+                SELECT public.ensure_fact_partitions(min(year), max(year))
+                FROM public.dim_date;
 
-                    date_key INTEGER NOT NULL
-                        REFERENCES public.dim_date(date_key),
+                CREATE TABLE IF NOT EXISTS public.load_checkpoint (
+                    run_id       TEXT NOT NULL,
+                    chunk_no     INTEGER NOT NULL,
+                    row_count    INTEGER NOT NULL,
+                    committed_at TIMESTAMP DEFAULT now(),
+                    PRIMARY KEY (run_id, chunk_no)
+                );
 
-                    index_value NUMERIC(10,2) NOT NULL,
+                CREATE TABLE IF NOT EXISTS public.load_watermark (
+                    indicator_code      TEXT PRIMARY KEY,
+                    high_water_date_key INTEGER NOT NULL,
+                    updated_at          TIMESTAMP DEFAULT now()
+                );
 
-                    load_timestamp TIMESTAMP DEFAULT now(),
+                CREATE TABLE IF NOT EXISTS public.fact_index_quarterly (
+                    indicator_key  BIGINT NOT NULL
+                        REFERENCES public.dim_indicator(indicator_key),
+                    year           SMALLINT NOT NULL,
+                    quarter        SMALLINT NOT NULL,
+                    avg_value      NUMERIC(12,4) NOT NULL,
+                    min_value      NUMERIC(10,2) NOT NULL,
+                    max_value      NUMERIC(10,2) NOT NULL,
+                    last_value     NUMERIC(10,2) NOT NULL,
+                    last_date_key  INTEGER NOT NULL,
+                    month_count    SMALLINT NOT NULL,
+                    refreshed_at   TIMESTAMP DEFAULT now(),
+                    PRIMARY KEY (indicator_key, year, quarter)
+                );
 
-                    PRIMARY KEY (indicator_key, date_key)
+                CREATE TABLE IF NOT EXISTS public.fact_index_yearly (
+                    indicator_key  BIGINT NOT NULL
+                        REFERENCES public.dim_indicator(indicator_key),
+                    year           SMALLINT NOT NULL,
+                    avg_value      NUMERIC(12,4) NOT NULL,
+                    min_value      NUMERIC(10,2) NOT NULL,
+                    max_value      NUMERIC(10,2) NOT NULL,
+                    last_value     NUMERIC(10,2) NOT NULL,
+                    last_date_key  INTEGER NOT NULL,
+                    month_count    SMALLINT NOT NULL,
+                    refreshed_at   TIMESTAMP DEFAULT now(),
+                    PRIMARY KEY (indicator_key, year)
                 );
 
-            """)
-        )
+            """
+    )
+
+    # One statement per call: asyncpg (Database.async_models) prepares
+    # each statement and rejects a multi-statement script
+    with engine.begin() as conn:
+        for statement in split_statements(script):
+            conn.execute(text(statement))
 
 
-def insert_dim_series(engine, df):
+def insert_dim_series(engine, df, cache=None):
     """
     Insert unique series records into the dim_series dimension table.
 
@@ -99,11 +205,15 @@ def insert_dim_series(engine, df):
         - frequency
         - base_period
 
+    :param cache: Database.repository.KeyCache | None
+        When given, the keys of newly inserted series are taken from a
+        RETURNING clause and added to the cache.
+
     returns: None
         
     """
 
-    sql = text("""
+    sql = """
         INSERT INTO public.dim_series (series_code, series_name, frequency, base_period)
         SELECT DISTINCT
             :series_code,
@@ -111,7 +221,7 @@ def insert_dim_series(engine, df):
             :frequency,
             :base_period
         ON CONFLICT (series_code) DO NOTHING
-    """)
+    """
 
     records = (
         df[["series_code", "series_name", "frequency", "base_period"]]
@@ -120,11 +230,78 @@ def insert_dim_series(engine, df):
     )
 
     with engine.begin() as conn:
-        conn.execute(sql, records)
+        if cache is None:
+            conn.execute(text(sql), records)
+        else:
+            returning = text(sql + " RETURNING series_code, series_key")
+            cache.add("series", _insert_returning(conn, returning, records))
+
+
+
+def insert_dim_indicator(engine, df, cache=None):
+    """
+    Insert unique indicator records into the dim_indicator dimension table.
+
+    Each indicator is linked to its series through `series_key`, which is
+    resolved from `dim_series` by `series_code`, or from the key cache when
+    one is given. Existing indicators are skipped with ON CONFLICT DO
+    NOTHING.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) database.
+
+    :param df: pandas.DataFrame
+        A transformed DataFrame containing at least the following columns:
+        - series_code
+        - indicator_code
+        - category
+        - subcategory
+        - unit
+
+    :param cache: Database.repository.KeyCache | None
+        When given, `series_key` comes from the cache instead of a join per
+        row, and the keys of newly inserted indicators are added to it.
+
+    returns: None
+
+    """
+
+    records = (
+        df[[
+            "series_code",
+            "indicator_code",
+            "category",
+            "subcategory",
+            "unit"
+        ]]
+        .drop_duplicates()
+    )
 
+    if cache is None:
+        sql = text("""
+            INSERT INTO public.dim_indicator (
+                series_key,
+                indicator_code,
+                category,
+                subcategory,
+                unit
+            )
+            SELECT
+                s.series_key,
+                :indicator_code,
+                :category,
+                :subcategory,
+                :unit
+            FROM public.dim_series s
+            WHERE s.series_code = :series_code
+            ON CONFLICT (indicator_code) DO NOTHING
+        """)
 
+        with engine.begin() as conn:
+            conn.execute(sql, records.to_dict(orient="records"))
+        return
 
-def insert_dim_indicator(engine, df):
     sql = text("""
         INSERT INTO public.dim_indicator (
             series_key,
@@ -133,41 +310,41 @@ def insert_dim_indicator(engine, df):
             subcategory,
             unit
         )
-        SELECT
-            s.series_key,
+        VALUES (
+            :series_key,
             :indicator_code,
             :category,
             :subcategory,
             :unit
-        FROM public.dim_series s
-        WHERE s.series_code = :series_code
+        )
         ON CONFLICT (indicator_code) DO NOTHING
+        RETURNING indicator_code, indicator_key
     """)
 
-    records = (
-        df[[
-            "series_code",
-            "indicator_code",
-            "category",
-            "subcategory",
-            "unit"
-        ]]
-        .drop_duplicates()
-        .to_dict(orient="records")
-    )
-
     with engine.begin() as conn:
-        conn.execute(sql, records)
+        records = records.assign(
+            series_key=cache.lookup("series", records["series_code"], conn)
+        )
+        records = (
+            records.dropna(subset=["series_key"])
+            .astype({"series_key": "int64"})
+            .drop(columns="series_code")
+        )
+        cache.add(
+            "indicator",
+            _insert_returning(conn, sql, records.to_dict(orient="records"))
+        )
 
 
-def insert_dim_date(engine, df):
+def insert_dim_date(engine, df, cache=None, calendar=None):
     """
-    Populate the dim_date date dimension table from a transformed DataFrame.
+    Make sure the dim_date date dimension covers a transformed DataFrame.
 
-    This function derives unique date records from the input DataFrame,
-    generates a surrogate `date_key` in YYYYMMDD format, and inserts the
-    resulting rows into the `dim_date` table. Duplicate dates are ignored
-    using PostgreSQL's ON CONFLICT DO NOTHING strategy.
+    dim_date is a monthly calendar with a surrogate `date_key` in YYYYMMDD
+    format. Rather than deriving date rows from every frame, the months
+    spanned by the frame are checked against the calendar already in the
+    table, and only a range that grows is generated (with vectorized
+    arithmetic, see ``Database.date_dimension``) and inserted.
 
     The date dimension enables efficient time-based analysis in the
     warehouse and supports tools such as Power BI for filtering and
@@ -178,63 +355,30 @@ def insert_dim_date(engine, df):
         (Supabase) database.
 
     :param df: pandas.DataFrame
-        A transformed DataFrame containing at least the following columns:
-        - date (datetime or string convertible to datetime)
-        - year
-        - quarter
-        - month
-        - month_name
-        - year_month
-
-    returns: None
-
-    """
+        A transformed DataFrame containing `year` and `month`, or `date`.
 
-    date_df = (
-        df[[
-            "date",
-            "year",
-            "quarter",
-            "month",
-            "month_name",
-            "year_month"
-        ]]
-        .drop_duplicates()
-        .copy()
-    )
+    :param cache: Database.repository.KeyCache | None
+        When given, the keys of the covered months are added to it.
 
-    date_df["date"] = pd.to_datetime(date_df["date"])
-    date_df["date_key"] = date_df["date"].dt.strftime("%Y%m%d").astype(int)
+    :param calendar: Database.date_dimension.DateKeyIndex | None
+        The index returned by a previous call. When it already covers the
+        frame, the database is not queried at all.
 
-    sql = text("""
-        INSERT INTO public.dim_date (
-            date_key,
-            date,
-            year,
-            quarter,
-            month,
-            month_name,
-            year_month
-        )
-        VALUES (
-            :date_key,
-            :date,
-            :year,
-            :quarter,
-            :month,
-            :month_name,
-            :year_month
-        )
-        ON CONFLICT (date_key) DO NOTHING;
-    """)
+    returns: Database.date_dimension.DateKeyIndex
+        The calendar range now present in dim_date.
 
-    with engine.begin() as conn:
-        conn.execute(sql, date_df.to_dict("records"))
+    """
 
+    if df.empty:
+        return calendar
 
+    covered = ensure_calendar_for(engine, df, calendar)
+    if cache is not None and covered is not calendar:
+        cache.add("date", covered.pairs())
+    return covered
 
 
-def insert_fact_index(engine, df):
+def insert_fact_index(engine, df, method="executemany", cache=None, on_conflict="ignore"):
     """
     Populate the fact_index table with index values at the indicator–date grain.
 
@@ -250,7 +394,20 @@ def insert_fact_index(engine, df):
     Duplicate fact rows are prevented using a composite primary key
     (indicator_key, date_key) and PostgreSQL's ON CONFLICT DO NOTHING
     clause, ensuring idempotent loads.
-    
+
+    Two load methods are available:
+
+    - ``"executemany"`` sends one INSERT ... SELECT per row.
+    - ``"copy"`` streams the rows into a temporary staging table with
+      ``COPY FROM STDIN`` and merges them into `fact_index` with a single
+      set-based INSERT ... SELECT ... JOIN. This needs a psycopg2 or
+      psycopg connection and is much faster for large loads.
+
+    With ``on_conflict="update"`` StatsSA revisions are applied: the rows
+    are always staged and merged in one statement, and an existing fact is
+    updated (value and `load_timestamp`) only when its `index_value`
+    actually changed.
+
     :param engine: sqlalchemy.engine.Engine
         An active SQLAlchemy engine connected to the PostgreSQL
         (Supabase) data warehouse.
@@ -261,56 +418,1149 @@ def insert_fact_index(engine, df):
         - date           : datetime or string convertible to datetime
         - index_value    : numeric
 
-    returns: None
+    :param method: str
+        ``"executemany"`` (default) or ``"copy"``.
+
+    :param cache: Database.repository.KeyCache | None
+        When given, `indicator_key` and `date_key` are resolved in process
+        and plain (indicator_key, date_key, index_value) rows are sent,
+        without a lookup per row on the server. Rows whose indicator is
+        unknown are skipped, as they are without the cache.
+
+    :param on_conflict: str
+        ``"ignore"`` (default) keeps existing facts, ``"update"`` applies
+        revised values.
+
+    returns: dict
+        ``{"inserted": int, "revised": int}``. For the row-by-row
+        executemany path `inserted` is the driver's rowcount, which some
+        drivers report as -1.
 
     """
 
-    fact_df = df.copy()
-    fact_df["date"] = pd.to_datetime(fact_df["date"])
-    fact_df["date_key"] = fact_df["date"].dt.strftime("%Y%m%d").astype(int)
+    _check_fact_options(method, on_conflict)
 
-    sql = text("""
-        INSERT INTO public.fact_index (
-            indicator_key,
-            date_key,
-            index_value
+    with engine.begin() as conn:
+        fact_df = _fact_frame(conn, df, cache)
+        return _insert_fact_frame(conn, fact_df, method, on_conflict)
+
+
+def _check_fact_options(method, on_conflict):
+    if method not in FACT_LOAD_METHODS:
+        raise ValueError(
+            f"Unknown fact load method {method!r}, expected one of {FACT_LOAD_METHODS}"
+        )
+    if on_conflict not in FACT_CONFLICT_MODES:
+        raise ValueError(
+            f"Unknown conflict mode {on_conflict!r}, expected one of {FACT_CONFLICT_MODES}"
+        )
+
+
+def _insert_fact_frame(conn, fact_df, method, on_conflict):
+    """
+    Insert a frame prepared by ``_fact_frame`` inside an open transaction.
+    """
+
+    if method == "copy" or on_conflict == "update":
+        source = _stage_facts(conn, fact_df, method)
+        return _merge_facts(conn, source, on_conflict)
+
+    if "indicator_key" not in fact_df.columns:
+        sql = text("""
+            INSERT INTO public.fact_index (
+                indicator_key,
+                date_key,
+                index_value
+            )
+            SELECT
+                i.indicator_key,
+                :date_key,
+                :index_value
+            FROM public.dim_indicator i
+            WHERE i.indicator_code = :indicator_code
+            ON CONFLICT (indicator_key, date_key) DO NOTHING
+        """)
+    else:
+        sql = text("""
+            INSERT INTO public.fact_index (
+                indicator_key,
+                date_key,
+                index_value
+            )
+            VALUES (
+                :indicator_key,
+                :date_key,
+                :index_value
+            )
+            ON CONFLICT (indicator_key, date_key) DO NOTHING
+        """)
+
+    result = conn.execute(sql, fact_df.to_dict(orient="records"))
+    return {"inserted": result.rowcount, "revised": 0}
+
+
+def _fact_frame(conn, df, cache):
+    """
+    Reduce a transformed frame to the fact columns.
+
+    `date_key` is computed arithmetically from the year and month. Without
+    a cache the rows keep their `indicator_code` for the server to
+    resolve. With one, `indicator_key` is resolved in process and rows with
+    an unknown indicator are dropped.
+    """
+
+    # float32 index values from the compact schema are rounded back to the
+    # two decimals stored in NUMERIC(10,2).
+    index_value = df["index_value"].astype("float64").round(2)
+
+    if cache is None:
+        return pd.DataFrame({
+            "indicator_code": df["indicator_code"].astype(object),
+            "date_key": frame_date_keys(df),
+            "index_value": index_value,
+        })
+
+    fact_df = pd.DataFrame({
+        "indicator_key": cache.lookup("indicator", df["indicator_code"], conn),
+        "date_key": frame_date_keys(df),
+        "index_value": index_value,
+    })
+    return fact_df.dropna(subset=["indicator_key"]).astype(
+        {"indicator_key": "int64", "date_key": "int64"}
+    )
+
+
+def _stage_facts(conn, fact_df, method):
+    """
+    Load fact rows into a temporary staging table.
+
+    The table is dropped on commit, so concurrent loads on separate
+    connections do not see each other's rows. Rows are streamed with COPY
+    for the ``"copy"`` method and sent with executemany otherwise, as they
+    are on SQLite. SQLite has neither COPY nor ON COMMIT DROP and creates
+    the table outside the load's transaction, so the staging tables a
+    failed load left on the connection are dropped here first.
+
+    returns: str
+        A SELECT producing (indicator_key, date_key, index_value) from the
+        staged rows.
+    """
+
+    if "indicator_key" in fact_df.columns:
+        key_column = "indicator_key BIGINT NOT NULL"
+        source = """
+            SELECT s.indicator_key, s.date_key, s.index_value
+            FROM stg_fact_index s
+        """
+    else:
+        key_column = "indicator_code TEXT NOT NULL"
+        source = """
+            SELECT i.indicator_key, s.date_key, s.index_value
+            FROM stg_fact_index s
+            JOIN public.dim_indicator i
+                ON i.indicator_code = s.indicator_code
+        """
+
+    dialect = get_dialect(conn)
+    if dialect is SQLITE:
+        conn.execute(text("DROP TABLE IF EXISTS temp.stg_fact_index"))
+        conn.execute(text("DROP TABLE IF EXISTS temp.stg_fact_merge"))
+    conn.execute(text(f"""
+        CREATE TEMPORARY TABLE stg_fact_index (
+            {key_column},
+            date_key       INTEGER NOT NULL,
+            index_value    NUMERIC(10,2) NOT NULL
+        ){"" if dialect is SQLITE else " ON COMMIT DROP"}
+    """))
+
+    columns = list(fact_df.columns)
+    if method == "copy" and dialect.supports_copy:
+        copy_from_frame(conn, "stg_fact_index", fact_df, columns)
+    else:
+        conn.execute(
+            text(f"""
+                INSERT INTO stg_fact_index ({", ".join(columns)})
+                VALUES ({", ".join(":" + column for column in columns)})
+            """),
+            fact_df.to_dict(orient="records")
+        )
+
+    return source
+
+
+def _merge_facts(conn, source, on_conflict):
+    """
+    Merge staged facts into fact_index with one set-based statement.
+
+    Duplicate keys within the staged rows are collapsed first, because
+    ON CONFLICT DO UPDATE may not touch the same row twice. ``xmax = 0``
+    tells newly inserted rows apart from updated ones.
+
+    returns: dict
+        ``{"inserted": int, "revised": int}``.
+    """
+
+    if get_dialect(conn) is SQLITE:
+        return _merge_facts_sqlite(conn, source, on_conflict)
+
+    if on_conflict == "update":
+        conflict = """
+            DO UPDATE
+            SET index_value = EXCLUDED.index_value,
+                load_timestamp = now()
+            WHERE public.fact_index.index_value IS DISTINCT FROM EXCLUDED.index_value
+        """
+    else:
+        conflict = "DO NOTHING"
+
+    row = conn.execute(text(f"""
+        WITH merged AS (
+            INSERT INTO public.fact_index (
+                indicator_key,
+                date_key,
+                index_value
+            )
+            SELECT DISTINCT ON (src.indicator_key, src.date_key)
+                src.indicator_key,
+                src.date_key,
+                src.index_value
+            FROM ({source}) src
+            ON CONFLICT (indicator_key, date_key) {conflict}
+            RETURNING (xmax = 0) AS inserted
         )
         SELECT
-            i.indicator_key,
-            :date_key,
-            :index_value
-        FROM public.dim_indicator i
-        WHERE i.indicator_code = :indicator_code
+            count(*) FILTER (WHERE inserted) AS inserted,
+            count(*) FILTER (WHERE NOT inserted) AS revised
+        FROM merged
+    """)).one()
+
+    return {"inserted": row.inserted, "revised": row.revised}
+
+
+def _merge_facts_sqlite(conn, source, on_conflict):
+    """
+    ``_merge_facts`` for SQLite, which has neither writable CTEs nor xmax:
+    revised values are updated first and new keys inserted second, each
+    statement's rowcount giving one of the counts.
+    """
+
+    # One row per key, as DISTINCT ON does on PostgreSQL
+    conn.execute(text(f"""
+        CREATE TEMPORARY TABLE stg_fact_merge AS
+        SELECT src.indicator_key, src.date_key, min(src.index_value) AS index_value
+        FROM ({source}) src
+        GROUP BY src.indicator_key, src.date_key
+    """))
+
+    revised = 0
+    if on_conflict == "update":
+        revised = conn.execute(text("""
+            UPDATE public.fact_index
+            SET index_value = m.index_value,
+                load_timestamp = CURRENT_TIMESTAMP
+            FROM stg_fact_merge m
+            WHERE fact_index.indicator_key = m.indicator_key
+              AND fact_index.date_key = m.date_key
+              AND fact_index.index_value IS NOT m.index_value
+        """)).rowcount
+
+    inserted = conn.execute(text("""
+        INSERT INTO public.fact_index (indicator_key, date_key, index_value)
+        SELECT indicator_key, date_key, index_value
+        FROM stg_fact_merge
+        WHERE true
         ON CONFLICT (indicator_key, date_key) DO NOTHING
-    """)
+    """)).rowcount
+
+    conn.execute(text("DROP TABLE temp.stg_fact_merge"))
+    conn.execute(text("DROP TABLE temp.stg_fact_index"))
+
+    return {"inserted": inserted, "revised": revised}
+
+
+def _insert_returning(conn, sql, records):
+    """
+    Execute an INSERT ... RETURNING once per record and collect the rows.
+
+    RETURNING is not available for textual executemany, and dimension
+    inserts are small, so one statement per record is cheap here.
+    """
+
+    rows = []
+    for record in records:
+        rows.extend(conn.execute(sql, record).all())
+    return rows
+
+
+def load_fact_chunks(
+    engine,
+    df,
+    chunk_size=50_000,
+    workers=1,
+    method="executemany",
+    cache=None,
+    on_conflict="ignore",
+    run_id=None
+):
+    """
+    Load fact rows in bounded transactions, optionally in parallel.
+
+    The fact frame is sorted by indicator and date and cut into chunks of
+    at most `chunk_size` rows, each holding whole indicators where
+    possible. Every chunk is committed in its own transaction together
+    with a row in `load_checkpoint`, so a failure only rolls back the
+    chunk in flight. Rerunning the same frame resumes after the last
+    committed chunks instead of starting again. Checkpoints other runs
+    left behind more than ``CHECKPOINT_MAX_AGE_HOURS`` ago are deleted.
+
+    With `workers` > 1 chunks load concurrently, one connection per
+    worker from the engine's pool. Chunks cover disjoint indicators, so
+    workers do not wait on each other's row locks.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse. Its pool should allow `workers`
+        connections.
+
+    :param df: pandas.DataFrame
+        A transformed DataFrame, as for ``insert_fact_index``.
+
+    :param chunk_size: int
+        Maximum number of fact rows per transaction.
+
+    :param workers: int
+        Number of chunks loaded concurrently.
+
+    :param method: str
+        Passed to ``insert_fact_index``.
+
+    :param cache: Database.repository.KeyCache | None
+        Passed to ``insert_fact_index``. Keys are resolved once for the
+        whole frame before chunking.
+
+    :param on_conflict: str
+        Passed to ``insert_fact_index``.
+
+    :param run_id: str | None
+        Identifies the load for resuming. Defaults to a hash of the fact
+        rows and `chunk_size`, so rerunning the same data resumes.
+
+    returns: dict
+        ``{"inserted": int, "revised": int, "chunks": int, "resumed": int}``
+        where `resumed` counts chunks skipped as already committed.
+    """
+
+    _check_fact_options(method, on_conflict)
+
+    with engine.connect() as conn:
+        fact_df = _fact_frame(conn, df, cache)
+
+    chunks, run_id = _plan_fact_chunks(fact_df, chunk_size, run_id)
+
+    with engine.begin() as conn:
+        _expire_checkpoints(conn, run_id)
+    with engine.connect() as conn:
+        committed = _committed_chunks(conn, run_id)
+
+    def load_chunk(chunk_no):
+        with engine.begin() as conn:
+            return _load_fact_chunk(conn, chunks[chunk_no], chunk_no, run_id, method, on_conflict)
+
+    pending = [chunk_no for chunk_no in range(len(chunks)) if chunk_no not in committed]
+    counts = {"inserted": 0, "revised": 0, "chunks": len(chunks), "resumed": len(chunks) - len(pending)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(load_chunk, pending):
+            counts["inserted"] += result["inserted"]
+            counts["revised"] += result["revised"]
+
+    with engine.begin() as conn:
+        _clear_checkpoints(conn, run_id)
+
+    return counts
+
+
+def _plan_fact_chunks(fact_df, chunk_size, run_id=None):
+    """
+    Sort a fact frame by key and date and cut it into load chunks.
+
+    returns: tuple[list[pandas.DataFrame], str]
+        The chunks and the run id, a hash of the rows and `chunk_size`
+        unless one is given.
+    """
+
+    key_column = fact_df.columns[0]
+    fact_df = fact_df.sort_values([key_column, "date_key"], kind="stable", ignore_index=True)
+    chunks = _chunk_by_key(fact_df, key_column, chunk_size)
+
+    if run_id is None:
+        digest = hashlib.blake2b(
+            pd.util.hash_pandas_object(fact_df, index=False).to_numpy().tobytes(),
+            digest_size=16
+        )
+        digest.update(str(chunk_size).encode())
+        run_id = digest.hexdigest()
+
+    return chunks, run_id
+
+
+def _committed_chunks(conn, run_id):
+    return set(conn.execute(
+        text("SELECT chunk_no FROM public.load_checkpoint WHERE run_id = :run_id"),
+        {"run_id": run_id}
+    ).scalars())
+
+
+def _load_fact_chunk(conn, chunk, chunk_no, run_id, method, on_conflict):
+    """
+    Insert one chunk and record its checkpoint in the same transaction.
+    """
+
+    result = _insert_fact_frame(conn, chunk, method, on_conflict)
+    conn.execute(
+        text("""
+            INSERT INTO public.load_checkpoint (run_id, chunk_no, row_count)
+            VALUES (:run_id, :chunk_no, :row_count)
+        """),
+        {"run_id": run_id, "chunk_no": chunk_no, "row_count": len(chunk)}
+    )
+    return result
+
+
+def _expire_checkpoints(conn, run_id, max_age_hours=CHECKPOINT_MAX_AGE_HOURS):
+    """
+    Delete the checkpoints of other runs older than `max_age_hours`.
+    """
+
+    if get_dialect(conn) is SQLITE:
+        cutoff = "datetime('now', '-' || :hours || ' hours')"
+    else:
+        cutoff = "now() - make_interval(hours => :hours)"
+
+    conn.execute(
+        text(f"""
+            DELETE FROM public.load_checkpoint
+            WHERE run_id <> :run_id
+              AND committed_at < {cutoff}
+        """),
+        {"run_id": run_id, "hours": int(max_age_hours)}
+    )
+
+
+def _clear_checkpoints(conn, run_id):
+    conn.execute(
+        text("DELETE FROM public.load_checkpoint WHERE run_id = :run_id"),
+        {"run_id": run_id}
+    )
+
+
+def _chunk_by_key(fact_df, key_column, chunk_size):
+    """
+    Cut a frame sorted by `key_column` into chunks of at most `chunk_size`
+    rows. A key is only split across chunks when it alone has more than
+    `chunk_size` rows.
+    """
+
+    keys = fact_df[key_column].to_numpy()
+    if len(keys) == 0:
+        return []
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+
+    bounds = [0]
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if end - bounds[-1] <= chunk_size:
+            continue
+        if start > bounds[-1]:
+            bounds.append(start)
+        while end - bounds[-1] > chunk_size:
+            bounds.append(bounds[-1] + chunk_size)
+    bounds.append(len(keys))
+
+    return [fact_df.iloc[begin:end] for begin, end in zip(bounds, bounds[1:])]
+
+
+def get_watermarks(engine):
+    """
+    Read the per-indicator high-water date_key from load_watermark.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse.
+
+    returns: dict[str, int]
+        indicator_code -> highest date_key already loaded.
+    """
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT indicator_code, high_water_date_key
+            FROM public.load_watermark
+        """))
+        return dict(rows.all())
+
+
+def trim_to_watermarks(rows, watermarks, counts, periods=None):
+    """
+    Drop the period values of raw series rows at or below their watermark.
+
+    Works on the raw ``SASTableData`` rows, before the transform, so that
+    months that are already loaded are neither transformed nor sent to the
+    database. Series without a watermark are passed through unchanged.
+
+    :param rows: Iterable[dict]
+        Raw series rows keyed by the ``H03`` indicator code.
+
+    :param watermarks: dict[str, int]
+        indicator_code -> highest date_key already loaded.
+
+    :param counts: dict
+        Updated in place with the number of ``"skipped"`` period values.
+
+    :param periods: Transformation.Transform.PeriodKeys | None
+        Which keys are periods, monthly ``MO<mm><yyyy>`` keys by default.
+
+    returns: Iterator[dict]
+        The rows, without the period keys at or below the watermark.
+    """
+
+    if periods is None:
+        from Transformation.Transform import MONTHLY as periods
+
+    counts.setdefault("skipped", 0)
+
+    for row in rows:
+        watermark = watermarks.get(row.get("H03"))
+        if watermark is None:
+            yield row
+            continue
+
+        trimmed = {
+            key: value for key, value in row.items()
+            if periods.parse(key) is None
+            or date_keys(*periods.parse(key)) > watermark
+        }
+        counts["skipped"] += len(row) - len(trimmed)
+        yield trimmed
+
+
+def update_watermarks(engine, df):
+    """
+    Raise the load_watermark of every indicator in a loaded frame.
+
+    Watermarks only ever move forward, so reloading older months, for
+    example with a full refresh, never lowers them.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse.
+
+    :param df: pandas.DataFrame
+        A transformed frame whose facts have been loaded, with at least
+        indicator_code, year and month.
+
+    returns: None
+    """
 
     records = (
-        fact_df[[
-            "indicator_code",
-            "date_key",
-            "index_value"
-        ]]
+        df.assign(date_key=frame_date_keys(df))
+        .groupby("indicator_code", observed=True)["date_key"]
+        .max()
+        .reset_index()
+        .astype({"indicator_code": object})
+        .rename(columns={"date_key": "high_water_date_key"})
         .to_dict(orient="records")
     )
 
+    dialect = get_dialect(engine)
+    sql = text(f"""
+        INSERT INTO public.load_watermark (indicator_code, high_water_date_key)
+        VALUES (:indicator_code, :high_water_date_key)
+        ON CONFLICT (indicator_code) DO UPDATE
+        SET high_water_date_key = {dialect.greatest}(
+                public.load_watermark.high_water_date_key,
+                EXCLUDED.high_water_date_key
+            ),
+            updated_at = {dialect.now}
+    """)
+
     with engine.begin() as conn:
         conn.execute(sql, records)
 
 
+def cap_watermarks(engine, caps):
+    """
+    Lower load watermarks that lie beyond a cap.
 
+    Used for indicators with quarantined rows: ``update_watermarks`` moves
+    a watermark to the latest loaded month, which would make the next
+    incremental load skip a rejected earlier month even once its value is
+    corrected.
 
-if __name__== "__main__":
-    engine = Database_Connection()
-    json_data = Fetch_Data()
-    df = transform_json_to_df(json_data["SASTableData+P0142_7"])
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse.
+
+    :param caps: dict[str, int]
+        indicator_code -> highest date_key the watermark may hold.
+
+    returns: None
+    """
+
+    if not caps:
+        return
+
+    dialect = get_dialect(engine)
+    sql = text(f"""
+        UPDATE public.load_watermark
+        SET high_water_date_key = :date_key,
+            updated_at = {dialect.now}
+        WHERE indicator_code = :indicator_code
+          AND high_water_date_key > :date_key
+    """)
+
+    records = [
+        {"indicator_code": code, "date_key": int(date_key)}
+        for code, date_key in caps.items()
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(sql, records)
 
-    Create_Tables(engine)
+
+def get_content_hashes(engine):
+    """
+    Read the stored content hash of every indicator.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse.
+
+    returns: dict[str, str]
+        indicator_code -> content_hash, for indicators that have one.
+    """
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT indicator_code, content_hash
+            FROM public.dim_indicator
+            WHERE content_hash IS NOT NULL
+        """))
+        return dict(rows.all())
+
+
+def update_content_hashes(engine, hashes):
+    """
+    Store the content hashes of loaded series on dim_indicator.
+
+    Call this only after the series' facts are committed, so a failed
+    load is retried on the next run.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse.
+
+    :param hashes: dict[str, str]
+        indicator_code -> content_hash.
+
+    returns: None
+    """
+
+    if not hashes:
+        return
+
+    sql = text("""
+        UPDATE public.dim_indicator
+        SET content_hash = :content_hash
+        WHERE indicator_code = :indicator_code
+    """)
+
+    records = [
+        {"indicator_code": code, "content_hash": content_hash}
+        for code, content_hash in hashes.items()
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(sql, records)
+
+
+ROLLUP_GRAINS = {
+    "quarterly": ("public.fact_index_quarterly", ["year", "quarter"]),
+    "yearly": ("public.fact_index_yearly", ["year"]),
+}
+
+
+def refresh_rollups(engine, df=None):
+    """
+    Recompute the quarterly and yearly rollups touched by a load.
+
+    The rollups hold avg/min/max and the latest `index_value` per
+    indicator and period, so dashboards aggregate a few rows per indicator
+    instead of every monthly fact. Only the indicator-years present in
+    `df` are recomputed from fact_index, each with a date_key range scan.
+    Revised months are covered too, as they are part of the loaded frame.
+
+    Call this after the facts of `df` are committed and before the load
+    watermarks are raised, so a failed refresh is retried with the next
+    load.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse.
+
+    :param df: pandas.DataFrame | None
+        The loaded frame, with `indicator_code` and `year`/`month` or
+        `date`. When None, every rollup is rebuilt from all facts.
+
+    returns: None
+    """
+
+    dialect = get_dialect(engine)
+
+    if df is None:
+        touched = """
+            SELECT DISTINCT f.indicator_key, f.date_key / 10000 AS year
+            FROM public.fact_index f
+        """
+        params = {}
+    elif df.empty:
+        return
+    else:
+        year, _ = frame_year_month(df)
+        pairs = pd.DataFrame({
+            "indicator_code": df["indicator_code"].astype(str).to_numpy(),
+            "year": year.astype("int64"),
+        }).drop_duplicates()
+        if dialect is SQLITE:
+            touched = """
+                SELECT i.indicator_key, json_extract(t.value, '$[1]') AS year
+                FROM json_each(:pairs) t
+                JOIN public.dim_indicator i
+                    ON i.indicator_code = json_extract(t.value, '$[0]')
+            """
+            params = {"pairs": json.dumps(pairs.to_numpy().tolist())}
+        else:
+            touched = """
+                SELECT i.indicator_key, t.year
+                FROM unnest(CAST(:indicator_codes AS TEXT[]), CAST(:years AS INTEGER[]))
+                    AS t(indicator_code, year)
+                JOIN public.dim_indicator i ON i.indicator_code = t.indicator_code
+            """
+            params = {
+                "indicator_codes": pairs["indicator_code"].tolist(),
+                "years": pairs["year"].tolist(),
+            }
+
+    with engine.begin() as conn:
+        for table, period in ROLLUP_GRAINS.values():
+            columns = ", ".join(f"d.{column}" for column in period)
+            facts = f"""
+                FROM touched t
+                JOIN public.fact_index f
+                    ON f.indicator_key = t.indicator_key
+                   AND f.date_key BETWEEN t.year * 10000 + 101 AND t.year * 10000 + 1201
+                JOIN public.dim_date d ON d.date_key = f.date_key
+            """
+            if dialect is SQLITE:
+                # No array_agg: the latest value of each period comes from a
+                # window over the period's facts instead
+                rollup = f"""
+                    WITH touched AS ({touched}),
+                    facts AS (
+                        SELECT
+                            f.indicator_key,
+                            {columns},
+                            f.date_key,
+                            f.index_value,
+                            first_value(f.index_value) OVER (
+                                PARTITION BY f.indicator_key, {columns}
+                                ORDER BY f.date_key DESC
+                            ) AS last_value
+                        {facts}
+                    )
+                    INSERT INTO {table} (
+                        indicator_key,
+                        {", ".join(period)},
+                        avg_value,
+                        min_value,
+                        max_value,
+                        last_value,
+                        last_date_key,
+                        month_count
+                    )
+                    SELECT
+                        indicator_key,
+                        {", ".join(period)},
+                        avg(index_value),
+                        min(index_value),
+                        max(index_value),
+                        max(last_value),
+                        max(date_key),
+                        count(*)
+                    FROM facts
+                    GROUP BY indicator_key, {", ".join(period)}
+                """
+            else:
+                rollup = f"""
+                    WITH touched AS ({touched})
+                    INSERT INTO {table} (
+                        indicator_key,
+                        {", ".join(period)},
+                        avg_value,
+                        min_value,
+                        max_value,
+                        last_value,
+                        last_date_key,
+                        month_count
+                    )
+                    SELECT
+                        f.indicator_key,
+                        {columns},
+                        avg(f.index_value),
+                        min(f.index_value),
+                        max(f.index_value),
+                        (array_agg(f.index_value ORDER BY f.date_key DESC))[1],
+                        max(f.date_key),
+                        count(*)
+                    {facts}
+                    GROUP BY f.indicator_key, {columns}
+                """
+            conn.execute(text(f"""
+                {rollup}
+                ON CONFLICT (indicator_key, {", ".join(period)}) DO UPDATE
+                SET avg_value = EXCLUDED.avg_value,
+                    min_value = EXCLUDED.min_value,
+                    max_value = EXCLUDED.max_value,
+                    last_value = EXCLUDED.last_value,
+                    last_date_key = EXCLUDED.last_date_key,
+                    month_count = EXCLUDED.month_count,
+                    refreshed_at = {dialect.now}
+            """), params)
+
+
+def load_batches(
+    engine,
+    frames,
+    method="executemany",
+    cache=None,
+    on_conflict="ignore",
+    chunk_size=None,
+    workers=1
+):
+    """
+    Load a stream of transformed frames into the star schema.
+
+    Each frame is loaded through the four insert functions in dependency
+    order before the next one is pulled, so a streamed export is loaded
+    with at most one batch in memory. All inserts are idempotent, which
+    makes repeating a dimension row across batches harmless. After the
+    facts of each batch are committed the rollups of the periods it
+    touched are refreshed and then the load watermarks are raised.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse.
+
+    :param frames: Iterable[pandas.DataFrame]
+        Transformed frames, e.g. from ``Transformation.Transform.transform_batches``.
+
+    :param method: str
+        The fact load method passed to ``insert_fact_index``.
+
+    :param cache: Database.repository.KeyCache | None
+        Key cache shared by all batches, passed to every insert function.
+
+    :param on_conflict: str
+        The conflict mode passed to ``insert_fact_index``.
+
+    :param chunk_size: int | None
+        When given, facts are loaded with ``load_fact_chunks`` in
+        transactions of at most this many rows.
+
+    :param workers: int
+        Concurrent chunks for ``load_fact_chunks``.
+
+    returns: dict
+        ``{"rows": int, "inserted": int, "revised": int}`` summed over all
+        batches, where `rows` counts the fact rows sent to the database.
+    """
+
+    counts = {"rows": 0, "inserted": 0, "revised": 0}
+    calendar = None
+    for df in frames:
+        insert_dim_series(engine, df, cache=cache)
+        insert_dim_indicator(engine, df, cache=cache)
+        calendar = insert_dim_date(engine, df, cache=cache, calendar=calendar)
+        if chunk_size:
+            result = load_fact_chunks(
+                engine,
+                df,
+                chunk_size=chunk_size,
+                workers=workers,
+                method=method,
+                cache=cache,
+                on_conflict=on_conflict
+            )
+        else:
+            result = insert_fact_index(
+                engine, df, method=method, cache=cache, on_conflict=on_conflict
+            )
+        refresh_rollups(engine, df)
+        update_watermarks(engine, df)
+
+        counts["rows"] += len(df)
+        counts["inserted"] += result["inserted"]
+        counts["revised"] += result["revised"]
+
+    return counts
+
+
+def main(argv=None):
+    """
+    Command line loader: extract, transform and load the catalogue tables.
+    """
+
+    from DataIngestion.cache import RawCache
+    from DataIngestion.extract import CATALOGUE, Fetch_Cached, Fetch_Tables, Read_Rows, Stream_Rows
+    from Transformation.Transform import filter_changed_rows
+    from Transformation.registry import get_dataset
+    from Transformation.validation import validate_frames
+
+    parser = argparse.ArgumentParser(description="Load StatsSA exports into the warehouse.")
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=sorted(CATALOGUE),
+        default=["P0142_7"],
+        help="catalogue tables to load"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="concurrent downloads when loading several tables"
+    )
+    parser.add_argument(
+        "--transform-workers",
+        type=int,
+        default=1,
+        help="processes transforming the series rows of each table"
+    )
+    parser.add_argument(
+        "--method",
+        choices=FACT_LOAD_METHODS,
+        default="executemany",
+        help="how fact rows are sent to the database"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="commit fact rows in transactions of at most this many rows"
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        default=1,
+        help="fact chunks loaded concurrently (with --chunk-size)"
+    )
+    parser.add_argument(
+        "--async-load",
+        action="store_true",
+        help="load on an asyncpg event loop, overlapping up to --load-workers statements"
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="load every month, ignoring the load watermarks"
+    )
+    parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="apply StatsSA revisions to already loaded months (implies loading every series and month)"
+    )
+    parser.add_argument(
+        "--calendar",
+        nargs=2,
+        metavar=("START", "END"),
+        help="make sure dim_date covers the months START to END (YYYY-MM)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.getenv("RAW_CACHE_DIR"),
+        help="raw response cache; unchanged tables are skipped (default: $RAW_CACHE_DIR)"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="serve tables from the raw response cache only"
+    )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="partition fact_index by year, converting an existing plain table"
+    )
+    parser.add_argument(
+        "--rebuild-rollups",
+        action="store_true",
+        help="recompute every quarterly and yearly rollup after the load"
+    )
+    parser.add_argument(
+        "--quarantine-dir",
+        default=os.getenv("QUARANTINE_DIR", "quarantine"),
+        help="where rows failing validation are written, one CSV per table (default: $QUARANTINE_DIR or ./quarantine)"
+    )
+    parser.add_argument(
+        "--staging-dir",
+        default=os.getenv("STAGING_DIR"),
+        help="Parquet staging area written by the extract and transform stages (default: $STAGING_DIR)"
+    )
+    parser.add_argument(
+        "--from-staging",
+        action="store_true",
+        help="load the staged fact partitions instead of extracting and transforming"
+    )
+    args = parser.parse_args(argv)
+
+    if args.offline and not args.cache_dir:
+        parser.error("--offline needs --cache-dir or RAW_CACHE_DIR")
+    if args.from_staging and not args.staging_dir:
+        parser.error("--from-staging needs --staging-dir or STAGING_DIR")
+    if args.async_load and args.method != "executemany":
+        parser.error("--async-load only supports --method executemany")
+
+    def load(engine, frames, cache):
+        options = {
+            "method": args.method,
+            "cache": cache,
+            "on_conflict": "update" if args.upsert else "ignore",
+        }
+        if args.async_load:
+            from Database.async_models import run_load_batches
+
+            return run_load_batches(
+                frames,
+                chunk_size=args.chunk_size or 50_000,
+                concurrency=args.load_workers,
+                **options
+            )
+        return load_batches(
+            engine,
+            frames,
+            chunk_size=args.chunk_size,
+            workers=args.load_workers,
+            **options
+        )
+
+    if args.from_staging:
+        from Staging.store import read_facts
+
+        engine = Database_Connection("bulk_load")
+        Create_Tables(engine, partitioned=args.partitioned)
+        if args.partitioned:
+            partition_fact_index(engine)
+        cache = KeyCache()
+        cache.warm(engine)
+
+        counts = {}
+        staged = read_facts(args.staging_dir, tables=args.tables)
+        loaded = load(
+            engine,
+            (
+                valid
+                for (table, _), frame in staged.groupby(["table", "year"], observed=True)
+                for valid in validate_frames(
+                    [frame.drop(columns=["table"]).reset_index(drop=True)],
+                    table,
+                    args.quarantine_dir,
+                    counts
+                )
+            ),
+            cache
+        )
+        if args.rebuild_rollups:
+            refresh_rollups(engine)
+        print(f"Quarantined {counts.get('quarantined', 0)} index rows in {args.quarantine_dir}")
+        print(f"Sent {loaded['rows']} staged index rows: {loaded['inserted']} inserted, {loaded['revised']} revised")
+        return
+
+    changed = args.tables
+    if args.cache_dir:
+        raw_cache = RawCache(args.cache_dir)
+        fetched = {
+            table: Fetch_Cached(CATALOGUE[table], raw_cache, offline=args.offline)
+            for table in args.tables
+        }
+        changed = [
+            table for table, (_, modified) in fetched.items()
+            if modified or args.full_refresh
+        ]
+        if not changed:
+            print("No table changed since the last load")
+            return
+        table_rows = ((table, Read_Rows(fetched[table][0], table)) for table in changed)
+    elif len(args.tables) == 1:
+        table_rows = [(args.tables[0], Stream_Rows(args.tables[0]))]
+    else:
+        table_rows = (
+            (table, get_dataset(table).rows(payload))
+            for table, payload in Fetch_Tables(args.tables, max_workers=args.workers)
+        )
+
+    engine = Database_Connection("bulk_load")
+
+    Create_Tables(engine, partitioned=args.partitioned)
+    if args.partitioned and partition_fact_index(engine):
+        print("fact_index converted to yearly partitions")
     print("Tables created")
-    insert_dim_series(engine, df)
-    print("Inserted series")
-    insert_dim_indicator(engine, df)
-    print("Inserted indicator")
-    insert_dim_date(engine, df)
-    print("Inserted date")
-    insert_fact_index(engine, df)
-    print("Inserted index")
+    if args.calendar:
+        ensure_calendar(engine, *args.calendar)
+    cache = KeyCache()
+    cache.warm(engine)
+
+    counts = {"skipped": 0, "unchanged": 0, "quarantined": 0}
+    hashes = {}
+    rejected = {}
+    # A hash stored by a run that trimmed its rows to the watermarks does
+    # not mean a revised month was applied, so upserts compare nothing
+    known_hashes = {} if args.full_refresh or args.upsert else get_content_hashes(engine)
+    watermarks = None if args.full_refresh or args.upsert else get_watermarks(engine)
+
+    def frames():
+        # Every table goes through its own spec into the same star schema
+        for table, rows in table_rows:
+            spec = get_dataset(table)
+            rows = filter_changed_rows(rows, known_hashes, hashes, counts, periods=spec.periods)
+            if watermarks is not None:
+                rows = trim_to_watermarks(rows, watermarks, counts, periods=spec.periods)
+            if args.transform_workers > 1:
+                transformed = [spec.transform_parallel(rows, max_workers=args.transform_workers, compact=True)]
+            else:
+                transformed = spec.transform_batches(rows, compact=True)
+            yield from validate_frames(transformed, table, args.quarantine_dir, counts, rejected)
+
+    loaded = load(engine, frames(), cache)
+    # Series with quarantined rows are compared again on the next run, and
+    # from their earliest rejected month on
+    update_content_hashes(engine, {
+        code: content_hash for code, content_hash in hashes.items() if code not in rejected
+    })
+    cap_watermarks(engine, {
+        code: int(date_keys(*period)) - 1 for code, period in rejected.items() if period
+    })
+    if args.rebuild_rollups:
+        refresh_rollups(engine)
+    print(f"Skipped {counts['unchanged']} unchanged series")
+    print(f"Skipped {counts['skipped']} index rows at or below the watermark")
+    print(f"Quarantined {counts['quarantined']} index rows in {args.quarantine_dir}")
+    print(f"Sent {loaded['rows']} index rows: {loaded['inserted']} inserted, {loaded['revised']} revised")
+    print(f"Key cache: {cache.stats()}")
+    print(f"Connection pools: {pool_stats()}")
+
+    if args.cache_dir:
+        for table in changed:
+            raw_cache.mark_processed(CATALOGUE[table])
+
+
+if __name__== "__main__":
+    main()
@@ -0,0 +1,173 @@
+from sqlalchemy import text
+
+from Database.dialect import get_dialect, split_statements
+
+
+def fact_index_ddl(partitioned=False):
+    """
+    The CREATE TABLE statement of fact_index.
+
+    :param partitioned: bool
+        Range-partition the table by `date_key`, one partition per year
+        (see ``ensure_fact_partitions``).
+
+    returns: str
+    """
+
+    return f"""
+        CREATE TABLE IF NOT EXISTS public.fact_index (
+            indicator_key BIGINT NOT NULL
+                REFERENCES public.dim_indicator(indicator_key),
+
+            date_key INTEGER NOT NULL
+                REFERENCES public.dim_date(date_key),
+
+            index_value NUMERIC(10,2) NOT NULL,
+
+            load_timestamp TIMESTAMP DEFAULT now(),
+
+            PRIMARY KEY (indicator_key, date_key)
+        ){" PARTITION BY RANGE (date_key)" if partitioned else ""};
+    """
+
+
+# Yearly partitions are named fact_index_y<YYYY> and hold the date_keys
+# YYYY0101 up to, not including, (YYYY + 1)0101. The function does nothing
+# while fact_index is a plain table, so callers need not know the layout.
+FACT_PARTITION_FUNCTION = """
+    CREATE OR REPLACE FUNCTION public.ensure_fact_partitions(first_year INTEGER, last_year INTEGER)
+    RETURNS VOID
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        y INTEGER;
+    BEGIN
+        IF first_year IS NULL OR NOT EXISTS (
+            SELECT 1 FROM pg_partitioned_table
+            WHERE partrelid = to_regclass('public.fact_index')
+        ) THEN
+            RETURN;
+        END IF;
+
+        FOR y IN first_year..last_year LOOP
+            IF to_regclass(format('public.fact_index_y%s', y)) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE public.fact_index_y%s PARTITION OF public.fact_index '
+                    'FOR VALUES FROM (%s) TO (%s)',
+                    y, y * 10000 + 101, (y + 1) * 10000 + 101
+                );
+            END IF;
+        END LOOP;
+    END
+    $$;
+"""
+
+# Power BI filters on date ranges across all indicators, which the
+# (indicator_key, date_key) primary key cannot serve. load_timestamp grows
+# with every load, so a BRIN index stays tiny and still prunes well.
+FACT_INDEXES = """
+    CREATE INDEX IF NOT EXISTS fact_index_date_key_idx
+        ON public.fact_index (date_key, indicator_key) INCLUDE (index_value);
+
+    CREATE INDEX IF NOT EXISTS fact_index_load_timestamp_brin
+        ON public.fact_index USING brin (load_timestamp);
+"""
+
+
+def ensure_fact_partitions(conn, first_year, last_year):
+    """
+    Create the missing yearly fact_index partitions from `first_year` to
+    `last_year`. Does nothing when fact_index is not partitioned, or on a
+    backend without partitions.
+
+    Called by ``Database.date_dimension.ensure_calendar`` whenever months
+    are added to dim_date, so every month a fact can reference has a
+    partition to be routed to.
+
+    :param conn: sqlalchemy.engine.Connection
+        Connection in the transaction adding the months.
+
+    returns: None
+    """
+
+    if not get_dialect(conn).supports_partitions:
+        return
+
+    conn.execute(
+        text("SELECT public.ensure_fact_partitions(:first_year, :last_year)"),
+        {"first_year": int(first_year), "last_year": int(last_year)}
+    )
+
+
+def is_partitioned(engine):
+    """
+    Return True when fact_index is range-partitioned.
+    """
+
+    if not get_dialect(engine).supports_partitions:
+        return False
+
+    with engine.connect() as conn:
+        return bool(conn.execute(text("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_partitioned_table
+                WHERE partrelid = to_regclass('public.fact_index')
+            )
+        """)).scalar())
+
+
+def partition_fact_index(engine):
+    """
+    Convert an existing plain fact_index into the partitioned layout.
+    PostgreSQL only.
+
+    The old table is renamed, a partitioned fact_index with a partition
+    per dim_date year is created, the facts are copied over and the old
+    table is dropped, all in one transaction. Loads are blocked while it
+    runs. Does nothing when fact_index is already partitioned.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) data warehouse, after ``Create_Tables``.
+
+    returns: bool
+        True when the table was converted.
+    """
+
+    if not get_dialect(engine).supports_partitions:
+        raise ValueError("fact_index can only be partitioned on PostgreSQL")
+    if is_partitioned(engine):
+        return False
+
+    script = (
+        """
+            LOCK TABLE public.fact_index IN ACCESS EXCLUSIVE MODE;
+
+            DROP INDEX IF EXISTS public.fact_index_date_key_idx;
+            DROP INDEX IF EXISTS public.fact_index_load_timestamp_brin;
+
+            ALTER TABLE public.fact_index RENAME TO fact_index_unpartitioned;
+            ALTER TABLE public.fact_index_unpartitioned
+                RENAME CONSTRAINT fact_index_pkey TO fact_index_unpartitioned_pkey;
+        """
+        + fact_index_ddl(partitioned=True)
+        + """
+            SELECT public.ensure_fact_partitions(min(year), max(year))
+            FROM public.dim_date;
+
+            INSERT INTO public.fact_index (indicator_key, date_key, index_value, load_timestamp)
+            SELECT indicator_key, date_key, index_value, load_timestamp
+            FROM public.fact_index_unpartitioned;
+
+            DROP TABLE public.fact_index_unpartitioned;
+        """
+        + FACT_INDEXES
+    )
+
+    # One statement per call, as in Create_Tables: asyncpg prepares each
+    # statement and rejects a multi-statement script
+    with engine.begin() as conn:
+        for statement in split_statements(script):
+            conn.execute(text(statement))
+
+    return True
@@ -0,0 +1,174 @@
+import pandas as pd
+from sqlalchemy import Engine, bindparam, text
+
+
+DIMENSIONS = {
+    "series": ("public.dim_series", "series_code", "series_key"),
+    "indicator": ("public.dim_indicator", "indicator_code", "indicator_key"),
+    "date": ("public.dim_date", "date", "date_key"),
+}
+
+
+class KeyCache:
+    """
+    In-process cache of dimension surrogate keys.
+
+    Maps the natural key of each dimension to its surrogate key:
+
+    - series:    series_code    -> series_key
+    - indicator: indicator_code -> indicator_key
+    - date:      date           -> date_key
+
+    The cache is warmed with one query per dimension and kept current by
+    the insert functions in ``Database.models``, which feed it the keys
+    returned by their ``RETURNING`` clauses. Lookups count hits and misses
+    per dimension so the hit rate can be checked after a load.
+    """
+
+    def __init__(self):
+        self._keys = {dimension: {} for dimension in DIMENSIONS}
+        self.hits = {dimension: 0 for dimension in DIMENSIONS}
+        self.misses = {dimension: 0 for dimension in DIMENSIONS}
+
+    def warm(self, connectable, dimensions=None):
+        """
+        Load every key of the given dimensions from the database.
+
+        :param connectable: sqlalchemy.engine.Engine | sqlalchemy.engine.Connection
+            Where to read the dimension tables from.
+
+        :param dimensions: Iterable[str] | None
+            Dimensions to load, all of them by default.
+
+        returns: None
+        """
+
+        dimensions = list(dimensions or DIMENSIONS)
+
+        if isinstance(connectable, Engine):
+            with connectable.connect() as conn:
+                self.warm(conn, dimensions)
+            return
+
+        for dimension in dimensions:
+            table, natural_key, surrogate_key = DIMENSIONS[dimension]
+            rows = connectable.execute(
+                text(f"SELECT {natural_key}, {surrogate_key} FROM {table}")
+            )
+            self._keys[dimension] = {}
+            self.add(dimension, rows)
+
+    def load(self, connectable, dimension, naturals):
+        """
+        Load the keys of some natural keys of one dimension.
+
+        Natural keys that are not in the database stay uncached.
+
+        :param connectable: sqlalchemy.engine.Connection
+            Where to read the dimension table from.
+
+        :param dimension: str
+            One of ``"series"``, ``"indicator"`` or ``"date"``.
+
+        :param naturals: Iterable
+            The natural keys to load.
+
+        returns: None
+        """
+
+        table, natural_key, surrogate_key = DIMENSIONS[dimension]
+        sql = text(
+            f"SELECT {natural_key}, {surrogate_key} FROM {table} "
+            f"WHERE {natural_key} IN :naturals"
+        ).bindparams(bindparam("naturals", expanding=True))
+        self.add(dimension, connectable.execute(sql, {"naturals": list(naturals)}))
+
+    def add(self, dimension, pairs):
+        """
+        Record ``(natural_key, surrogate_key)`` pairs, e.g. from ``RETURNING``.
+        """
+
+        keys = self._keys[dimension]
+        for natural, surrogate in pairs:
+            keys[_normalize(dimension, natural)] = surrogate
+
+    def get(self, dimension, natural):
+        """
+        Return the surrogate key for one natural key, or None.
+        """
+
+        key = self._keys[dimension].get(_normalize(dimension, natural))
+        if key is None:
+            self.misses[dimension] += 1
+        else:
+            self.hits[dimension] += 1
+        return key
+
+    def lookup(self, dimension, values, connectable=None):
+        """
+        Map a Series of natural keys to surrogate keys.
+
+        When some values miss and a connection is given, those natural keys
+        are looked up in the dimension table with one query, since another
+        loader may have inserted them. Values that still miss are returned
+        as null.
+
+        :param dimension: str
+            One of ``"series"``, ``"indicator"`` or ``"date"``.
+
+        :param values: pandas.Series
+            Natural keys, one per row.
+
+        :param connectable: sqlalchemy.engine.Connection | None
+            Used to look up the missing natural keys.
+
+        returns: pandas.Series
+            Nullable ``Int64`` surrogate keys aligned with ``values``.
+        """
+
+        if dimension == "date":
+            values = pd.Series(pd.to_datetime(values).dt.date, index=values.index)
+        else:
+            values = values.astype(object)
+
+        keys = values.map(self._keys[dimension]).astype("Int64")
+        missing = keys.isna()
+
+        if missing.any() and connectable is not None:
+            self.load(connectable, dimension, values[missing].unique())
+            keys[missing] = values[missing].map(self._keys[dimension]).astype("Int64")
+
+        self.hits[dimension] += int((~missing).sum())
+        self.misses[dimension] += int(missing.sum())
+        return keys
+
+    def invalidate(self, dimension=None):
+        """
+        Drop the cached keys of one dimension, or of all of them.
+        """
+
+        for name in [dimension] if dimension else DIMENSIONS:
+            self._keys[name] = {}
+
+    def stats(self):
+        """
+        Return the cached key count, hits and misses per dimension.
+        """
+
+        return {
+            dimension: {
+                "keys": len(self._keys[dimension]),
+                "hits": self.hits[dimension],
+                "misses": self.misses[dimension],
+            }
+            for dimension in DIMENSIONS
+        }
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._keys.values())
+
+
+def _normalize(dimension, natural):
+    if dimension == "date":
+        return pd.Timestamp(natural).date()
+    return natural
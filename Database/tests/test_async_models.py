@@ -0,0 +1,157 @@
+import asyncio
+import importlib.util
+import tempfile
+import unittest
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+from sqlalchemy import text
+
+from Database import async_models
+from Database.connection import dispose_engines, get_async_engine, get_engine
+from Database.models import load_batches
+from Transformation.Transform import transform_json_to_df
+from Transformation.benchmark import make_series_rows
+
+
+class FakeAsyncEngine:
+    """
+    Stands in for an AsyncEngine: ``run_sync`` calls the function with a
+    MagicMock connection, after yielding to the event loop like a real
+    round trip would. Tracks how many connections are in use.
+    """
+
+    def __init__(self):
+        self.conn = MagicMock()
+        self.conn.execute.return_value.one.return_value = (None, None, 0)
+        self.conn.execute.return_value.scalars.return_value = []
+        self.in_use = 0
+        self.max_in_use = 0
+
+    @asynccontextmanager
+    async def _connection(self):
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        try:
+            yield self
+        finally:
+            self.in_use -= 1
+
+    def begin(self):
+        return self._connection()
+
+    def connect(self):
+        return self._connection()
+
+    async def run_sync(self, func, *args, **kwargs):
+        await asyncio.sleep(0)
+        result = func(self.conn, *args, **kwargs)
+        await asyncio.sleep(0)
+        return result
+
+
+def statements(conn):
+    return sorted(
+        (str(call.args[0]), repr(call.args[1:]))
+        for call in conn.execute.call_args_list
+    )
+
+
+class TestAsyncLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.df = transform_json_to_df(make_series_rows(6, 10))
+
+    def test_matches_the_sync_load(self):
+        engine = FakeAsyncEngine()
+        async_counts = asyncio.run(
+            async_models.load_batches(engine, [self.df], chunk_size=20, concurrency=3)
+        )
+
+        sync_engine = MagicMock()
+        sync_conn = MagicMock()
+        sync_conn.execute.return_value.one.return_value = (None, None, 0)
+        sync_conn.execute.return_value.scalars.return_value = []
+        sync_engine.begin.return_value.__enter__.return_value = sync_conn
+        sync_engine.connect.return_value.__enter__.return_value = sync_conn
+        sync_counts = load_batches(sync_engine, [self.df], chunk_size=20, workers=3)
+
+        self.assertEqual(statements(engine.conn), statements(sync_conn))
+        self.assertEqual(async_counts["rows"], sync_counts["rows"])
+
+    def test_fact_chunks_overlap_within_the_limit(self):
+        engine = FakeAsyncEngine()
+
+        counts = asyncio.run(
+            async_models.load_fact_chunks(engine, self.df, chunk_size=10, concurrency=2, run_id="run-1")
+        )
+
+        self.assertEqual(counts["chunks"], 6)
+        self.assertEqual(engine.max_in_use, 2)
+        checkpoints = [
+            call.args[1]["chunk_no"] for call in engine.conn.execute.call_args_list
+            if "INSERT INTO public.load_checkpoint" in str(call.args[0])
+        ]
+        self.assertEqual(sorted(checkpoints), list(range(6)))
+
+    def test_dimensions_overlap(self):
+        engine = FakeAsyncEngine()
+
+        asyncio.run(async_models.load_dimensions(engine, self.df, concurrency=2))
+
+        self.assertEqual(engine.max_in_use, 2)
+        sql = [str(call.args[0]) for call in engine.conn.execute.call_args_list]
+        series = next(i for i, s in enumerate(sql) if "INSERT INTO public.dim_series" in s)
+        indicator = next(i for i, s in enumerate(sql) if "INSERT INTO public.dim_indicator" in s)
+        self.assertLess(series, indicator)
+
+    def test_copy_is_not_supported(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(async_models.insert_fact_index(FakeAsyncEngine(), self.df, method="copy"))
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec("aiosqlite") and importlib.util.find_spec("greenlet"),
+    "needs aiosqlite and greenlet"
+)
+class TestAsyncSqliteWarehouse(unittest.TestCase):
+    """
+    The async loaders on a real ``AsyncEngine``: aiosqlite, as asyncpg
+    needs a PostgreSQL server.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{self.tmp.name}/warehouse.db"
+        self.df = transform_json_to_df(make_series_rows(6, 10), compact=True)
+
+    def tearDown(self):
+        dispose_engines()
+        self.tmp.cleanup()
+
+    def count(self, table):
+        with get_engine(url=self.url).connect() as conn:
+            return conn.execute(text(f"SELECT count(*) FROM public.{table}")).scalar()
+
+    def test_create_tables_and_load(self):
+        async def main():
+            engine = get_async_engine("bulk_load", self.url)
+            try:
+                await async_models.Create_Tables(engine)
+                first = await async_models.load_batches(engine, [self.df], chunk_size=20, concurrency=3)
+                second = await async_models.load_batches(engine, [self.df], chunk_size=20, concurrency=3)
+            finally:
+                await engine.dispose()
+            return first, second
+
+        first, second = asyncio.run(main())
+
+        self.assertEqual(first, {"rows": 60, "inserted": 60, "revised": 0})
+        self.assertEqual(second["inserted"], 0)
+        self.assertEqual(self.count("fact_index"), 60)
+        self.assertEqual(self.count("dim_indicator"), 6)
+        self.assertEqual(self.count("load_checkpoint"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from Database.date_dimension import (
+    DateKeyIndex,
+    build_calendar,
+    date_keys,
+    ensure_calendar,
+    frame_date_keys,
+    month_index,
+)
+from Transformation.Transform import PERIOD_COLUMNS, transform_json_to_df
+from Transformation.benchmark import make_series_rows
+
+
+def mock_engine(min_key, max_key, count):
+    engine = MagicMock()
+    engine.connect.return_value.__enter__.return_value.execute.return_value.one.return_value = (
+        min_key, max_key, count
+    )
+    return engine, engine.begin.return_value.__enter__.return_value
+
+
+class TestCalendar(unittest.TestCase):
+
+    def test_build_calendar_matches_transformed_periods(self):
+        df = transform_json_to_df(make_series_rows(1, 30, start_year=2016))
+
+        calendar = build_calendar("2016-01", "2018-06")
+
+        self.assertEqual(len(calendar), 30)
+        self.assertEqual(
+            calendar[PERIOD_COLUMNS].values.tolist(),
+            df[PERIOD_COLUMNS].values.tolist()
+        )
+        self.assertEqual(calendar["date_key"].tolist()[:2], [20160101, 20160201])
+
+    def test_frame_date_keys(self):
+        df = transform_json_to_df(make_series_rows(2, 13, start_year=2016), compact=True)
+
+        keys = frame_date_keys(df)
+        from_dates = frame_date_keys(df[["date"]])
+
+        self.assertEqual(keys[12], 20170101)
+        np.testing.assert_array_equal(keys, from_dates)
+
+    def test_index_coverage(self):
+        index = DateKeyIndex(month_index(2016, 1), month_index(2016, 12))
+
+        self.assertTrue(index.covers(month_index(2016, 3), month_index(2016, 12)))
+        self.assertFalse(index.covers(month_index(2016, 3), month_index(2017, 1)))
+        self.assertEqual(list(index.pairs())[2], (date(2016, 3, 1), 20160301))
+
+    def test_date_keys_do_not_overflow_small_ints(self):
+        self.assertEqual(date_keys(np.int16(2025), np.int8(4)), 20250401)
+
+
+class TestEnsureCalendar(unittest.TestCase):
+
+    def test_empty_table_gets_the_requested_range(self):
+        engine, conn = mock_engine(None, None, 0)
+
+        index = ensure_calendar(engine, "2016-01", "2016-12")
+
+        records = conn.execute.call_args.args[1]
+        self.assertEqual([r["date_key"] for r in records], date_keys(2016, range(1, 13)).tolist())
+        self.assertTrue(index.covers(month_index(2016, 1), month_index(2016, 12)))
+
+    def test_covered_range_is_not_written(self):
+        engine, conn = mock_engine(20150101, 20171201, 36)
+
+        index = ensure_calendar(engine, "2016-01", "2016-12")
+
+        conn.execute.assert_not_called()
+        self.assertEqual(index.start, month_index(2015, 1))
+
+    def test_growing_range_inserts_only_new_months(self):
+        engine, conn = mock_engine(20160101, 20161201, 12)
+
+        ensure_calendar(engine, "2016-06", "2017-02")
+
+        records = conn.execute.call_args.args[1]
+        self.assertEqual([r["date_key"] for r in records], [20170101, 20170201])
+
+    def test_calendar_with_gaps_is_filled(self):
+        engine, conn = mock_engine(20160101, 20161201, 5)
+
+        ensure_calendar(engine, "2016-01", "2016-12")
+
+        self.assertEqual(len(conn.execute.call_args.args[1]), 12)
+
+    def test_known_index_skips_the_query(self):
+        engine, _ = mock_engine(None, None, 0)
+        index = DateKeyIndex(month_index(2016, 1), month_index(2016, 12))
+
+        self.assertIs(ensure_calendar(engine, "2016-02", "2016-03", index), index)
+        engine.connect.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
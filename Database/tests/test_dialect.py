@@ -0,0 +1,245 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import text
+
+from Database.connection import dispose_engines, get_engine
+from Database.dialect import POSTGRESQL, SQLITE, get_dialect, split_statements
+from Database.models import (
+    Create_Tables,
+    get_watermarks,
+    insert_fact_index,
+    load_batches,
+    load_fact_chunks,
+    main,
+    refresh_rollups,
+)
+from Database.partitioning import ensure_fact_partitions, is_partitioned
+from Database.repository import KeyCache
+from Transformation.Transform import transform_json_to_df
+from Transformation.benchmark import make_series_rows
+
+
+class TestGetDialect(unittest.TestCase):
+
+    def test_unknown_backends_are_postgresql(self):
+        self.assertIs(get_dialect(MagicMock()), POSTGRESQL)
+        self.assertIs(get_dialect(object()), POSTGRESQL)
+
+    def test_sqlite(self):
+        self.assertIs(get_dialect(get_engine(url="sqlite://")), SQLITE)
+        dispose_engines()
+
+
+class TestSplitStatements(unittest.TestCase):
+
+    def test_quoted_semicolons_do_not_split(self):
+        script = """
+            CREATE FUNCTION f() RETURNS VOID LANGUAGE plpgsql AS $$
+            BEGIN
+                PERFORM 1;
+            END
+            $$;
+            -- a comment; with a semicolon
+            SELECT 'a;b';;
+        """
+
+        statements = split_statements(script)
+
+        self.assertEqual(len(statements), 2)
+        self.assertIn("PERFORM 1;", statements[0])
+        self.assertTrue(statements[1].endswith("SELECT 'a;b'"))
+
+
+class TestSqliteWarehouse(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = get_engine("bulk_load", url=f"sqlite:///{self.tmp.name}/warehouse.db")
+        Create_Tables(self.engine)
+        self.rows = make_series_rows(4, 24, start_year=2016)
+        self.df = transform_json_to_df(self.rows, compact=True)
+
+    def tearDown(self):
+        dispose_engines()
+        self.tmp.cleanup()
+
+    def count(self, table):
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT count(*) FROM public.{table}")).scalar()
+
+    def test_schema_is_created_in_the_database_file(self):
+        Create_Tables(self.engine)
+
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "warehouse.db")))
+        self.assertFalse(is_partitioned(self.engine))
+        with self.assertRaises(ValueError):
+            Create_Tables(self.engine, partitioned=True)
+        with self.engine.begin() as conn:
+            ensure_fact_partitions(conn, 2016, 2017)
+
+    def test_load_is_idempotent(self):
+        for method in ("executemany", "copy"):
+            with self.subTest(method=method):
+                load_batches(self.engine, [self.df], method=method)
+
+                self.assertEqual(self.count("dim_series"), 1)
+                self.assertEqual(self.count("dim_indicator"), 4)
+                self.assertEqual(self.count("dim_date"), 24)
+                self.assertEqual(self.count("fact_index"), 4 * 24)
+                self.assertEqual(self.count("fact_index_quarterly"), 4 * 8)
+                self.assertEqual(self.count("fact_index_yearly"), 4 * 2)
+
+    def test_cached_keys_and_counts(self):
+        cache = KeyCache()
+        cache.warm(self.engine)
+
+        first = load_batches(self.engine, [self.df], cache=cache)
+        second = load_batches(self.engine, [self.df], cache=cache)
+
+        self.assertEqual(first, {"rows": 96, "inserted": 96, "revised": 0})
+        self.assertEqual(second["inserted"], 0)
+
+    def test_revisions_update_facts_and_rollups(self):
+        load_batches(self.engine, [self.df])
+        self.rows[0]["MO122017"] = 999.0
+
+        counts = load_batches(
+            self.engine,
+            [transform_json_to_df(self.rows, compact=True)],
+            method="copy",
+            on_conflict="update"
+        )
+
+        self.assertEqual(counts, {"rows": 96, "inserted": 0, "revised": 1})
+        with self.engine.connect() as conn:
+            last_value, month_count = conn.execute(text("""
+                SELECT y.last_value, y.month_count
+                FROM public.fact_index_yearly y
+                JOIN public.dim_indicator i ON i.indicator_key = y.indicator_key
+                WHERE i.indicator_code = 'UVI00000' AND y.year = 2017
+            """)).one()
+        self.assertEqual((last_value, month_count), (999, 12))
+
+    def test_stale_checkpoints_expire(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO public.load_checkpoint (run_id, chunk_no, row_count, committed_at)
+                VALUES ('abandoned', 0, 10, '2000-01-01 00:00:00'),
+                       ('in-flight', 0, 10, CURRENT_TIMESTAMP)
+            """))
+
+        load_fact_chunks(self.engine, self.df, chunk_size=30)
+
+        with self.engine.connect() as conn:
+            runs = conn.execute(text("SELECT run_id FROM public.load_checkpoint")).scalars().all()
+        self.assertEqual(runs, ["in-flight"])
+
+    def test_failed_merge_can_be_retried(self):
+        load_batches(self.engine, [self.df])
+        self.rows[0]["MO122017"] = 999.0
+        revised = transform_json_to_df(self.rows, compact=True)
+
+        with patch("Database.models._merge_facts_sqlite", side_effect=RuntimeError("merge failed")):
+            with self.assertRaises(RuntimeError):
+                insert_fact_index(self.engine, revised, on_conflict="update")
+        counts = insert_fact_index(self.engine, revised, on_conflict="update")
+
+        self.assertEqual(counts, {"inserted": 0, "revised": 1})
+
+    def test_watermarks_only_move_forward(self):
+        load_batches(self.engine, [self.df])
+        older = transform_json_to_df(make_series_rows(4, 6, start_year=2010), compact=True)
+
+        load_batches(self.engine, [older])
+
+        self.assertEqual(set(get_watermarks(self.engine).values()), {20171201})
+
+    def test_chunked_load_and_full_rollup_rebuild(self):
+        counts = load_fact_chunks(self.engine, self.df.iloc[:0], chunk_size=10)
+        self.assertEqual(counts["chunks"], 0)
+
+        load_batches(self.engine, [self.df], chunk_size=30, workers=2)
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM public.fact_index_yearly"))
+        refresh_rollups(self.engine)
+
+        self.assertEqual(self.count("fact_index"), 96)
+        self.assertEqual(self.count("load_checkpoint"), 0)
+        self.assertEqual(self.count("fact_index_yearly"), 8)
+
+
+class TestLoaderCommand(unittest.TestCase):
+    """
+    ``Database.models.main`` end to end on a SQLite warehouse.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{self.tmp.name}/warehouse.db"
+        self.rows = make_series_rows(2, 12, start_year=2016)
+
+    def tearDown(self):
+        dispose_engines()
+        self.tmp.cleanup()
+
+    def run_main(self, *argv):
+        rows = [dict(row) for row in self.rows]
+        with patch.dict(os.environ, {"DATABASE_URL": self.url}), \
+                patch("DataIngestion.extract.Stream_Rows", return_value=iter(rows)), \
+                redirect_stdout(StringIO()) as out:
+            main(["--quarantine-dir", os.path.join(self.tmp.name, "quarantine"), *argv])
+        return out.getvalue()
+
+    def value(self, indicator_code, date_key):
+        with get_engine(url=self.url).connect() as conn:
+            return conn.execute(text("""
+                SELECT f.index_value
+                FROM public.fact_index f
+                JOIN public.dim_indicator i ON i.indicator_key = f.indicator_key
+                WHERE i.indicator_code = :code AND f.date_key = :date_key
+            """), {"code": indicator_code, "date_key": date_key}).scalar()
+
+    def test_upsert_applies_revision_seen_by_an_earlier_run(self):
+        self.run_main()
+        self.rows[0]["MO012016"] = 999.0
+
+        # The revised month is at or below the watermark: skipped, not applied
+        self.run_main()
+        self.assertNotEqual(self.value("UVI00000", 20160101), 999)
+
+        out = self.run_main("--upsert")
+
+        self.assertEqual(self.value("UVI00000", 20160101), 999)
+        self.assertIn("1 revised", out)
+
+    def test_corrected_quarantined_month_is_loaded(self):
+        self.rows[0]["MO032016"] = "n/a"
+
+        first = self.run_main()
+        self.assertIn("Quarantined 1 index rows", first)
+        self.assertIsNone(self.value("UVI00000", 20160301))
+
+        self.rows[0]["MO032016"] = 55.0
+        second = self.run_main()
+
+        self.assertIn("Quarantined 0 index rows", second)
+        self.assertEqual(self.value("UVI00000", 20160301), 55)
+
+    def test_series_with_quarantined_rows_are_compared_again(self):
+        self.rows[0]["MO1A2016"] = 64.0
+
+        first = self.run_main()
+        second = self.run_main()
+
+        self.assertIn("Quarantined 1 index rows", first)
+        self.assertIn("Skipped 1 unchanged series", second)
+        self.assertIn("Quarantined 1 index rows", second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,364 @@
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from Database.bulk import FrameCsvReader, copy_from_frame
+from Database.models import (
+    CHECKPOINT_MAX_AGE_HOURS,
+    _chunk_by_key,
+    Create_Tables,
+    insert_dim_date,
+    insert_dim_series,
+    insert_fact_index,
+    load_batches,
+    load_fact_chunks,
+    refresh_rollups,
+    trim_to_watermarks,
+    update_content_hashes,
+    update_watermarks,
+)
+from Transformation.Transform import QUARTERLY, transform_json_to_df
+from Transformation.benchmark import make_series_rows
+from DataIngestion.tests.testData import rawData
+
+
+def mock_engine():
+    engine = MagicMock()
+    conn = engine.begin.return_value.__enter__.return_value
+    # An empty dim_date: min(date_key), max(date_key), count(*)
+    engine.connect.return_value.__enter__.return_value.execute.return_value.one.return_value = (None, None, 0)
+    return engine, conn
+
+
+class TestFrameCsvReader(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "indicator_code": ["UVI10000", "UVI10000", "UVI43100"],
+            "date_key": [20160101, 20160201, 20160101],
+            "index_value": [63.1, 62.7, 100.0]
+        })
+        self.expected = "UVI10000,20160101,63.1\nUVI10000,20160201,62.7\nUVI43100,20160101,100.0\n"
+
+    def test_read_all(self):
+        reader = FrameCsvReader(self.df, list(self.df.columns), chunk_rows=2)
+        self.assertEqual(reader.read(), self.expected)
+        self.assertEqual(reader.read(), "")
+
+    def test_read_in_small_pieces(self):
+        reader = FrameCsvReader(self.df, list(self.df.columns), chunk_rows=1)
+        pieces = iter(lambda: reader.read(5), "")
+        self.assertEqual("".join(pieces), self.expected)
+
+    def test_readline(self):
+        reader = FrameCsvReader(self.df, ["indicator_code", "date_key"], chunk_rows=2)
+        self.assertEqual(reader.readline(), "UVI10000,20160101\n")
+        self.assertEqual(reader.read(), "UVI10000,20160201\nUVI43100,20160101\n")
+
+    def test_copy_from_frame_uses_copy_expert(self):
+        conn = MagicMock()
+        cursor = conn.connection.cursor.return_value
+
+        copy_from_frame(conn, "stg", self.df, ["indicator_code", "date_key"])
+
+        sql, reader = cursor.copy_expert.call_args.args
+        self.assertEqual(sql, "COPY stg (indicator_code, date_key) FROM STDIN WITH (FORMAT csv)")
+        self.assertEqual(reader.read().count("\n"), 3)
+        cursor.close.assert_called_once()
+
+
+class TestInsertFactIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.df = transform_json_to_df(rawData["SASTableData+P0142_7"])
+
+    def test_executemany_sends_one_record_per_row(self):
+        engine, conn = mock_engine()
+
+        insert_fact_index(engine, self.df)
+
+        sql, records = conn.execute.call_args.args
+        self.assertIn("WHERE i.indicator_code = :indicator_code", str(sql))
+        self.assertEqual(len(records), len(self.df))
+        self.assertEqual(records[0], {"indicator_code": "UVI10000", "date_key": 20160101, "index_value": 63.1})
+
+    def test_copy_stages_and_merges(self):
+        engine, conn = mock_engine()
+        cursor = conn.connection.cursor.return_value
+
+        insert_fact_index(engine, self.df, method="copy")
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertEqual(len(statements), 2)
+        self.assertIn("CREATE TEMPORARY TABLE stg_fact_index", statements[0])
+        self.assertIn("JOIN public.dim_indicator i", statements[1])
+        self.assertIn("ON CONFLICT (indicator_key, date_key) DO NOTHING", statements[1])
+
+        reader = cursor.copy_expert.call_args.args[1]
+        self.assertEqual(reader.read().count("\n"), len(self.df))
+
+    def test_upsert_stages_and_updates_changed_values_only(self):
+        engine, conn = mock_engine()
+        conn.execute.return_value.one.return_value.inserted = 3
+        conn.execute.return_value.one.return_value.revised = 2
+
+        counts = insert_fact_index(engine, self.df, on_conflict="update")
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertIn("CREATE TEMPORARY TABLE stg_fact_index", statements[0])
+        self.assertIn("INSERT INTO stg_fact_index", statements[1])
+        self.assertEqual(len(conn.execute.call_args_list[1].args[1]), len(self.df))
+        self.assertIn("DO UPDATE", statements[2])
+        self.assertIn(
+            "WHERE public.fact_index.index_value IS DISTINCT FROM EXCLUDED.index_value",
+            statements[2]
+        )
+        self.assertEqual(counts, {"inserted": 3, "revised": 2})
+
+    def test_copy_merge_ignores_conflicts_by_default(self):
+        engine, conn = mock_engine()
+
+        insert_fact_index(engine, self.df, method="copy")
+
+        merge = str(conn.execute.call_args.args[0])
+        self.assertIn("DO NOTHING", merge)
+        self.assertNotIn("DO UPDATE", merge)
+
+    def test_unknown_conflict_mode(self):
+        engine, _ = mock_engine()
+        with self.assertRaises(ValueError):
+            insert_fact_index(engine, self.df, on_conflict="replace")
+
+    def test_unknown_method(self):
+        engine, _ = mock_engine()
+        with self.assertRaises(ValueError):
+            insert_fact_index(engine, self.df, method="bulk")
+        engine.begin.assert_not_called()
+
+
+class TestCompactSchema(unittest.TestCase):
+
+    def setUp(self):
+        json_data = make_series_rows(3, 14)
+        self.default = transform_json_to_df(json_data)
+        self.compact = transform_json_to_df(json_data, compact=True)
+
+    def sent_records(self, loader, df, **kwargs):
+        engine, conn = mock_engine()
+        loader(engine, df, **kwargs)
+        return conn.execute.call_args.args[1]
+
+    def test_loaders_send_the_same_records(self):
+        for loader in (insert_dim_series, insert_dim_date, insert_fact_index, update_watermarks):
+            with self.subTest(loader=loader.__name__):
+                default = self.sent_records(loader, self.default)
+                compact = self.sent_records(loader, self.compact)
+                self.assertEqual(default, compact)
+
+    def test_fact_values_are_rounded_to_numeric_scale(self):
+        records = self.sent_records(insert_fact_index, self.compact)
+
+        self.assertEqual(records[1]["index_value"], 50.1)
+        self.assertIsInstance(records[0]["indicator_code"], str)
+
+
+class TestWatermarks(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [
+            {"H01": "P0142.7", "H03": "UVI10000", "MO112015": 60.0, "MO122015": 61.0, "MO012016": 63.1},
+            {"H01": "P0142.7", "H03": "UVI43100", "MO122015": 99.0, "MO012016": 100.0},
+        ]
+
+    def test_trim_drops_months_at_or_below_watermark(self):
+        counts = {}
+
+        rows = list(trim_to_watermarks(self.rows, {"UVI10000": 20151201}, counts))
+
+        self.assertEqual(rows[0], {"H01": "P0142.7", "H03": "UVI10000", "MO012016": 63.1})
+        self.assertEqual(rows[1], self.rows[1])
+        self.assertEqual(counts["skipped"], 2)
+
+    def test_trimmed_rows_transform_to_new_months_only(self):
+        counts = {}
+        watermarks = {"UVI10000": 20160101, "UVI43100": 20151201}
+
+        df = transform_json_to_df(trim_to_watermarks(self.rows, watermarks, counts))
+
+        self.assertEqual(df[["indicator_code", "year_month"]].values.tolist(), [["UVI43100", "2016-01"]])
+        self.assertEqual(counts["skipped"], 4)
+
+    def test_trim_quarterly_rows(self):
+        counts = {}
+        rows = [{"H03": "GDP10000", "QU32020": 98.1, "QU42020": 99.0}]
+
+        trimmed = list(trim_to_watermarks(rows, {"GDP10000": 20200701}, counts, periods=QUARTERLY))
+
+        self.assertEqual(trimmed, [{"H03": "GDP10000", "QU42020": 99.0}])
+        self.assertEqual(counts["skipped"], 1)
+
+    def test_update_watermarks_sends_max_date_key_per_indicator(self):
+        engine, conn = mock_engine()
+
+        update_watermarks(engine, transform_json_to_df(self.rows))
+
+        sql, records = conn.execute.call_args.args
+        self.assertIn("GREATEST", str(sql))
+        self.assertEqual(records, [
+            {"indicator_code": "UVI10000", "high_water_date_key": 20160101},
+            {"indicator_code": "UVI43100", "high_water_date_key": 20160101},
+        ])
+
+    def test_load_batches_updates_watermarks_after_facts(self):
+        engine, conn = mock_engine()
+
+        counts = load_batches(engine, [transform_json_to_df(self.rows)])
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertEqual(counts["rows"], 5)
+        self.assertIn("INSERT INTO public.fact_index", statements[-4])
+        self.assertIn("INSERT INTO public.fact_index_quarterly", statements[-3])
+        self.assertIn("INSERT INTO public.fact_index_yearly", statements[-2])
+        self.assertIn("public.load_watermark", statements[-1])
+
+
+class TestChunkedLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.df = transform_json_to_df(make_series_rows(5, 10))
+
+    def test_chunks_respect_size_and_key_boundaries(self):
+        frame = pd.DataFrame({"indicator_code": list("aaabbcccccd"), "date_key": range(11)})
+
+        chunks = _chunk_by_key(frame, "indicator_code", 4)
+
+        self.assertEqual(
+            ["".join(chunk["indicator_code"]) for chunk in chunks],
+            ["aaa", "bb", "cccc", "cd"]
+        )
+        self.assertEqual(_chunk_by_key(frame.iloc[:0], "indicator_code", 4), [])
+
+    def test_each_chunk_commits_with_a_checkpoint(self):
+        engine, conn = mock_engine()
+
+        counts = load_fact_chunks(engine, self.df, chunk_size=20, run_id="run-1")
+
+        self.assertEqual(counts["chunks"], 3)
+        self.assertEqual(counts["resumed"], 0)
+        checkpoints = [
+            call.args[1] for call in conn.execute.call_args_list
+            if "INSERT INTO public.load_checkpoint" in str(call.args[0])
+        ]
+        self.assertEqual([c["chunk_no"] for c in checkpoints], [0, 1, 2])
+        self.assertEqual(sum(c["row_count"] for c in checkpoints), len(self.df))
+        self.assertIn("DELETE FROM public.load_checkpoint", str(conn.execute.call_args.args[0]))
+
+    def test_stale_checkpoints_of_other_runs_expire(self):
+        engine, conn = mock_engine()
+
+        load_fact_chunks(engine, self.df, chunk_size=20, run_id="run-1")
+
+        sql, params = conn.execute.call_args_list[0].args
+        self.assertIn("DELETE FROM public.load_checkpoint", str(sql))
+        self.assertIn("run_id <> :run_id", str(sql))
+        self.assertEqual(params, {"run_id": "run-1", "hours": CHECKPOINT_MAX_AGE_HOURS})
+
+    def test_resumes_after_committed_chunks(self):
+        engine, conn = mock_engine()
+        engine.connect.return_value.__enter__.return_value.execute.return_value.scalars.return_value = [0, 1]
+
+        counts = load_fact_chunks(engine, self.df, chunk_size=20, run_id="run-1")
+
+        self.assertEqual(counts["resumed"], 2)
+        fact_inserts = [
+            call.args[1] for call in conn.execute.call_args_list
+            if "INSERT INTO public.fact_index" in str(call.args[0])
+        ]
+        self.assertEqual(len(fact_inserts), 1)
+        self.assertEqual(len(fact_inserts[0]), 10)
+
+    def test_parallel_load_sends_every_row(self):
+        engine, conn = mock_engine()
+
+        load_fact_chunks(engine, self.df, chunk_size=10, workers=3, run_id="run-1")
+
+        sent = [
+            record["indicator_code"]
+            for call in conn.execute.call_args_list
+            if "INSERT INTO public.fact_index" in str(call.args[0])
+            for record in call.args[1]
+        ]
+        self.assertEqual(sorted(sent), sorted(self.df["indicator_code"]))
+
+    def test_default_run_id_is_stable(self):
+        run_ids = []
+        for _ in range(2):
+            engine, conn = mock_engine()
+            load_fact_chunks(engine, self.df, chunk_size=20)
+            run_ids.append(conn.execute.call_args.args[1]["run_id"])
+
+        self.assertEqual(run_ids[0], run_ids[1])
+
+
+class TestRollups(unittest.TestCase):
+
+    def test_refreshes_only_touched_indicator_years(self):
+        engine, conn = mock_engine()
+        df = transform_json_to_df(make_series_rows(2, 14, start_year=2016), compact=True)
+
+        refresh_rollups(engine, df)
+
+        (quarterly, params), (yearly, _) = [call.args for call in conn.execute.call_args_list]
+        self.assertIn("INSERT INTO public.fact_index_quarterly", str(quarterly))
+        self.assertIn("GROUP BY f.indicator_key, d.year, d.quarter", str(quarterly))
+        self.assertIn("ON CONFLICT (indicator_key, year) DO UPDATE", str(yearly))
+        self.assertEqual(
+            sorted(zip(params["indicator_codes"], params["years"])),
+            [("UVI00000", 2016), ("UVI00000", 2017), ("UVI00001", 2016), ("UVI00001", 2017)]
+        )
+
+    def test_rebuild_scans_every_fact(self):
+        engine, conn = mock_engine()
+
+        refresh_rollups(engine)
+
+        sql, params = conn.execute.call_args.args
+        self.assertIn("SELECT DISTINCT f.indicator_key", str(sql))
+        self.assertEqual(params, {})
+
+    def test_empty_frame(self):
+        engine, conn = mock_engine()
+
+        refresh_rollups(engine, transform_json_to_df([]))
+
+        conn.execute.assert_not_called()
+
+
+class TestContentHashes(unittest.TestCase):
+
+    def test_dim_indicator_has_content_hash(self):
+        engine, conn = mock_engine()
+
+        Create_Tables(engine)
+
+        sql = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertTrue(any("ADD COLUMN IF NOT EXISTS content_hash TEXT" in statement for statement in sql))
+
+    def test_update_content_hashes(self):
+        engine, conn = mock_engine()
+
+        update_content_hashes(engine, {"UVI10000": "abc"})
+
+        sql, records = conn.execute.call_args.args
+        self.assertIn("UPDATE public.dim_indicator", str(sql))
+        self.assertEqual(records, [{"indicator_code": "UVI10000", "content_hash": "abc"}])
+
+    def test_update_content_hashes_skips_empty(self):
+        engine, _ = mock_engine()
+        update_content_hashes(engine, {})
+        engine.begin.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
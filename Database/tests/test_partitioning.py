@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock
+
+from Database.date_dimension import ensure_calendar
+from Database.models import Create_Tables
+from Database.partitioning import fact_index_ddl, partition_fact_index
+
+
+def mock_engine(partitioned=False):
+    engine = MagicMock()
+    connect = engine.connect.return_value.__enter__.return_value
+    connect.execute.return_value.scalar.return_value = partitioned
+    connect.execute.return_value.one.return_value = (None, None, 0)
+    return engine, engine.begin.return_value.__enter__.return_value
+
+
+def executed_sql(conn):
+    return "\n".join(str(call.args[0]) for call in conn.execute.call_args_list)
+
+
+class TestFactIndexLayout(unittest.TestCase):
+
+    def test_plain_table_by_default(self):
+        engine, conn = mock_engine()
+
+        Create_Tables(engine)
+
+        sql = executed_sql(conn)
+        self.assertIn("CREATE TABLE IF NOT EXISTS public.fact_index", sql)
+        self.assertNotIn("PARTITION BY", sql)
+
+    def test_partitioned_table(self):
+        engine, conn = mock_engine()
+
+        Create_Tables(engine, partitioned=True)
+
+        sql = executed_sql(conn)
+        self.assertIn(") PARTITION BY RANGE (date_key)", sql)
+        self.assertIn("SELECT public.ensure_fact_partitions(min(year), max(year))", sql)
+
+    def test_analytical_indexes(self):
+        engine, conn = mock_engine()
+
+        Create_Tables(engine)
+
+        sql = executed_sql(conn)
+        self.assertIn("ON public.fact_index (date_key, indicator_key) INCLUDE (index_value)", sql)
+        self.assertIn("ON public.fact_index USING brin (load_timestamp)", sql)
+
+    def test_one_statement_per_call(self):
+        engine, conn = mock_engine()
+
+        Create_Tables(engine, partitioned=True)
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        function = next(s for s in statements if "FUNCTION public.ensure_fact_partitions" in s)
+        self.assertTrue(function.endswith("$$"))
+        for statement in statements:
+            if statement is not function:
+                self.assertNotIn(";", statement)
+
+    def test_new_calendar_years_get_partitions(self):
+        engine, conn = mock_engine()
+
+        ensure_calendar(engine, "2016-11", "2018-02")
+
+        first, last = conn.execute.call_args_list
+        self.assertIn("public.ensure_fact_partitions", str(first.args[0]))
+        self.assertEqual(first.args[1], {"first_year": 2016, "last_year": 2018})
+        self.assertEqual(len(last.args[1]), 16)
+
+
+class TestPartitionFactIndex(unittest.TestCase):
+
+    def test_converts_plain_table(self):
+        engine, conn = mock_engine(partitioned=False)
+
+        self.assertTrue(partition_fact_index(engine))
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertTrue(statements[0].startswith("LOCK TABLE public.fact_index"))
+        self.assertTrue(statements[4].startswith("ALTER TABLE public.fact_index_unpartitioned"))
+        self.assertEqual(statements[5], fact_index_ddl(partitioned=True).strip().rstrip(";"))
+        self.assertIn("public.ensure_fact_partitions", statements[6])
+        self.assertIn("FROM public.fact_index_unpartitioned", statements[7])
+        self.assertEqual(statements[8], "DROP TABLE public.fact_index_unpartitioned")
+        self.assertIn("CREATE INDEX IF NOT EXISTS fact_index_date_key_idx", statements[9])
+        self.assertEqual(len(statements), 11)
+        for statement in statements:
+            self.assertNotIn(";", statement)
+
+    def test_already_partitioned(self):
+        engine, conn = mock_engine(partitioned=True)
+
+        self.assertFalse(partition_fact_index(engine))
+        conn.execute.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
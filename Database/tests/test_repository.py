@@ -0,0 +1,122 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from Database.models import insert_dim_indicator, insert_fact_index
+from Database.repository import KeyCache
+
+
+def mock_connection(rows_by_table):
+    conn = MagicMock()
+
+    def execute(sql, *args):
+        for table, rows in rows_by_table.items():
+            if f"FROM {table}" in str(sql):
+                return iter(rows)
+        return iter([])
+
+    conn.execute.side_effect = execute
+    return conn
+
+
+class TestKeyCache(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = mock_connection({
+            "public.dim_series": [("P0142.7", 1)],
+            "public.dim_indicator": [("UVI10000", 10), ("UVI43100", 11)],
+            "public.dim_date": [(date(2016, 1, 1), 20160101)],
+        })
+        self.cache = KeyCache()
+        self.cache.warm(self.conn)
+
+    def test_warm_uses_one_query_per_dimension(self):
+        self.assertEqual(self.conn.execute.call_count, 3)
+        self.assertEqual(len(self.cache), 4)
+
+    def test_lookup_counts_hits_and_misses(self):
+        keys = self.cache.lookup("indicator", pd.Series(["UVI10000", "UVI43100", "UVI99999"]))
+
+        self.assertEqual(keys.tolist()[:2], [10, 11])
+        self.assertTrue(pd.isna(keys.iloc[2]))
+        self.assertEqual(self.cache.stats()["indicator"], {"keys": 2, "hits": 2, "misses": 1})
+
+    def test_lookup_dates_accepts_timestamps(self):
+        keys = self.cache.lookup("date", pd.Series(pd.to_datetime(["2016-01-01"])))
+        self.assertEqual(keys.tolist(), [20160101])
+
+    def test_lookup_loads_missing_keys_on_miss(self):
+        conn = mock_connection({"public.dim_indicator": [("UVI99999", 12)]})
+
+        keys = self.cache.lookup("indicator", pd.Series(["UVI10000", "UVI99999", "UVI99999"]), conn)
+
+        self.assertEqual(keys.tolist(), [10, 12, 12])
+        conn.execute.assert_called_once()
+        sql, params = conn.execute.call_args.args
+        self.assertIn("WHERE indicator_code IN", str(sql))
+        self.assertEqual(params, {"naturals": ["UVI99999"]})
+        self.assertEqual(self.cache.stats()["indicator"]["keys"], 3)
+
+    def test_add_and_get(self):
+        self.cache.add("series", [("P0141", 2)])
+
+        self.assertEqual(self.cache.get("series", "P0141"), 2)
+        self.assertIsNone(self.cache.get("series", "missing"))
+        self.assertEqual(self.cache.stats()["series"]["hits"], 1)
+        self.assertEqual(self.cache.stats()["series"]["misses"], 1)
+
+    def test_invalidate(self):
+        self.cache.invalidate("indicator")
+        self.assertEqual(self.cache.stats()["indicator"]["keys"], 0)
+        self.assertEqual(self.cache.stats()["series"]["keys"], 1)
+
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestCachedLoaders(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = KeyCache()
+        self.cache.add("series", [("P0142.7", 1)])
+        self.cache.add("indicator", [("UVI10000", 10)])
+        self.cache.add("date", [(date(2016, 1, 1), 20160101), (date(2016, 2, 1), 20160201)])
+        self.df = pd.DataFrame({
+            "series_code": ["P0142.7", "P0142.7"],
+            "indicator_code": ["UVI10000", "UVI10000"],
+            "category": ["Exports", "Exports"],
+            "subcategory": ["Exports", "Exports"],
+            "unit": ["Index", "Index"],
+            "date": [date(2016, 1, 1), date(2016, 2, 1)],
+            "index_value": [63.1, 62.7],
+        })
+        self.engine = MagicMock()
+        self.conn = self.engine.begin.return_value.__enter__.return_value
+
+    def test_fact_rows_carry_resolved_keys(self):
+        insert_fact_index(self.engine, self.df, cache=self.cache)
+
+        sql, records = self.conn.execute.call_args.args
+        self.assertNotIn("dim_indicator", str(sql))
+        self.assertEqual(records, [
+            {"indicator_key": 10, "date_key": 20160101, "index_value": 63.1},
+            {"indicator_key": 10, "date_key": 20160201, "index_value": 62.7},
+        ])
+        self.assertEqual(self.cache.stats()["indicator"]["hits"], 2)
+
+    def test_indicator_keys_come_from_returning(self):
+        self.conn.execute.return_value.all.return_value = [("UVI10000", 10)]
+        self.cache.invalidate("indicator")
+
+        insert_dim_indicator(self.engine, self.df, cache=self.cache)
+
+        sql, record = self.conn.execute.call_args.args
+        self.assertIn("RETURNING indicator_code, indicator_key", str(sql))
+        self.assertEqual(record["series_key"], 1)
+        self.assertEqual(self.cache.get("indicator", "UVI10000"), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
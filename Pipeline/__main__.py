@@ -0,0 +1,5 @@
+import sys
+
+from Pipeline.cli import main
+
+sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Command line entry point of the pipeline.
+
+    python -m Pipeline extract    stage the raw rows of catalogue tables
+    python -m Pipeline transform  stage the transformed facts of staged tables
+    python -m Pipeline load       load into the warehouse (options of Database.models)
+    python -m Pipeline run        instrumented end-to-end run (options of Pipeline.runner)
+
+Only argparse is imported up front. Each subcommand imports the stages it
+runs when it runs, so a short-lived container does not spend its startup
+importing pandas, SQLAlchemy or requests for stages it never uses.
+"""
+
+import argparse
+import os
+import sys
+
+DEFAULT_TABLES = ["P0142_7"]
+
+
+def extract(args):
+    from DataIngestion.extract import CATALOGUE, Stream_Rows
+    from Staging.store import write_raw_rows
+
+    for table in args.tables:
+        if table not in CATALOGUE:
+            raise SystemExit(f"unknown table {table!r}, expected one of {sorted(CATALOGUE)}")
+        n_rows = write_raw_rows(args.staging_dir, table, Stream_Rows(table))
+        print(f"Staged {n_rows} raw rows of {table}")
+    return 0
+
+
+def transform(args):
+    from Staging.store import has_raw_rows, read_raw_rows, write_facts
+    from Transformation.registry import get_dataset
+    from Transformation.validation import validate_frames
+
+    for table in args.tables:
+        if has_raw_rows(args.staging_dir, table):
+            rows = read_raw_rows(args.staging_dir, table)
+        else:
+            from DataIngestion.extract import Stream_Rows
+
+            rows = Stream_Rows(table)
+        df = get_dataset(table).transform(rows, compact=True)
+        # Stage only the rows the load would accept, as Database.models does
+        counts = {}
+        valid = list(validate_frames([df], table, args.quarantine_dir, counts))
+        df = valid[0] if valid else df.iloc[:0]
+        write_facts(args.staging_dir, table, df)
+        print(f"Staged {len(df)} index rows of {table}")
+        print(f"Quarantined {counts['quarantined']} index rows of {table} in {args.quarantine_dir}")
+    return 0
+
+
+def load(args):
+    from Database.models import main
+
+    main(args.args)
+    return 0
+
+
+def run(args):
+    from Pipeline.runner import main
+
+    main(args.args)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m Pipeline", description="Run the StatsSA pipeline stages.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for func, help_text in [
+        (extract, "stage the raw rows of catalogue tables as Parquet"),
+        (transform, "transform staged (or freshly fetched) rows into staged facts"),
+    ]:
+        command = commands.add_parser(func.__name__, help=help_text)
+        command.add_argument("--tables", nargs="+", default=DEFAULT_TABLES)
+        command.add_argument(
+            "--staging-dir",
+            default=os.getenv("STAGING_DIR"),
+            help="Parquet staging area (default: $STAGING_DIR)"
+        )
+        if func is transform:
+            command.add_argument(
+                "--quarantine-dir",
+                default=os.getenv("QUARANTINE_DIR", "quarantine"),
+                help="where rows failing validation are written (default: $QUARANTINE_DIR or ./quarantine)"
+            )
+        command.set_defaults(func=func)
+
+    for func, help_text in [
+        (load, "load into the warehouse; takes the options of python -m Database.models"),
+        (run, "instrumented end-to-end run; takes the options of python -m Pipeline.runner"),
+    ]:
+        # Options are passed through untouched, --help included
+        command = commands.add_parser(func.__name__, help=help_text, add_help=False)
+        command.set_defaults(func=func, passthrough=True)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    if getattr(args, "passthrough", False):
+        args.args = rest
+    elif rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    if args.func in (extract, transform) and not args.staging_dir:
+        parser.error(f"{args.command} needs --staging-dir or STAGING_DIR")
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+import argparse
+import cProfile
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine, event
+
+from Database.connection import Database_Connection
+from Database.models import (
+    FACT_LOAD_METHODS,
+    Create_Tables,
+    insert_dim_date,
+    insert_dim_indicator,
+    insert_dim_series,
+    insert_fact_index,
+    refresh_rollups,
+)
+from Database.repository import KeyCache
+from DataIngestion.extract import Fetch_Data
+from Transformation.registry import get_dataset
+from Transformation.validation import validate_frame, write_quarantine
+
+PROFILERS = ("cprofile", "tracemalloc")
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of the process so far, in bytes.
+    """
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Pipeline:
+    """
+    Runs pipeline stages and records how each one performed.
+
+    Every stage run through ``stage`` gets a record with its wall time,
+    rows in and out, the process peak RSS after the stage and the number
+    of statements sent to the database while it ran. The records make up
+    the JSON run report returned by ``report``.
+
+    :param engine: sqlalchemy.engine.Engine | None
+        Engine whose statements are counted as database round trips.
+
+    :param profile: str | None
+        ``"cprofile"`` to profile each stage with cProfile, or
+        ``"tracemalloc"`` to trace its Python allocations.
+
+    :param profile_dir: str | None
+        Where cProfile writes ``<stage>.prof`` files. Without it the top
+        functions are summarized in the report instead.
+    """
+
+    def __init__(self, engine=None, profile=None, profile_dir=None):
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f"profile must be one of {PROFILERS}, got {profile!r}")
+
+        self.engine = engine
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.started_at = datetime.now(timezone.utc)
+        self._round_trips = 0
+
+        if isinstance(engine, Engine):
+            event.listen(engine, "before_cursor_execute", self._count_round_trip)
+
+    def _count_round_trip(self, *args):
+        self._round_trips += 1
+
+    def close(self):
+        """
+        Stop counting the engine's statements.
+        """
+
+        if isinstance(self.engine, Engine):
+            event.remove(self.engine, "before_cursor_execute", self._count_round_trip)
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time the enclosed block as the stage ``name``.
+
+        Yields the stage record, on which the block sets ``rows_out``.
+        The record is kept even when the block raises, with ``error``
+        set to the exception.
+
+        :param name: str
+            The stage name, e.g. ``"transform"``.
+
+        :param rows_in: int | None
+            Rows handed to the stage.
+        """
+
+        record = {
+            "stage": name,
+            "rows_in": rows_in,
+            "rows_out": None,
+            "seconds": None,
+            "peak_rss_bytes": None,
+            "round_trips": None,
+        }
+        self.stages.append(record)
+
+        profiler = None
+        if self.profile == "cprofile":
+            profiler = cProfile.Profile()
+        elif self.profile == "tracemalloc":
+            tracemalloc.start()
+
+        round_trips = self._round_trips
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = repr(e)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["seconds"] = time.perf_counter() - start
+            record["peak_rss_bytes"] = peak_rss_bytes()
+            record["round_trips"] = self._round_trips - round_trips
+
+            if profiler is not None:
+                record["profile"] = self._save_profile(name, profiler)
+            elif self.profile == "tracemalloc":
+                record["profile"] = _tracemalloc_summary()
+                tracemalloc.stop()
+
+    def _save_profile(self, name, profiler):
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, f"{name}.prof")
+            profiler.dump_stats(path)
+            return {"path": path}
+
+        profiler.create_stats()
+        top = sorted(profiler.stats.items(), key=lambda item: item[1][3], reverse=True)[:10]
+        return {
+            "top_cumulative": [
+                {
+                    "function": f"{filename}:{line}({function})",
+                    "calls": calls,
+                    "cumulative_seconds": cumulative,
+                }
+                for (filename, line, function), (_, calls, _, cumulative, _) in top
+            ]
+        }
+
+    def report(self):
+        """
+        Return the run report as a JSON-serializable dict.
+        """
+
+        return {
+            "started_at": self.started_at.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "profile": self.profile,
+            "total_seconds": sum(record["seconds"] or 0 for record in self.stages),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "round_trips": sum(record["round_trips"] or 0 for record in self.stages),
+            "stages": self.stages,
+        }
+
+    def write_report(self, path):
+        """
+        Write the run report to ``path`` as JSON.
+        """
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def _tracemalloc_summary():
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+    return {
+        "traced_peak_bytes": peak,
+        "traced_current_bytes": current,
+        "top_allocations": [
+            {"location": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+            for stat in top
+        ],
+    }
+
+
+def run_pipeline(engine, pipeline=None, fetch=None, method="executemany", table="P0142_7", quarantine_dir=None):
+    """
+    Run fetch -> transform -> validate -> Create_Tables -> the dimension
+    and fact inserts -> the rollup refresh as instrumented stages.
+
+    :param engine: sqlalchemy.engine.Engine
+        An active SQLAlchemy engine connected to the PostgreSQL
+        (Supabase) database.
+
+    :param pipeline: Pipeline | None
+        Records the stages. A new one counting ``engine``'s statements
+        is used by default.
+
+    :param fetch: Callable[[], dict] | None
+        Returns the StatsSA JSON payload, ``Fetch_Data`` of the table's URL
+        by default.
+
+    :param method: str
+        How fact rows are sent, see ``insert_fact_index``.
+
+    :param table: str
+        The registered dataset to load, see ``Transformation.registry``.
+
+    :param quarantine_dir: str | None
+        Where rows failing validation are written, see
+        ``Transformation.validation``. They are only dropped without.
+
+    returns: dict
+        The run report.
+    """
+
+    spec = get_dataset(table)
+    pipeline = pipeline or Pipeline(engine)
+    fetch = fetch or (lambda: Fetch_Data(spec.url))
+
+    try:
+        with pipeline.stage("fetch") as record:
+            rows = spec.rows(fetch())
+            record["rows_out"] = len(rows)
+
+        with pipeline.stage("transform", rows_in=len(rows)) as record:
+            df = spec.transform(rows, compact=True)
+            record["rows_out"] = len(df)
+
+        with pipeline.stage("validate", rows_in=len(df)) as record:
+            df, quarantined = validate_frame(df)
+            if quarantine_dir:
+                write_quarantine(quarantine_dir, table, quarantined)
+            record["rows_out"] = len(df)
+            record["quarantined"] = len(quarantined)
+
+        with pipeline.stage("create_tables"):
+            Create_Tables(engine)
+
+        cache = KeyCache()
+        with pipeline.stage("warm_key_cache") as record:
+            cache.warm(engine)
+            record["rows_out"] = len(cache)
+
+        with pipeline.stage("dim_series", rows_in=len(df)) as record:
+            insert_dim_series(engine, df, cache)
+            record["rows_out"] = df["series_code"].nunique()
+
+        with pipeline.stage("dim_indicator", rows_in=len(df)) as record:
+            insert_dim_indicator(engine, df, cache)
+            record["rows_out"] = df["indicator_code"].nunique()
+
+        with pipeline.stage("dim_date", rows_in=len(df)) as record:
+            insert_dim_date(engine, df, cache)
+            record["rows_out"] = df["date"].nunique()
+
+        with pipeline.stage("fact_index", rows_in=len(df)) as record:
+            counts = insert_fact_index(engine, df, method=method, cache=cache)
+            record["rows_out"] = int(counts["inserted"])
+
+        with pipeline.stage("rollups", rows_in=len(df)):
+            refresh_rollups(engine, df)
+    finally:
+        pipeline.close()
+
+    return pipeline.report()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the pipeline and report how each stage performed.")
+    parser.add_argument("--report", help="write the JSON run report to this file instead of stdout")
+    parser.add_argument("--profile", choices=PROFILERS, help="profile every stage")
+    parser.add_argument("--profile-dir", help="write cProfile .prof files per stage here")
+    parser.add_argument("--method", choices=FACT_LOAD_METHODS, default="executemany")
+    parser.add_argument("--quarantine-dir", default=os.getenv("QUARANTINE_DIR", "quarantine"), help="where rows failing validation are written")
+    args = parser.parse_args(argv)
+
+    engine = Database_Connection("bulk_load")
+    pipeline = Pipeline(engine, profile=args.profile, profile_dir=args.profile_dir)
+    try:
+        run_pipeline(engine, pipeline, method=args.method, quarantine_dir=args.quarantine_dir)
+    finally:
+        if args.report:
+            pipeline.write_report(args.report)
+        else:
+            print(json.dumps(pipeline.report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
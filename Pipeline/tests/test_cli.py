@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+from DataIngestion.tests.stub_server import StubServer
+from DataIngestion.tests.testData import rawData
+from Pipeline.cli import main
+from Staging.store import read_facts, write_raw_rows
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The packages that dominate the startup time of a stage. Pipeline.cli
+# only needs argparse; the stages are imported by the subcommands. The
+# modules loaded are checked instead of a wall-clock budget, which a busy
+# CI runner would exceed at random.
+HEAVY_MODULES = {"numpy", "pandas", "pyarrow", "requests", "sqlalchemy"}
+
+
+def imported_packages(module):
+    """
+    Return the top-level packages in ``sys.modules`` after importing
+    ``module`` in a fresh interpreter.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(*sys.modules)"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_cli_does_not_import_the_stages(self):
+        top_level = imported_packages("Pipeline.cli")
+
+        self.assertFalse(HEAVY_MODULES & top_level)
+        self.assertNotIn("Transformation", top_level)
+        self.assertNotIn("Database", top_level)
+
+    def test_transform_does_not_import_extraction_or_database(self):
+        top_level = imported_packages("Transformation.Transform")
+
+        self.assertNotIn("requests", top_level)
+        self.assertNotIn("sqlalchemy", top_level)
+
+
+class TestCli(unittest.TestCase):
+
+    def test_extract_then_transform(self):
+        body = json.dumps(rawData).encode("utf-8")
+        routes = {"/P0142_7.json": lambda request: (200, {"Content-Type": "application/json"}, body)}
+
+        with StubServer(routes) as server, tempfile.TemporaryDirectory() as tmp:
+            catalogue = {"P0142_7": f"{server.url}/P0142_7.json"}
+            with patch.dict("DataIngestion.extract.CATALOGUE", catalogue), redirect_stdout(StringIO()) as out:
+                self.assertEqual(main(["extract", "--staging-dir", tmp]), 0)
+                self.assertEqual(main(["transform", "--staging-dir", tmp, "--quarantine-dir", tmp]), 0)
+
+            self.assertEqual(len(server.requests), 1)
+            n_values = sum(
+                key.startswith("MO") for row in rawData["SASTableData+P0142_7"] for key in row
+            )
+            self.assertIn(f"Staged {n_values} index rows of P0142_7", out.getvalue())
+
+    def test_transform_quarantines_invalid_rows(self):
+        rows = [
+            {"H01": "P0142.7", "H02": "Unit values", "H03": "UVI10000", "H04": "Exports",
+             "H17": "Index", "H25": "Monthly", "MO012016": 63.1, "MO022016": "n/a"},
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_raw_rows(tmp, "P0142_7", rows)
+            with redirect_stdout(StringIO()) as out:
+                self.assertEqual(main(["transform", "--staging-dir", tmp, "--quarantine-dir", tmp]), 0)
+
+            self.assertIn("Staged 1 index rows of P0142_7", out.getvalue())
+            self.assertIn("Quarantined 1 index rows of P0142_7", out.getvalue())
+            self.assertEqual(len(read_facts(tmp, tables=["P0142_7"])), 1)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "P0142_7.csv")))
+
+    def test_staging_dir_is_required(self):
+        with patch.dict(os.environ, {}, clear=True), redirect_stderr(StringIO()):
+            with self.assertRaises(SystemExit):
+                main(["extract"])
+
+    @patch("Database.models.main")
+    def test_load_passes_options_through(self, models_main):
+        main(["load", "--method", "copy", "--upsert"])
+
+        models_main.assert_called_once_with(["--method", "copy", "--upsert"])
+
+    @patch("Pipeline.runner.main")
+    def test_run_passes_options_through(self, runner_main):
+        main(["run", "--help"])
+
+        runner_main.assert_called_once_with(["--help"])
+
+
+if __name__ == "__main__":
+    unittest.main()
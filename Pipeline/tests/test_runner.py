@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from DataIngestion.tests.testData import rawData
+from Pipeline.runner import Pipeline, run_pipeline
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_stage_records_rows_time_and_memory(self):
+        pipeline = Pipeline()
+
+        with pipeline.stage("transform", rows_in=3) as record:
+            record["rows_out"] = 30
+
+        stage, = pipeline.report()["stages"]
+        self.assertEqual(stage["stage"], "transform")
+        self.assertEqual((stage["rows_in"], stage["rows_out"]), (3, 30))
+        self.assertGreaterEqual(stage["seconds"], 0)
+        self.assertGreater(stage["peak_rss_bytes"], 0)
+        self.assertEqual(stage["round_trips"], 0)
+
+    def test_counts_round_trips_per_stage(self):
+        engine = create_engine("sqlite://")
+        pipeline = Pipeline(engine)
+
+        with pipeline.stage("one"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        with pipeline.stage("three"):
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
+
+        pipeline.close()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        report = pipeline.report()
+        self.assertEqual([stage["round_trips"] for stage in report["stages"]], [1, 3])
+        self.assertEqual(report["round_trips"], 4)
+
+    def test_failed_stage_is_reported(self):
+        pipeline = Pipeline()
+
+        with self.assertRaises(RuntimeError):
+            with pipeline.stage("fetch"):
+                raise RuntimeError("no network")
+
+        stage, = pipeline.report()["stages"]
+        self.assertIn("no network", stage["error"])
+        self.assertIsNotNone(stage["seconds"])
+
+    def test_cprofile_summary(self):
+        pipeline = Pipeline(profile="cprofile")
+
+        with pipeline.stage("work"):
+            sorted(range(1000), key=str)
+
+        profile = pipeline.report()["stages"][0]["profile"]
+        self.assertTrue(profile["top_cumulative"])
+
+    def test_cprofile_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = Pipeline(profile="cprofile", profile_dir=tmp)
+
+            with pipeline.stage("work"):
+                sorted(range(1000), key=str)
+
+            self.assertTrue(os.path.exists(os.path.join(tmp, "work.prof")))
+
+    def test_tracemalloc_summary(self):
+        pipeline = Pipeline(profile="tracemalloc")
+
+        with pipeline.stage("work"):
+            data = [str(i) for i in range(10000)]
+
+        profile = pipeline.report()["stages"][0]["profile"]
+        self.assertGreater(profile["traced_peak_bytes"], 0)
+        self.assertTrue(profile["top_allocations"])
+        del data
+
+    def test_unknown_profiler(self):
+        with self.assertRaises(ValueError):
+            Pipeline(profile="perf")
+
+    def test_report_is_json(self):
+        pipeline = Pipeline(profile="tracemalloc")
+        with pipeline.stage("work"):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            pipeline.write_report(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["stages"][0]["stage"], "work")
+
+
+class TestRunPipeline(unittest.TestCase):
+
+    def test_runs_every_stage(self):
+        engine = MagicMock()
+        engine.connect.return_value.__enter__.return_value.execute.return_value.one.return_value = (None, None, 0)
+
+        report = run_pipeline(engine, fetch=lambda: rawData)
+
+        self.assertEqual(
+            [stage["stage"] for stage in report["stages"]],
+            [
+                "fetch",
+                "transform",
+                "validate",
+                "create_tables",
+                "warm_key_cache",
+                "dim_series",
+                "dim_indicator",
+                "dim_date",
+                "fact_index",
+                "rollups",
+            ]
+        )
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+        self.assertEqual(stages["fetch"]["rows_out"], len(rawData["SASTableData+P0142_7"]))
+        self.assertEqual(stages["transform"]["rows_out"], stages["fact_index"]["rows_in"])
+        self.assertEqual(stages["validate"]["quarantined"], 0)
+        json.dumps(report)
+
+    def test_invalid_rows_are_quarantined_before_load(self):
+        engine = MagicMock()
+        engine.connect.return_value.__enter__.return_value.execute.return_value.one.return_value = (None, None, 0)
+        rows = [dict(row) for row in rawData["SASTableData+P0142_7"]]
+        del rows[0]["H03"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report = run_pipeline(engine, fetch=lambda: {"SASTableData+P0142_7": rows}, quarantine_dir=tmp)
+            quarantined = pd.read_csv(os.path.join(tmp, "P0142_7.csv"))
+
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+        self.assertEqual(stages["validate"]["quarantined"], len(quarantined))
+        self.assertGreater(len(quarantined), 0)
+        self.assertEqual(set(quarantined["reason"]), {"missing_indicator_code"})
+        self.assertEqual(stages["fact_index"]["rows_in"], stages["transform"]["rows_out"] - len(quarantined))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from Transformation.Transform import OUTPUT_SCHEMA, compact_dtypes
+
+
+def _raw_path(root, table):
+    return os.path.join(root, "raw", f"table={table}", "part-0.parquet")
+
+
+def _facts_dir(root, table=None):
+    base = os.path.join(root, "facts")
+    return base if table is None else os.path.join(base, f"table={table}")
+
+
+RAW_SCHEMA = pa.schema([("row", pa.string())])
+
+
+def write_raw_rows(root, table, rows):
+    """
+    Stage the raw series rows of one table as a Parquet file.
+
+    Each row is stored JSON-encoded in a single string column under
+    ``<root>/raw/table=<table>/``, so a value may be a number in one row
+    and a string in the next, and null values and key order survive the
+    round trip. The file is written to a temporary name and renamed into
+    place, so readers never see a partial file.
+
+    :param root: str
+        The staging directory.
+
+    :param table: str
+        The table id, e.g. ``"P0142_7"``.
+
+    :param rows: Iterable[dict]
+        Raw ``SASTableData`` series rows.
+
+    returns: int
+        The number of rows written.
+    """
+
+    encoded = [json.dumps(row) for row in rows]
+    path = _raw_path(root, table)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(pa.table({"row": encoded}, schema=RAW_SCHEMA), tmp_path)
+    os.replace(tmp_path, path)
+    return len(encoded)
+
+
+def read_raw_rows(root, table):
+    """
+    Read the staged raw rows of one table back as dicts.
+
+    returns: list[dict]
+    """
+
+    column = pq.read_table(_raw_path(root, table), memory_map=True).column("row")
+    return [json.loads(row) for row in column.to_pylist()]
+
+
+def has_raw_rows(root, table):
+    return os.path.exists(_raw_path(root, table))
+
+
+def write_facts(root, table, df):
+    """
+    Stage a transformed long-format frame as Parquet, partitioned by year.
+
+    The frame is stored with the compact ``OUTPUT_SCHEMA`` dtypes under
+    ``<root>/facts/table=<table>/year=<year>/``. The whole table directory
+    is written next to the old one and swapped in, so rerunning the
+    transform replaces the staged facts of that table atomically.
+
+    :param root: str
+        The staging directory.
+
+    :param table: str
+        The table id, e.g. ``"P0142_7"``.
+
+    :param df: pandas.DataFrame
+        A frame returned by ``transform_json_to_df``.
+
+    returns: int
+        The number of rows written.
+    """
+
+    target = _facts_dir(root, table)
+    tmp_dir = f"{target}.{uuid.uuid4().hex}.tmp"
+    old_dir = f"{target}.{uuid.uuid4().hex}.old"
+    os.makedirs(tmp_dir)
+
+    if not df.empty:
+        pq.write_to_dataset(
+            pa.Table.from_pandas(compact_dtypes(df), preserve_index=False),
+            tmp_dir,
+            partition_cols=["year"],
+        )
+
+    if os.path.exists(target):
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(df)
+
+
+def read_facts(root, tables=None, years=None, columns=None):
+    """
+    Read staged facts with partition pruning and column projection.
+
+    Files are memory-mapped, only the partitions of the requested tables
+    and years are opened, and only the requested columns are read.
+
+    :param root: str
+        The staging directory.
+
+    :param tables: Iterable[str] | None
+        Table ids to read, all staged tables by default.
+
+    :param years: Iterable[int] | None
+        Years to read, all years by default.
+
+    :param columns: list[str] | None
+        Columns to read, all of them by default. ``year`` and ``table``
+        may be requested like any other column.
+
+    returns: pandas.DataFrame
+        The facts with the ``OUTPUT_SCHEMA`` dtypes, ordered by table and
+        year partition.
+    """
+
+    base = _facts_dir(root)
+    if not os.path.isdir(base):
+        return pd.DataFrame(columns=columns)
+
+    filters = []
+    if tables is not None:
+        filters.append(("table", "in", list(tables)))
+    if years is not None:
+        filters.append(("year", "in", [int(year) for year in years]))
+
+    table = pq.read_table(
+        base,
+        columns=columns,
+        filters=filters or None,
+        partitioning=ds.partitioning(
+            pa.schema([("table", pa.string()), ("year", pa.int16())]),
+            flavor="hive"
+        ),
+        memory_map=True,
+    )
+    df = table.to_pandas()
+    df = df.astype({
+        column: dtype for column, dtype in OUTPUT_SCHEMA.items()
+        if column in df.columns and column != "date"
+    })
+
+    ordered = [column for column in OUTPUT_SCHEMA if column in df.columns]
+    return df[ordered + [column for column in df.columns if column not in OUTPUT_SCHEMA]]
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from Staging.store import has_raw_rows, read_facts, read_raw_rows, write_facts, write_raw_rows
+from Transformation.Transform import OUTPUT_SCHEMA, transform_json_to_df
+from Transformation.benchmark import make_series_rows
+
+
+class TestStagingStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.rows = make_series_rows(3, 30, start_year=2016)
+        self.df = transform_json_to_df(self.rows, compact=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_raw_rows_round_trip(self):
+        self.assertFalse(has_raw_rows(self.root, "P0142_7"))
+
+        write_raw_rows(self.root, "P0142_7", iter(self.rows))
+
+        self.assertTrue(has_raw_rows(self.root, "P0142_7"))
+        self.assertEqual(read_raw_rows(self.root, "P0142_7"), self.rows)
+
+    def test_raw_rows_keep_mixed_types_and_nulls(self):
+        self.rows[0]["MO012016"] = "n/a"
+        self.rows[1]["MO012016"] = None
+        del self.rows[2]["MO022016"]
+
+        write_raw_rows(self.root, "P0142_7", self.rows)
+
+        staged = read_raw_rows(self.root, "P0142_7")
+        self.assertEqual(staged, self.rows)
+        self.assertIn("MO012016", staged[1])
+        self.assertNotIn("MO022016", staged[2])
+
+    def test_facts_are_partitioned_by_table_and_year(self):
+        write_facts(self.root, "P0142_7", self.df)
+
+        table_dir = os.path.join(self.root, "facts", "table=P0142_7")
+        self.assertEqual(sorted(os.listdir(table_dir)), ["year=2016", "year=2017", "year=2018"])
+
+    def test_facts_round_trip(self):
+        write_facts(self.root, "P0142_7", self.df)
+
+        staged = read_facts(self.root)
+
+        self.assertEqual(list(staged.columns), list(OUTPUT_SCHEMA) + ["table"])
+        self.assertEqual(
+            {col: str(dtype) for col, dtype in staged.dtypes.items() if col in OUTPUT_SCHEMA},
+            OUTPUT_SCHEMA
+        )
+        key = ["indicator_code", "date"]
+        pd.testing.assert_frame_equal(
+            staged.drop(columns="table").sort_values(key, ignore_index=True),
+            self.df.sort_values(key, ignore_index=True),
+            check_categorical=False
+        )
+
+    def test_read_facts_prunes_and_projects(self):
+        write_facts(self.root, "P0142_7", self.df)
+        write_facts(self.root, "P0141", self.df.head(5))
+
+        staged = read_facts(
+            self.root,
+            tables=["P0142_7"],
+            years=[2017],
+            columns=["indicator_code", "index_value"]
+        )
+
+        self.assertEqual(list(staged.columns), ["indicator_code", "index_value"])
+        self.assertEqual(len(staged), 3 * 12)
+
+    def test_rewrite_replaces_table(self):
+        write_facts(self.root, "P0142_7", self.df)
+        write_facts(self.root, "P0142_7", self.df[self.df["year"] == 2016])
+
+        self.assertEqual(len(read_facts(self.root)), 3 * 12)
+        self.assertEqual(os.listdir(os.path.join(self.root, "facts")), ["table=P0142_7"])
+
+    def test_read_facts_without_staged_data(self):
+        self.assertTrue(read_facts(self.root).empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
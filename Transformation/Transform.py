@@ -1,51 +1,453 @@
+import calendar
+import hashlib
+import json
+import re
+import numpy as np
 import pandas as pd
-from DataIngestion.extract import Fetch_Data
 from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator
 
 
-def transform_json_to_df(json_data: list[dict]) -> pd.DataFrame:
-    records = []
+COLUMN_MAP = {
+    "H01": "series_code",
+    "H02": "series_name",
+    "H03": "indicator_code",
+    "H04": "category",
+    "H05": "subcategory",
+    "H25": "frequency",
+    "H17": "unit",
+    "H18": "base_period"
+    }
 
-    COLUMN_MAP = {
-        "H01": "series_code",
-        "H02": "series_name",
-        "H03": "indicator_code",
-        "H04": "category",
-        "H05": "subcategory",
-        "H25": "frequency",
-        "H17": "unit",
-        "H18": "base_period"
-        }
+PERIOD_COLUMNS = ["date", "year", "quarter", "month", "month_name", "year_month"]
 
-    for row in json_data:
-        base_fields = {
-            target_col: row.get(source_col)
-            for source_col, target_col in COLUMN_MAP.items()
-        }
+# Keys starting with these are period keys of some frequency; one that
+# does not match the pattern of its dataset is malformed, not a header.
+PERIOD_PREFIXES = ("MO", "QU", "YR")
 
-        for key, value in row.items():
-            if key.startswith("MO"):
-                month = int(key[2:4])
-                year = int(key[4:8])
+# Compact dtypes for the long-format frame: the descriptive columns repeat
+# the same few values on every row and are stored as categoricals.
+# index_value is float32, which is ample for index levels with two
+# decimals; the loaders round it back to NUMERIC(10,2) precision.
+OUTPUT_SCHEMA = {
+    "series_code": "category",
+    "series_name": "category",
+    "indicator_code": "category",
+    "category": "category",
+    "subcategory": "category",
+    "frequency": "category",
+    "unit": "category",
+    "base_period": "category",
+    "date": "datetime64[ns]",
+    "year": "int16",
+    "quarter": "int8",
+    "month": "int8",
+    "month_name": "category",
+    "year_month": "category",
+    "index_value": "float32"
+}
 
-                d = date(year, month, 1)
 
-                records.append({
-                    **base_fields,
-                    "date": d,
-                    "year": year,
-                    "quarter": (month - 1) // 3 + 1,
-                    "month": month,
-                    "month_name": d.strftime("%B"),
-                    "year_month": f"{year}-{month:02d}",
-                    "index_value": value
-                })
+class PeriodKeys:
+    """
+    Recognizes the period keys of a StatsSA export and parses them once.
 
-    return pd.DataFrame(records)
+    ``pattern`` is a regular expression matching a whole period key with a
+    ``year`` group and optionally a ``month`` or ``quarter`` group, e.g.
+    ``MO(?P<month>\\d{2})(?P<year>\\d{4})``. Quarterly and annual periods
+    are dated on their first month, so every frequency lands on the
+    monthly dim_date calendar.
+
+    Parsed keys and the period lookups built from them are memoized, so a
+    stream of batches from the same export parses each key once.
+
+    Keys with one of the ``PERIOD_PREFIXES`` that do not match the pattern,
+    e.g. ``MO1A2016``, are malformed: they are selected with the period
+    keys so their values reach ``Transformation.validation``, which
+    rejects them, instead of being dropped silently.
+
+    :param pattern: str
+        The period key pattern.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self._regex = re.compile(pattern)
+        self._parsed = {}
+        self._lookups = {}
+
+    def parse(self, key):
+        """
+        Return ``(year, month)`` for a period key, or None for other keys.
+        """
+
+        try:
+            return self._parsed[key]
+        except KeyError:
+            pass
+
+        match = self._regex.fullmatch(key)
+        if match is None:
+            period = None
+        else:
+            groups = match.groupdict()
+            if groups.get("month"):
+                month = int(groups["month"])
+            elif groups.get("quarter"):
+                month = (int(groups["quarter"]) - 1) * 3 + 1
+            else:
+                month = 1
+            period = (int(groups["year"]), month)
+
+        self._parsed[key] = period
+        return period
+
+    def is_malformed(self, key):
+        """
+        Whether ``key`` looks like a period key but does not parse.
+        """
+
+        return isinstance(key, str) and key.startswith(PERIOD_PREFIXES) and self.parse(key) is None
+
+    def select(self, keys):
+        """
+        Return the period keys among ``keys``, malformed ones included, in
+        order.
+        """
+
+        return [key for key in keys if self.parse(key) is not None or self.is_malformed(key)]
+
+    def lookup(self, period_keys):
+        """
+        ``build_period_lookup`` for ``period_keys``, memoized.
+        """
+
+        period_keys = tuple(period_keys)
+        lookup = self._lookups.get(period_keys)
+        if lookup is None:
+            if len(self._lookups) >= 64:
+                self._lookups.clear()
+            lookup = build_period_lookup(period_keys, self)
+            self._lookups[period_keys] = lookup
+        return lookup
+
+    def __repr__(self):
+        return f"PeriodKeys({self.pattern!r})"
+
+
+MONTHLY = PeriodKeys(r"MO(?P<month>\d{2})(?P<year>\d{4})")
+QUARTERLY = PeriodKeys(r"QU(?P<quarter>[1-4])(?P<year>\d{4})")
+ANNUAL = PeriodKeys(r"YR(?P<year>\d{4})")
+
+
+def build_period_lookup(period_keys: list[str], periods: PeriodKeys = MONTHLY) -> pd.DataFrame:
+    """
+    Build the calendar attributes for a set of period keys.
+
+    Each distinct key is parsed once, so the cost is proportional to the
+    number of periods in the export rather than the number of data points.
+
+    :param period_keys: list[str]
+        Period column names such as ``"MO012016"``.
+
+    :param periods: PeriodKeys
+        How the keys are parsed, monthly ``MO<mm><yyyy>`` keys by default.
+
+    returns: pandas.DataFrame
+        One row per key, in the order given, with the columns listed in
+        ``PERIOD_COLUMNS``. Keys that match the pattern but name no real
+        month get a null ``date`` and ``month_name``; malformed keys also
+        get a zero year, quarter and month and the key as ``year_month``.
+    """
+
+    rows = []
+    for key in period_keys:
+        period = periods.parse(key)
+        if period is None:
+            # e.g. MO1A2016: kept with a null date for validation to reject
+            rows.append({
+                "date": None,
+                "year": 0,
+                "quarter": 0,
+                "month": 0,
+                "month_name": None,
+                "year_month": key
+            })
+            continue
+
+        year, month = period
+        try:
+            d = date(year, month, 1)
+        except ValueError:
+            # e.g. MO132016: kept with a null date for validation to reject
+            d = None
+
+        rows.append({
+            "date": d,
+            "year": year,
+            "quarter": (month - 1) // 3 + 1,
+            "month": month,
+            "month_name": calendar.month_name[month] if d else None,
+            "year_month": f"{year}-{month:02d}"
+        })
+
+    return pd.DataFrame(rows, columns=PERIOD_COLUMNS)
+
+
+def transform_json_to_df(
+    json_data: Iterable[dict],
+    compact: bool = False,
+    column_map: dict = COLUMN_MAP,
+    periods: PeriodKeys = MONTHLY
+) -> pd.DataFrame:
+    """
+    Reshape StatsSA series rows from wide to long format.
+
+    Every period key (``MO<mm><yyyy>`` by default) of a series row becomes
+    one output row that carries the series attributes from `column_map`,
+    the calendar attributes of the period and the ``index_value``.
+
+    The rows are loaded into a single frame, the monthly columns are
+    flattened row-major with numpy, and the calendar attributes are taken
+    from a lookup table built once per distinct period. The output keeps
+    the row-by-row, key-by-key order of the legacy loop, each row in its
+    own key order.
+
+    Unlike the legacy loop, a malformed period key (e.g. ``MO1A2016``)
+    does not raise: its value is kept with a null date, see
+    ``build_period_lookup``, for ``Transformation.validation`` to
+    quarantine.
+
+    :param json_data: Iterable[dict]
+        The ``SASTableData+<table>`` array of a StatsSA JSON export, or any
+        iterable of its rows such as ``DataIngestion.extract.Stream_Rows``.
+
+    :param compact: bool
+        Return the frame with the dtypes of ``OUTPUT_SCHEMA`` instead of
+        object/str columns and ``datetime.date`` values.
+
+    :param column_map: dict[str, str]
+        Header key -> output column, ``COLUMN_MAP`` by default.
+
+    :param periods: PeriodKeys
+        Which keys are periods and how they are dated, see
+        ``Transformation.registry`` for the datasets that use others.
+
+    returns: pandas.DataFrame
+        One row per series and period.
+    """
+
+    if not isinstance(json_data, list):
+        json_data = list(json_data)
+
+    if not json_data:
+        return pd.DataFrame()
+
+    wide = pd.DataFrame(json_data)
+    period_keys = periods.select(wide.columns)
+    n_rows, n_periods = len(wide), len(period_keys)
+
+    if n_periods == 0:
+        return pd.DataFrame()
+
+    columns = list(wide.columns)
+    if all(list(row) == columns for row in json_data):
+        row_idx = np.repeat(np.arange(n_rows), n_periods)
+        period_idx = np.tile(np.arange(n_periods), n_rows)
+        values = wide[period_keys].to_numpy().ravel()
+    else:
+        # Rows that do not carry every monthly key only produce output for
+        # the keys they actually have, in their own key order; a null
+        # value is still a data point.
+        position = {key: i for i, key in enumerate(period_keys)}
+        row_idx, period_idx = np.array(
+            [(i, position[key]) for i, row in enumerate(json_data) for key in row if key in position],
+            dtype=np.intp
+        ).reshape(-1, 2).T
+        values = wide[period_keys].to_numpy()[row_idx, period_idx]
+
+    base = pd.DataFrame({
+        target_col: (
+            wide[source_col].to_numpy()
+            if source_col in wide.columns
+            else np.full(n_rows, None, dtype=object)
+        )
+        for source_col, target_col in column_map.items()
+    })
+
+    lookup = periods.lookup(period_keys)
+
+    df = pd.concat(
+        [
+            base.take(row_idx).reset_index(drop=True),
+            lookup.take(period_idx).reset_index(drop=True),
+        ],
+        axis=1
+    )
+    df["index_value"] = pd.Series(values).infer_objects()
+
+    return compact_dtypes(df) if compact else df
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a transformed frame to the dtypes of ``OUTPUT_SCHEMA``.
+
+    :param df: pandas.DataFrame
+        A frame returned by ``transform_json_to_df``.
+
+    returns: pandas.DataFrame
+        A new frame; columns not in the schema are left as they are.
+    """
+
+    if df.empty:
+        return df
+
+    return df.astype({
+        column: dtype for column, dtype in OUTPUT_SCHEMA.items()
+        if column in df.columns and column not in ("date", "index_value")
+    }).assign(
+        date=pd.to_datetime(df["date"]).astype(OUTPUT_SCHEMA["date"]),
+        # Non-numeric values become NaN for Transformation.validation to reject
+        index_value=pd.to_numeric(df["index_value"], errors="coerce").astype(OUTPUT_SCHEMA["index_value"])
+    )
+
+
+def transform_batches(
+    rows: Iterable[dict],
+    batch_size: int = 500,
+    compact: bool = False,
+    column_map: dict = COLUMN_MAP,
+    periods: PeriodKeys = MONTHLY
+) -> Iterator[pd.DataFrame]:
+    """
+    Transform a stream of series rows in batches.
+
+    Only ``batch_size`` raw rows and their long-format frame are held at a
+    time, which lets the loaders consume a streamed export without ever
+    materializing the whole document.
+
+    :param rows: Iterable[dict]
+        Series rows, e.g. from ``DataIngestion.extract.Stream_Rows``.
+
+    :param batch_size: int
+        Number of series rows transformed per frame.
+
+    :param compact: bool
+        Passed to ``transform_json_to_df``, as are `column_map` and
+        `periods`.
+
+    returns: Iterator[pandas.DataFrame]
+        One long-format frame per non-empty batch.
+    """
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+
+        df = transform_json_to_df(batch, compact=compact, column_map=column_map, periods=periods)
+        if not df.empty:
+            yield df
+
+
+def row_fingerprint(row: dict, periods: PeriodKeys = MONTHLY) -> str:
+    """
+    Stable hash of the period values of one series row.
+
+    Keys are sorted before hashing, so the fingerprint does not depend on
+    the key order of the export.
+
+    :param row: dict
+        A raw ``SASTableData`` series row.
+
+    :param periods: PeriodKeys
+        Which keys are periods.
+
+    returns: str
+        A 32 character hex digest.
+    """
+
+    values = sorted((key, value) for key, value in row.items() if periods.parse(key) is not None)
+    payload = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def filter_changed_rows(
+    rows: Iterable[dict],
+    fingerprints: dict,
+    changed: dict,
+    counts: dict | None = None,
+    periods: PeriodKeys = MONTHLY
+) -> Iterator[dict]:
+    """
+    Keep only the series rows whose monthly values changed.
+
+    Rows are keyed by their ``H03`` indicator code. A row is passed on when
+    its fingerprint differs from the known one, or when the indicator has
+    no known fingerprint. Rows without ``H03`` are always passed on.
+
+    :param rows: Iterable[dict]
+        Raw series rows.
+
+    :param fingerprints: dict[str, str]
+        indicator_code -> fingerprint of the last loaded version.
+
+    :param changed: dict
+        Filled in place with indicator_code -> new fingerprint for every
+        row passed on, to be persisted once the rows are loaded.
+
+    :param counts: dict | None
+        When given, updated in place with the number of ``"unchanged"``
+        rows that were dropped.
+
+    :param periods: PeriodKeys
+        Passed to ``row_fingerprint``.
+
+    returns: Iterator[dict]
+        The changed rows.
+    """
+
+    if counts is None:
+        counts = {}
+    counts.setdefault("unchanged", 0)
+
+    for row in rows:
+        indicator_code = row.get("H03")
+        if indicator_code is None:
+            yield row
+            continue
+
+        fingerprint = row_fingerprint(row, periods)
+        if fingerprints.get(indicator_code) == fingerprint:
+            counts["unchanged"] += 1
+            continue
+
+        changed[indicator_code] = fingerprint
+        yield row
 
 
 if __name__ == "__main__":
-    json_data = Fetch_Data()
-    df = transform_json_to_df(json_data["SASTableData+P0142_7"])
+    import os
+
+    from DataIngestion.extract import Fetch_Data
+    from Transformation.registry import get_dataset
+
+    spec = get_dataset("P0142_7")
+    staging_dir = os.getenv("STAGING_DIR")
+    if staging_dir:
+        from Staging.store import has_raw_rows, read_raw_rows, write_facts
+
+        if has_raw_rows(staging_dir, spec.table):
+            rows = read_raw_rows(staging_dir, spec.table)
+        else:
+            rows = spec.rows(Fetch_Data(spec.url))
+        df = spec.transform(rows, compact=True)
+        write_facts(staging_dir, spec.table, df)
+        print(f"Staged {len(df)} index rows of {spec.table}")
+    else:
+        df = spec.transform(spec.rows(Fetch_Data(spec.url)))
 
-    print(df.head())
+        print(df.head())
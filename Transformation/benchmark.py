@@ -0,0 +1,147 @@
+import argparse
+import time
+from datetime import date
+
+import pandas as pd
+
+from Transformation.Transform import COLUMN_MAP, transform_json_to_df
+
+
+def legacy_transform_json_to_df(json_data: list[dict]) -> pd.DataFrame:
+    """
+    The original row-by-row implementation of ``transform_json_to_df``.
+
+    Kept as the reference the vectorized engine is compared against, both
+    for output equality in the tests and for throughput in the benchmark.
+    """
+
+    records = []
+
+    for row in json_data:
+        base_fields = {
+            target_col: row.get(source_col)
+            for source_col, target_col in COLUMN_MAP.items()
+        }
+
+        for key, value in row.items():
+            if key.startswith("MO"):
+                month = int(key[2:4])
+                year = int(key[4:8])
+
+                d = date(year, month, 1)
+
+                records.append({
+                    **base_fields,
+                    "date": d,
+                    "year": year,
+                    "quarter": (month - 1) // 3 + 1,
+                    "month": month,
+                    "month_name": d.strftime("%B"),
+                    "year_month": f"{year}-{month:02d}",
+                    "index_value": value
+                })
+
+    return pd.DataFrame(records)
+
+
+def make_series_rows(
+    n_series: int,
+    n_months: int,
+    start_year: int = 2000,
+    table: str = "P0142.7"
+) -> list[dict]:
+    """
+    Generate ``SASTableData+P0142_7``-shaped rows with ``n_months`` monthly
+    values each. ``table`` sets the series code and prefixes the
+    indicator codes of other tables, so several tables can be combined.
+    """
+
+    prefix = "UVI" if table == "P0142.7" else table.replace(".", "")
+    rows = []
+    for i in range(n_series):
+        row = {
+            "H01": table,
+            "H02": "Export and Import Unit Value Indices",
+            "H03": f"{prefix}{i:05d}",
+            "H04": "Exports" if i % 2 else "Imports",
+            "H05": f"Category {i % 40}",
+            "H17": "Index",
+            "H18": "December 2020 =100",
+            "H25": "Monthly",
+        }
+        for m in range(n_months):
+            year = start_year + m // 12
+            month = m % 12 + 1
+            row[f"MO{month:02d}{year}"] = round(50 + (i * 7 + m) % 600 / 10, 1)
+        rows.append(row)
+
+    return rows
+
+
+def time_transform(func, json_data: list[dict], repeat: int) -> tuple[float, int]:
+    """
+    Return the best wall time over ``repeat`` runs and the output row count.
+    """
+
+    best = float("inf")
+    n_rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = func(json_data)
+        best = min(best, time.perf_counter() - start)
+        n_rows = len(df)
+
+    return best, n_rows
+
+
+def memory_report(json_data: list[dict]) -> dict:
+    """
+    Return ``memory_usage(deep=True)`` in bytes of the default and the
+    compact output of ``transform_json_to_df``.
+    """
+
+    return {
+        "default": int(transform_json_to_df(json_data).memory_usage(deep=True).sum()),
+        "compact": int(transform_json_to_df(json_data, compact=True).memory_usage(deep=True).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare transform_json_to_df throughput with the row-by-row implementation."
+    )
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--months", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--memory",
+        type=int,
+        metavar="TABLES",
+        help="instead, compare frame memory for a TABLES-table extract with and without compact dtypes"
+    )
+    args = parser.parse_args()
+
+    if args.memory:
+        json_data = [
+            row
+            for t in range(args.memory)
+            for row in make_series_rows(args.series, args.months, table=f"P{t:04d}")
+        ]
+        report = memory_report(json_data)
+        for name, n_bytes in report.items():
+            print(f"{name:<12}{n_bytes / 2**20:>10.1f} MiB")
+        print(f"{'ratio':<12}{report['default'] / report['compact']:>10.1f}x")
+        return
+
+    json_data = make_series_rows(args.series, args.months)
+
+    for name, func in [
+        ("legacy", legacy_transform_json_to_df),
+        ("vectorized", transform_json_to_df),
+    ]:
+        seconds, n_rows = time_transform(func, json_data, args.repeat)
+        print(f"{name:<12}{n_rows:>10} rows {seconds:>9.3f} s {n_rows / seconds:>14,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Transform series rows on several cores.
+
+``transform_json_to_df`` runs on one core. ``transform_parallel`` splits
+the rows of a table into shards and ``transform_tables`` hands out whole
+tables, each transformed in a ``ProcessPoolExecutor`` worker. A worker
+writes its frame as an Arrow IPC stream into a shared memory block and
+only returns the block's name, so the long-format frames are never
+pickled; the parent maps the block, reads the frame back and frees it.
+A shard Arrow cannot type, e.g. an ``index_value`` mixing numbers and
+strings in a default (non-compact) frame, is pickled instead, and the
+missing values of the shards are made alike when they are concatenated.
+
+The result is the frame the serial ``transform_json_to_df`` returns for
+the same rows, in the same order.
+"""
+
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import resource_tracker, shared_memory
+
+import pandas as pd
+import pyarrow as pa
+
+from Transformation.Transform import COLUMN_MAP, MONTHLY, compact_dtypes, transform_json_to_df
+
+DEFAULT_SHARD_SIZE = 500
+
+SHARED_MEMORY_PREFIX = "stx_"
+
+
+def _shards(rows, shard_size):
+    rows = iter(rows)
+    while True:
+        shard = list(islice(rows, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def _write_stream(sink, table):
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.tell()
+
+
+def _new_block(size):
+    while True:
+        name = SHARED_MEMORY_PREFIX + secrets.token_hex(8)
+        try:
+            return name, shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            continue
+
+
+def _to_shared_memory(df):
+    """
+    Write a frame into a new shared memory block as an Arrow IPC stream.
+
+    returns: tuple[str, int] | pandas.DataFrame | None
+        The block's name and the stream size, the frame itself when Arrow
+        cannot convert it, None for an empty frame.
+    """
+
+    if df.empty:
+        return None
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df
+    size = _write_stream(pa.MockOutputStream(), table)
+
+    name, block = _new_block(size)
+    try:
+        _write_stream(pa.FixedSizeBufferWriter(pa.py_buffer(block.buf)), table)
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+    if os.name == "posix":
+        # The parent frees the block, so this process must not clean it up
+        # too; the tracker knows POSIX blocks by their "/"-prefixed name
+        resource_tracker.unregister("/" + name, "shared_memory")
+    return name, size
+
+
+def _from_shared_memory(handle):
+    """
+    Read a frame written by ``_to_shared_memory`` and free its block.
+    """
+
+    if handle is None:
+        return pd.DataFrame()
+    if isinstance(handle, pd.DataFrame):
+        return handle
+
+    name, size = handle
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # A single copy out of the block, which lets it be freed before the
+        # frame is decoded; the decoded columns may point into `data`
+        with block.buf[:size] as view:
+            data = pa.py_buffer(bytes(view))
+    finally:
+        block.close()
+        block.unlink()
+
+    df = pa.ipc.open_stream(data).read_all().to_pandas(date_as_object=True)
+    return df
+
+
+def _transform_shard(rows, compact, column_map, periods):
+    return _to_shared_memory(
+        transform_json_to_df(rows, compact=compact, column_map=column_map, periods=periods)
+    )
+
+
+def _concat(frames, compact):
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    # A shard read back from Arrow holds NaN where a pickled shard, like
+    # the serial frame, holds None in a column of mixed values
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].where(df[column].notna(), None)
+    # Shards have their own categories, which concat turns back into objects
+    return compact_dtypes(df) if compact else df
+
+
+def _read_all(futures):
+    frames = []
+    try:
+        for future in futures:
+            frames.append(_from_shared_memory(future.result()))
+    finally:
+        # Free the blocks of shards that were still written after a failure
+        for future in futures[len(frames):]:
+            if not future.cancel() and future.exception() is None:
+                _from_shared_memory(future.result())
+    return frames
+
+
+def transform_parallel(
+    rows,
+    max_workers=None,
+    shard_size=DEFAULT_SHARD_SIZE,
+    compact=False,
+    column_map=COLUMN_MAP,
+    periods=MONTHLY
+):
+    """
+    ``transform_json_to_df`` with the rows sharded across processes.
+
+    :param rows: Iterable[dict]
+        Series rows of one table.
+
+    :param max_workers: int | None
+        Number of worker processes, ``os.cpu_count()`` by default. With 1
+        the rows are transformed in this process.
+
+    :param shard_size: int
+        Number of series rows per shard.
+
+    :param compact: bool
+        Passed to ``transform_json_to_df``, as are `column_map` and
+        `periods`.
+
+    returns: pandas.DataFrame
+        The frame ``transform_json_to_df`` returns for all of `rows`.
+    """
+
+    max_workers = max_workers or os.cpu_count()
+    if max_workers == 1:
+        return transform_json_to_df(rows, compact=compact, column_map=column_map, periods=periods)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_transform_shard, shard, compact, column_map, periods)
+            for shard in _shards(rows, shard_size)
+        ]
+        return _concat(_read_all(futures), compact)
+
+
+def transform_tables(tables, max_workers=None, compact=False):
+    """
+    Transform several tables at once, one worker per table.
+
+    :param tables: Iterable[tuple[str, Iterable[dict]]]
+        ``(table, rows)`` pairs, e.g. from ``DataIngestion.extract.Fetch_Tables``
+        with ``DatasetSpec.rows``. Every table is transformed with its spec
+        from ``Transformation.registry``.
+
+    :param max_workers: int | None
+        Number of worker processes, ``os.cpu_count()`` by default.
+
+    :param compact: bool
+        Passed to ``transform_json_to_df``.
+
+    returns: dict[str, pandas.DataFrame]
+        The frame of every table.
+    """
+
+    from Transformation.registry import get_dataset
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = {}
+        for table, rows in tables:
+            spec = get_dataset(table)
+            futures[table] = pool.submit(
+                _transform_shard,
+                list(rows),
+                compact,
+                spec.column_map or COLUMN_MAP,
+                spec.periods
+            )
+
+        return dict(zip(futures, _read_all(list(futures.values()))))
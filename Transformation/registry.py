@@ -0,0 +1,146 @@
+"""
+Registry of the StatsSA datasets the pipeline can load.
+
+Each dataset is described by a ``DatasetSpec``: where to download it,
+which key of the export holds its series rows, how its header keys map
+onto the star schema columns and what its period keys look like. The
+extract stage builds ``DataIngestion.extract.CATALOGUE`` from it and the
+transform and load stages look the spec of a table up to transform its
+rows, so adding a table is a matter of registering it here.
+
+This module only imports the transform code when a spec is first used,
+so the extract stage can read the registry without loading pandas.
+"""
+
+PERIOD_FREQUENCIES = ("monthly", "quarterly", "annual")
+
+
+class DatasetSpec:
+    """
+    Declarative description of one StatsSA dataset.
+
+    :param table: str
+        The table id, e.g. ``"P0142_7"``.
+
+    :param url: str
+        Where the JSON export is downloaded from.
+
+    :param data_key: str | None
+        Key of the series rows in the export, ``SASTableData+<table>`` by
+        default.
+
+    :param column_map: dict[str, str] | None
+        Header key -> star schema column,
+        ``Transformation.Transform.COLUMN_MAP`` by default.
+
+    :param periods: str
+        ``"monthly"`` (``MO<mm><yyyy>`` keys), ``"quarterly"``
+        (``QU<q><yyyy>``), ``"annual"`` (``YR<yyyy>``) or a regular
+        expression with a ``year`` and an optional ``month`` or ``quarter``
+        group.
+    """
+
+    def __init__(self, table, url, data_key=None, column_map=None, periods="monthly"):
+        self.table = table
+        self.url = url
+        self.data_key = data_key or f"SASTableData+{table}"
+        self.column_map = column_map
+        self.period_pattern = periods
+        self._periods = None
+
+    @property
+    def periods(self):
+        """
+        The compiled ``PeriodKeys`` of the dataset, built on first use and
+        shared by every transform of the spec.
+        """
+
+        if self._periods is None:
+            from Transformation import Transform
+
+            if self.period_pattern in PERIOD_FREQUENCIES:
+                self._periods = {
+                    "monthly": Transform.MONTHLY,
+                    "quarterly": Transform.QUARTERLY,
+                    "annual": Transform.ANNUAL,
+                }[self.period_pattern]
+            else:
+                self._periods = Transform.PeriodKeys(self.period_pattern)
+        return self._periods
+
+    def _options(self):
+        from Transformation.Transform import COLUMN_MAP
+
+        return {"column_map": self.column_map or COLUMN_MAP, "periods": self.periods}
+
+    def rows(self, payload):
+        """
+        Return the series rows of a downloaded export.
+        """
+
+        return payload[self.data_key]
+
+    def transform(self, rows, compact=False):
+        """
+        ``transform_json_to_df`` with this dataset's mapping and periods.
+        """
+
+        from Transformation.Transform import transform_json_to_df
+
+        return transform_json_to_df(rows, compact=compact, **self._options())
+
+    def transform_batches(self, rows, batch_size=500, compact=False):
+        """
+        ``transform_batches`` with this dataset's mapping and periods.
+        """
+
+        from Transformation.Transform import transform_batches
+
+        return transform_batches(rows, batch_size=batch_size, compact=compact, **self._options())
+
+    def transform_parallel(self, rows, max_workers=None, compact=False):
+        """
+        ``Transformation.parallel.transform_parallel`` with this dataset's
+        mapping and periods.
+        """
+
+        from Transformation.parallel import transform_parallel
+
+        return transform_parallel(rows, max_workers=max_workers, compact=compact, **self._options())
+
+    def __repr__(self):
+        return f"DatasetSpec({self.table!r})"
+
+
+DATASETS = {}
+
+
+def register(spec):
+    """
+    Add a dataset to the registry, replacing one with the same table id.
+
+    returns: DatasetSpec
+        The registered spec.
+    """
+
+    DATASETS[spec.table] = spec
+    return spec
+
+
+def get_dataset(table):
+    """
+    Return the spec of a registered table.
+
+    :raises KeyError: if the table is not registered.
+    """
+
+    try:
+        return DATASETS[table]
+    except KeyError:
+        raise KeyError(f"unknown table {table!r}, expected one of {sorted(DATASETS)}") from None
+
+
+register(DatasetSpec(
+    "P0142_7",
+    url="https://isibaloweb.statssa.gov.za/data/ETS/Monthly/Export%20and%20Import%20Unit%20Value%20IndicesP0142_7/P0142_7p.json",
+))
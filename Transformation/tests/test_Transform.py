@@ -2,7 +2,15 @@ import unittest
 import pandas as pd
 from datetime import date
 
-from Transformation.Transform import transform_json_to_df
+from Transformation.Transform import (
+    OUTPUT_SCHEMA,
+    filter_changed_rows,
+    row_fingerprint,
+    transform_batches,
+    transform_json_to_df,
+)
+from Transformation.benchmark import legacy_transform_json_to_df, make_series_rows
+from DataIngestion.tests.testData import rawData
 
 
 class TestTransform(unittest.TestCase):
@@ -79,6 +87,121 @@ class TestTransform(unittest.TestCase):
         self.assertEqual(jan_quarter, 1)
         self.assertEqual(feb_quarter, 1)
 
+    def test_matches_legacy_output(self):
+        json_data = rawData["SASTableData+P0142_7"]
+
+        pd.testing.assert_frame_equal(
+            transform_json_to_df(json_data),
+            legacy_transform_json_to_df(json_data)
+        )
+
+    def test_matches_legacy_output_for_many_series(self):
+        json_data = make_series_rows(25, 40)
+
+        pd.testing.assert_frame_equal(
+            transform_json_to_df(json_data),
+            legacy_transform_json_to_df(json_data)
+        )
+
+    def test_matches_legacy_output_for_ragged_rows(self):
+        json_data = [
+            {"H01": "P0142.7", "H03": "UVI10000", "MO012016": 63.1, "MO022016": 62.7},
+            {"H01": "P0142.7", "H03": "UVI43100", "H05": "Coal", "MO022016": None}
+        ]
+
+        df = transform_json_to_df(json_data)
+
+        self.assertEqual(len(df), 3)
+        pd.testing.assert_frame_equal(df, legacy_transform_json_to_df(json_data))
+
+    def test_matches_legacy_output_for_rows_in_another_key_order(self):
+        json_data = [
+            {"H01": "P0142.7", "H03": "UVI10000", "MO012016": 63.1, "MO022016": 62.7},
+            {"H01": "P0142.7", "H03": "UVI43100", "MO022016": 70.2, "MO012016": 70.1},
+            {"MO012016": 80.1, "H03": "UVI43200", "H01": "P0142.7", "MO022016": 80.2},
+        ]
+
+        df = transform_json_to_df(json_data)
+
+        self.assertEqual(df["index_value"].tolist(), [63.1, 62.7, 70.2, 70.1, 80.1, 80.2])
+        pd.testing.assert_frame_equal(df, legacy_transform_json_to_df(json_data))
+
+    def test_malformed_period_keys_are_kept_with_a_null_date(self):
+        json_data = [{"H01": "P0142.7", "H03": "UVI10000", "MO012016": 63.1, "MO1A2016": 62.7}]
+
+        with self.assertRaises(ValueError):
+            legacy_transform_json_to_df(json_data)
+        df = transform_json_to_df(json_data)
+
+        self.assertEqual(df["index_value"].tolist(), [63.1, 62.7])
+        self.assertIsNone(df["date"][1])
+        self.assertEqual(df["year_month"].tolist(), ["2016-01", "MO1A2016"])
+
+    def test_accepts_generator(self):
+        json_data = make_series_rows(3, 4)
+
+        pd.testing.assert_frame_equal(
+            transform_json_to_df(row for row in json_data),
+            transform_json_to_df(json_data)
+        )
+
+    def test_transform_batches(self):
+        json_data = make_series_rows(7, 5)
+
+        frames = list(transform_batches(iter(json_data), batch_size=3))
+
+        self.assertEqual([len(df) for df in frames], [15, 15, 5])
+        pd.testing.assert_frame_equal(
+            pd.concat(frames, ignore_index=True),
+            transform_json_to_df(json_data)
+        )
+
+    def test_empty_input(self):
+        self.assertTrue(transform_json_to_df([]).empty)
+
+    def test_fingerprint_ignores_key_order_and_attributes(self):
+        row = self.sample_json[0]
+        reordered = dict(reversed(list(row.items())))
+        renamed = {**row, "H02": "Renamed"}
+
+        self.assertEqual(row_fingerprint(row), row_fingerprint(reordered))
+        self.assertEqual(row_fingerprint(row), row_fingerprint(renamed))
+        self.assertNotEqual(row_fingerprint(row), row_fingerprint({**row, "MO022016": 62.8}))
+
+    def test_filter_changed_rows(self):
+        rows = make_series_rows(3, 4)
+        known = {rows[0]["H03"]: row_fingerprint(rows[0]), rows[1]["H03"]: "stale"}
+        changed, counts = {}, {}
+
+        kept = list(filter_changed_rows(rows, known, changed, counts))
+
+        self.assertEqual(kept, rows[1:])
+        self.assertEqual(changed, {row["H03"]: row_fingerprint(row) for row in rows[1:]})
+        self.assertEqual(counts["unchanged"], 1)
+
+    def test_compact_schema(self):
+        df = transform_json_to_df(rawData["SASTableData+P0142_7"], compact=True)
+
+        self.assertEqual({col: str(dtype) for col, dtype in df.dtypes.items()}, OUTPUT_SCHEMA)
+
+    def test_compact_values_match_default(self):
+        json_data = make_series_rows(4, 30)
+        default = transform_json_to_df(json_data)
+        compact = transform_json_to_df(json_data, compact=True)
+
+        self.assertEqual(compact["date"].dt.date.tolist(), default["date"].tolist())
+        self.assertEqual(compact["indicator_code"].tolist(), default["indicator_code"].tolist())
+        self.assertEqual(compact["year"].tolist(), default["year"].tolist())
+        self.assertTrue(((compact["index_value"].astype("float64").round(2)) == default["index_value"]).all())
+
+    def test_compact_uses_less_memory(self):
+        json_data = make_series_rows(20, 60)
+
+        default = transform_json_to_df(json_data).memory_usage(deep=True).sum()
+        compact = transform_json_to_df(json_data, compact=True).memory_usage(deep=True).sum()
+
+        self.assertLess(compact * 5, default)
+
     # def test_null_month_values_are_excluded(self):
     #     test_data = [
     #         {
@@ -0,0 +1,84 @@
+import os
+import unittest
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from Transformation.Transform import transform_json_to_df
+from Transformation.benchmark import make_series_rows
+from Transformation.parallel import (
+    _from_shared_memory,
+    _to_shared_memory,
+    transform_parallel,
+    transform_tables,
+)
+from Transformation.registry import DATASETS, DatasetSpec, register
+
+
+class TestParallelTransform(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = make_series_rows(9, 14)
+        # A series without some months, and one with a null value
+        del self.rows[3]["MO022000"], self.rows[3]["MO032000"]
+        self.rows[5]["MO012000"] = None
+
+    def test_matches_serial_transform(self):
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                assert_frame_equal(
+                    transform_parallel(self.rows, max_workers=2, shard_size=4, compact=compact),
+                    transform_json_to_df(self.rows, compact=compact)
+                )
+
+    def test_mixed_index_values(self):
+        self.rows[1]["MO012000"] = "x"
+
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                assert_frame_equal(
+                    transform_parallel(self.rows, max_workers=2, shard_size=4, compact=compact),
+                    transform_json_to_df(self.rows, compact=compact)
+                )
+
+    def test_single_worker_runs_in_process(self):
+        assert_frame_equal(
+            transform_parallel(iter(self.rows), max_workers=1, compact=True),
+            transform_json_to_df(self.rows, compact=True)
+        )
+
+    def test_no_rows(self):
+        self.assertTrue(transform_parallel([], max_workers=2).empty)
+
+    def test_shared_memory_round_trip_frees_block(self):
+        df = transform_json_to_df(self.rows, compact=True)
+        name, size = _to_shared_memory(df)
+
+        assert_frame_equal(_from_shared_memory((name, size)), df, check_categorical=False)
+        self.assertFalse(os.path.exists(os.path.join("/dev/shm", name)))
+        self.assertTrue(_from_shared_memory(_to_shared_memory(pd.DataFrame())).empty)
+
+
+class TestTransformTables(unittest.TestCase):
+
+    def setUp(self):
+        self.registered = dict(DATASETS)
+
+    def tearDown(self):
+        DATASETS.clear()
+        DATASETS.update(self.registered)
+
+    def test_each_table_uses_its_spec(self):
+        spec = register(DatasetSpec("P0441", url="https://example.invalid/P0441.json", periods="quarterly"))
+        monthly = make_series_rows(3, 6)
+        quarterly = [{"H01": "P0441", "H03": "GDP10000", "QU12020": 90.5, "QU22020": 98.1}]
+
+        frames = transform_tables([("P0142_7", monthly), ("P0441", quarterly)], max_workers=2, compact=True)
+
+        assert_frame_equal(frames["P0142_7"], transform_json_to_df(monthly, compact=True))
+        assert_frame_equal(frames["P0441"], spec.transform(quarterly, compact=True))
+        assert_frame_equal(spec.transform_parallel(quarterly, max_workers=2), spec.transform(quarterly))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+
+import pandas as pd
+
+from DataIngestion.extract import CATALOGUE, data_key
+from Transformation.Transform import (
+    COLUMN_MAP,
+    MONTHLY,
+    OUTPUT_SCHEMA,
+    QUARTERLY,
+    PeriodKeys,
+)
+from Transformation.registry import DATASETS, DatasetSpec, get_dataset, register
+
+
+class TestPeriodKeys(unittest.TestCase):
+
+    def test_monthly_keys(self):
+        self.assertEqual(MONTHLY.parse("MO032016"), (2016, 3))
+        self.assertIsNone(MONTHLY.parse("H03"))
+        self.assertEqual(MONTHLY.select(["H01", "MO012016", "MO022016"]), ["MO012016", "MO022016"])
+
+    def test_quarters_are_dated_on_their_first_month(self):
+        self.assertEqual(
+            [QUARTERLY.parse(key) for key in ("QU12020", "QU22020", "QU32020", "QU42020")],
+            [(2020, 1), (2020, 4), (2020, 7), (2020, 10)]
+        )
+
+    def test_custom_pattern(self):
+        periods = PeriodKeys(r"(?P<year>\d{4})M(?P<month>\d{2})")
+
+        self.assertEqual(periods.parse("2019M11"), (2019, 11))
+        self.assertIsNone(periods.parse("MO112019"))
+
+    def test_lookup_is_memoized(self):
+        periods = PeriodKeys(r"MO(?P<month>\d{2})(?P<year>\d{4})")
+
+        first = periods.lookup(["MO012016", "MO022016"])
+
+        self.assertIs(periods.lookup(["MO012016", "MO022016"]), first)
+        self.assertEqual(first["year_month"].tolist(), ["2016-01", "2016-02"])
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registered = dict(DATASETS)
+
+    def tearDown(self):
+        DATASETS.clear()
+        DATASETS.update(self.registered)
+
+    def test_catalogue_is_built_from_registry(self):
+        self.assertEqual(CATALOGUE["P0142_7"], get_dataset("P0142_7").url)
+        self.assertEqual(data_key("P0142_7"), "SASTableData+P0142_7")
+
+    def test_unknown_table(self):
+        with self.assertRaises(KeyError):
+            get_dataset("P9999")
+
+    def test_spec_defaults(self):
+        spec = DatasetSpec("P0141", url="https://example.invalid/P0141.json")
+
+        self.assertEqual(spec.data_key, "SASTableData+P0141")
+        self.assertIs(spec.periods, MONTHLY)
+        self.assertEqual(spec.rows({"SASTableData+P0141": [1, 2]}), [1, 2])
+
+    def test_quarterly_dataset(self):
+        spec = register(DatasetSpec("P0441", url="https://example.invalid/P0441.json", periods="quarterly"))
+        rows = [{"H01": "P0441", "H03": "GDP10000", "H04": "GDP", "QU22020": 90.5, "QU32020": 98.1}]
+
+        df = get_dataset("P0441").transform(rows)
+
+        self.assertEqual(df["year_month"].tolist(), ["2020-04", "2020-07"])
+        self.assertEqual(df["quarter"].tolist(), [2, 3])
+        self.assertEqual(df["index_value"].tolist(), [90.5, 98.1])
+
+    def test_annual_dataset_with_own_column_map(self):
+        column_map = dict(COLUMN_MAP, H04="series_name", H05="indicator_name")
+        column_map.pop("H02", None)
+        spec = DatasetSpec(
+            "P0043",
+            url="https://example.invalid/P0043.json",
+            column_map=column_map,
+            periods="annual"
+        )
+        rows = [{"H01": "P0043", "H03": "BLD10000", "H04": "Buildings", "H05": "Residential", "YR2019": 1.5, "YR2020": 1.1}]
+
+        df = spec.transform(rows, compact=True)
+
+        self.assertEqual(df["series_name"].astype(str).tolist(), ["Buildings", "Buildings"])
+        self.assertEqual(df["indicator_name"].astype(str).tolist(), ["Residential", "Residential"])
+        self.assertEqual(df["year_month"].astype(str).tolist(), ["2019-01", "2020-01"])
+
+    def test_datasets_share_one_schema(self):
+        monthly = get_dataset("P0142_7")
+        quarterly = DatasetSpec("P0441", url="https://example.invalid/P0441.json", periods="quarterly")
+
+        frames = list(monthly.transform_batches(
+            [{"H01": "P0142.7", "H03": "UVI10000", "MO012016": 63.1}], compact=True
+        )) + list(quarterly.transform_batches(
+            [{"H01": "P0441", "H03": "GDP10000", "QU12016": 88.0}], compact=True
+        ))
+
+        for df in frames:
+            self.assertEqual(list(df.columns), list(OUTPUT_SCHEMA))
+        self.assertEqual(pd.concat(frames)["year_month"].astype(str).tolist(), ["2016-01", "2016-01"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from Transformation.Transform import transform_json_to_df
+from Transformation.validation import validate_frame, validate_frames, write_quarantine
+
+
+def series_row(**values):
+    return {
+        "H01": "P0142.7",
+        "H02": "Export and Import Unit Value Indices",
+        "H03": "UVI10000",
+        "H04": "Exports",
+        "H17": "Index",
+        "H25": "Monthly",
+        **values
+    }
+
+
+class TestValidateFrame(unittest.TestCase):
+
+    def reasons(self, rows, compact=False):
+        valid, quarantined = validate_frame(transform_json_to_df(rows, compact=compact))
+        return valid, dict(zip(quarantined["year_month"].astype(str), quarantined["reason"]))
+
+    def test_clean_frame_is_returned_as_is(self):
+        df = transform_json_to_df([series_row(MO012016=63.1, MO022016=62.7)], compact=True)
+
+        valid, quarantined = validate_frame(df)
+
+        self.assertIs(valid, df)
+        self.assertTrue(quarantined.empty)
+
+    def test_bad_values_are_quarantined(self):
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                valid, reasons = self.reasons(
+                    [series_row(MO012016=63.1, MO022016="n/a", MO032016=None, MO042016=123456789.0)],
+                    compact
+                )
+
+                self.assertEqual(valid["year_month"].astype(str).tolist(), ["2016-01"])
+                self.assertEqual(reasons, {
+                    "2016-02": "invalid_index_value",
+                    "2016-03": "invalid_index_value",
+                    "2016-04": "index_value_out_of_range",
+                })
+
+    def test_malformed_period_key(self):
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                valid, reasons = self.reasons(
+                    [series_row(MO012016=63.1, MO132016=64.0, MO1A2016=65.0, MO012016X=66.0)],
+                    compact
+                )
+
+                self.assertEqual(len(valid), 1)
+                self.assertEqual(reasons, {
+                    "2016-13": "invalid_period",
+                    "MO1A2016": "invalid_period",
+                    "MO012016X": "invalid_period",
+                })
+
+    def test_missing_codes_and_attributes(self):
+        row = series_row(MO012016=63.1)
+        del row["H03"], row["H17"]
+
+        valid, reasons = self.reasons([row, series_row(H03=" ", MO022016=1.0)])
+
+        self.assertTrue(valid.empty)
+        self.assertEqual(reasons, {
+            "2016-01": "missing_indicator_code;missing_unit",
+            "2016-02": "missing_indicator_code",
+        })
+
+    def test_duplicates_keep_the_first_valid_row(self):
+        df = transform_json_to_df([
+            series_row(MO012016="bad"),
+            series_row(MO012016=63.1),
+            series_row(MO012016=64.0),
+        ])
+
+        valid, quarantined = validate_frame(df)
+
+        self.assertEqual(valid["index_value"].tolist(), [63.1])
+        self.assertEqual(quarantined["reason"].tolist(), ["invalid_index_value", "duplicate"])
+
+
+class TestQuarantine(unittest.TestCase):
+
+    def test_quarantine_file_is_appended(self):
+        frames = [
+            transform_json_to_df([series_row(MO012016=63.1, MO022016="n/a")], compact=True),
+            transform_json_to_df([series_row(MO032016=None)], compact=True),
+        ]
+        counts = {}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            valid = list(validate_frames(frames, "P0142_7", tmp, counts))
+            quarantined = pd.read_csv(os.path.join(tmp, "P0142_7.csv"))
+
+        self.assertEqual([len(df) for df in valid], [1])
+        self.assertEqual(counts["quarantined"], 2)
+        self.assertEqual(quarantined["year_month"].tolist(), ["2016-02", "2016-03"])
+        self.assertIn("quarantined_at", quarantined.columns)
+
+    def test_rejected_indicators_are_collected(self):
+        frames = [
+            transform_json_to_df([
+                series_row(MO012016=63.1),
+                series_row(H03="UVI20000", MO022016=1.0, MO032016="n/a"),
+                series_row(H03="UVI30000", MO1A2016=1.0),
+            ]),
+            transform_json_to_df([series_row(H03="UVI20000", MO012016=None)]),
+        ]
+        rejected = {}
+
+        list(validate_frames(frames, "P0142_7", None, {}, rejected))
+
+        self.assertEqual(rejected, {"UVI20000": (2016, 1), "UVI30000": None})
+
+    def test_nothing_to_quarantine(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _, quarantined = validate_frame(transform_json_to_df([series_row(MO012016=63.1)]))
+
+            self.assertIsNone(write_quarantine(tmp, "P0142_7", quarantined))
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Data-quality checks between the transform and the load.
+
+``validate_frame`` runs vectorized checks over a transformed frame and
+splits it into the rows the warehouse will accept and the rows it would
+reject, so one bad value no longer aborts a whole load transaction:
+
+- ``missing_<column>``: null in a column that is NOT NULL in
+  ``Database.models.Create_Tables`` (or a blank series/indicator code),
+- ``invalid_period``: a malformed period key (e.g. ``MO1A2016``) or one
+  that does not name a real month (``MO132016``),
+- ``invalid_index_value``: a null or non-numeric index value,
+- ``index_value_out_of_range``: a value that does not fit NUMERIC(10,2),
+- ``duplicate``: a second value for the same indicator and date.
+
+Rejected rows are written to a quarantine file per table by
+``write_quarantine``.
+"""
+
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Frame columns stored in NOT NULL warehouse columns
+REQUIRED_COLUMNS = (
+    "series_code",
+    "series_name",
+    "frequency",
+    "indicator_code",
+    "category",
+    "unit",
+)
+
+# Codes that identify a row, for which an empty string is as bad as null
+CODE_COLUMNS = ("series_code", "indicator_code")
+
+# NUMERIC(10,2) holds 8 digits before the decimal point
+NUMERIC_LIMIT = 10 ** 8
+
+DUPLICATE_KEY = ["indicator_code", "date"]
+
+
+def check_frame(df):
+    """
+    Run every check except the duplicate one over a transformed frame.
+
+    :param df: pandas.DataFrame
+        A frame from ``transform_json_to_df``, default or compact.
+
+    returns: pandas.DataFrame
+        One boolean column per failed check, named by reason, True where
+        the row fails it.
+    """
+
+    checks = {}
+
+    for column in REQUIRED_COLUMNS:
+        if column not in df.columns:
+            checks[f"missing_{column}"] = np.ones(len(df), dtype=bool)
+            continue
+        missing = df[column].isna()
+        if column in CODE_COLUMNS:
+            missing |= df[column].astype("string").str.strip().eq("").fillna(False)
+        checks[f"missing_{column}"] = missing.to_numpy(dtype=bool)
+
+    checks["invalid_period"] = pd.to_datetime(df["date"]).isna().to_numpy()
+
+    values = pd.to_numeric(df["index_value"], errors="coerce").astype("float64")
+    checks["invalid_index_value"] = values.isna().to_numpy()
+    with np.errstate(invalid="ignore"):
+        checks["index_value_out_of_range"] = (values.round(2).abs() >= NUMERIC_LIMIT).to_numpy()
+
+    return pd.DataFrame(checks, index=df.index)
+
+
+def validate_frame(df):
+    """
+    Split a transformed frame into valid and quarantined rows.
+
+    Of several valid rows for the same indicator and date the first is
+    kept and the others are quarantined as ``duplicate``.
+
+    :param df: pandas.DataFrame
+        A frame from ``transform_json_to_df``.
+
+    returns: tuple[pandas.DataFrame, pandas.DataFrame]
+        The valid rows, and the other rows with a ``reason`` column listing
+        their failed checks separated by ``;``.
+    """
+
+    if df.empty:
+        return df, df.assign(reason=pd.Series(dtype=object))
+
+    checks = check_frame(df)
+    ok = ~checks.any(axis=1).to_numpy()
+
+    duplicate = np.zeros(len(df), dtype=bool)
+    duplicate[ok] = df.loc[ok, DUPLICATE_KEY].duplicated().to_numpy()
+    checks["duplicate"] = duplicate
+    ok &= ~duplicate
+
+    if ok.all():
+        return df, df.iloc[:0].assign(reason=pd.Series(dtype=object))
+
+    failed = checks[~ok]
+    reasons = failed.apply(lambda row: ";".join(failed.columns[row.to_numpy()]), axis=1)
+
+    return (
+        df[ok].reset_index(drop=True),
+        df[~ok].assign(reason=reasons.to_numpy()).reset_index(drop=True)
+    )
+
+
+def write_quarantine(directory, table, quarantined):
+    """
+    Append quarantined rows to ``<directory>/<table>.csv``.
+
+    :param directory: str
+        The quarantine directory, created if needed.
+
+    :param table: str
+        The table the rows came from.
+
+    :param quarantined: pandas.DataFrame
+        Rows returned by ``validate_frame``.
+
+    returns: str | None
+        The file written, None when there was nothing to quarantine.
+    """
+
+    if quarantined.empty:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{table}.csv")
+    quarantined.assign(
+        quarantined_at=datetime.now(timezone.utc).isoformat(timespec="seconds")
+    ).to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+    return path
+
+
+def _note_rejections(rejected, quarantined):
+    for code, year, month in zip(
+        quarantined["indicator_code"].astype(object),
+        quarantined["year"],
+        quarantined["month"]
+    ):
+        if pd.isna(code):
+            continue
+        # Malformed period keys are dated year 0
+        period = (int(year), int(month)) if year > 0 else None
+        earliest = rejected.get(str(code))
+        rejected[str(code)] = min(
+            (p for p in (earliest, period) if p is not None), default=None
+        )
+
+
+def validate_frames(frames, table, quarantine_dir, counts, rejected=None):
+    """
+    Validate a stream of frames, quarantining their bad rows.
+
+    :param frames: Iterable[pandas.DataFrame]
+        Transformed frames of one table.
+
+    :param table: str
+        The table the frames came from, names the quarantine file.
+
+    :param quarantine_dir: str | None
+        Where quarantined rows are written; they are only counted without.
+
+    :param counts: dict
+        Updated in place with the number of ``"quarantined"`` rows.
+
+    :param rejected: dict | None
+        When given, updated in place with indicator_code -> the earliest
+        ``(year, month)`` of its quarantined rows, None when none of them
+        has a real period. Neither the content hash nor the watermark of
+        these indicators may move past a rejected row, or it would be
+        skipped instead of retried once the source is corrected.
+
+    returns: Iterator[pandas.DataFrame]
+        The valid rows of every frame that has any.
+    """
+
+    counts.setdefault("quarantined", 0)
+
+    for df in frames:
+        valid, quarantined = validate_frame(df)
+        if not quarantined.empty:
+            counts["quarantined"] += len(quarantined)
+            if rejected is not None:
+                _note_rejections(rejected, quarantined)
+            if quarantine_dir:
+                write_quarantine(quarantine_dir, table, quarantined)
+        if not valid.empty:
+            yield valid